@@ -1,10 +1,11 @@
 from rest_framework import viewsets, permissions
 
+from eleven_tutors.conditional import ConditionalGetMixin
 from core.models import University
 from .serializers import UniversitySerializer
 
 
-class UniversityViewSet(viewsets.ModelViewSet):
+class UniversityViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     permission_classes = [permissions.AllowAny]
     queryset = University.objects.all()
     serializer_class = UniversitySerializer
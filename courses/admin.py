@@ -6,6 +6,7 @@ from .models import (
     Lesson,
     Comment,
     Enrollment,
+    LessonProgress,
 )
 
 
@@ -33,6 +34,22 @@ class EnrollmentAdmin(admin.ModelAdmin):
     list_filter = ("course", "enrolled_at",)
 
 
+@admin.register(LessonProgress)
+class LessonProgressAdmin(admin.ModelAdmin):
+    list_display = ("student", "lesson", "position", "completed", "last_watched_at")
+    ordering = ("-last_watched_at",)
+    list_filter = ("completed", "course")
+    raw_id_fields = ("student", "lesson", "course")
+
+
+@admin.register(Course)
+class CourseAdmin(admin.ModelAdmin):
+    list_display = ("title", "category", "price", "is_published", "lessons_count", "enrollments_count", "created_at")
+    search_fields = ("title",)
+    ordering = ("-created_at",)
+    list_filter = ("is_published", "category")
+    readonly_fields = ("lessons_count", "enrollments_count", "comments_count", "total_duration", "completed_revenue")
+
+
 admin.site.register(Category)
-admin.site.register(Course)
 admin.site.register(CoursePart)
@@ -0,0 +1,133 @@
+from decimal import Decimal
+
+import django_filters
+from django.db.models import Case, CharField, Count, F, Q, Value, When
+from django.db.models.functions import Concat
+
+from courses.models import Course
+
+# (value, label, lower bound inclusive, upper bound exclusive)
+PRICE_BANDS = (
+    ("free", "Free", None, None),
+    ("under-50", "Under $50", Decimal("0.01"), Decimal("50")),
+    ("50-100", "$50 - $100", Decimal("50"), Decimal("100")),
+    ("100-plus", "$100 and up", Decimal("100"), None),
+)
+
+
+def price_band_q(value):
+    for band, _, lower, upper in PRICE_BANDS:
+        if band != value:
+            continue
+        if band == "free":
+            return Q(price=0)
+        condition = Q(price__gte=lower)
+        if upper is not None:
+            condition &= Q(price__lt=upper)
+        return condition
+    return Q()
+
+
+class CourseFilter(django_filters.FilterSet):
+    category = django_filters.CharFilter(field_name="category__slug")
+    price_band = django_filters.ChoiceFilter(
+        choices=[(value, label) for value, label, _, _ in PRICE_BANDS],
+        method="filter_price_band",
+    )
+    has_free_preview = django_filters.BooleanFilter(method="filter_has_free_preview")
+    tutor = django_filters.CharFilter(field_name="tutors__id")
+
+    class Meta:
+        model = Course
+        fields = ("category", "price_band", "has_free_preview", "tutor")
+
+    def filter_price_band(self, queryset, name, value):
+        return queryset.filter(price_band_q(value))
+
+    def filter_has_free_preview(self, queryset, name, value):
+        return queryset.with_free_preview().filter(has_free_preview=value)
+
+
+def course_facets(params, queryset):
+    """
+    Counts for every catalog facet. Each facet is counted against the courses
+    matching all the *other* active filters, so picking a category still
+    shows how many courses the sibling categories hold.
+
+    The facets group by different columns over differently filtered
+    courses, so they can't share one aggregate; each is one grouped query
+    yielding (facet, value, label, count) rows, and the four are sent as a
+    single UNION ALL, so the whole sidebar costs one query.
+    """
+    def others(name):
+        data = params.copy()
+        data.pop(name, None)
+        return CourseFilter(data, queryset=queryset).qs.order_by()
+
+    def rows(courses, facet, value, label):
+        return (
+            courses.annotate(
+                facet=Value(facet, output_field=CharField()),
+                facet_value=value,
+                facet_label=label,
+            )
+            .values("facet", "facet_value", "facet_label")
+            .annotate(count=Count("id", distinct=True))
+            .order_by()
+        )
+
+    no_label = Value("", output_field=CharField())
+    facet_rows = rows(
+        others("category").filter(category__isnull=False),
+        "category", F("category__slug"), F("category__name"),
+    ).union(
+        rows(
+            others("price_band"),
+            "price_band",
+            Case(
+                *[When(price_band_q(value), then=Value(value)) for value, _, _, _ in PRICE_BANDS],
+                output_field=CharField(),
+            ),
+            no_label,
+        ),
+        rows(
+            others("has_free_preview").with_free_preview(),
+            "has_free_preview",
+            Case(When(has_free_preview=True, then=Value("1")), default=Value("0"), output_field=CharField()),
+            no_label,
+        ),
+        rows(
+            others("tutor").filter(tutors__isnull=False),
+            "tutor",
+            F("tutors__id"),
+            Concat("tutors__first_name", Value(" "), "tutors__last_name", output_field=CharField()),
+        ),
+        all=True,
+    )
+
+    counts = {facet: {} for facet in ("category", "price_band", "has_free_preview", "tutor")}
+    labels = {}
+    for row in facet_rows:
+        counts[row["facet"]][row["facet_value"]] = row["count"]
+        labels[row["facet"], row["facet_value"]] = (row["facet_label"] or "").strip()
+
+    def grouped(facet):
+        return [
+            {"value": value, "label": labels[facet, value], "count": count}
+            for value, count in sorted(
+                counts[facet].items(), key=lambda item: (-item[1], labels[facet, item[0]])
+            )
+        ]
+
+    return {
+        "category": grouped("category"),
+        "price_band": [
+            {"value": value, "label": label, "count": counts["price_band"].get(value, 0)}
+            for value, label, _, _ in PRICE_BANDS
+        ],
+        "has_free_preview": [
+            {"value": True, "label": "Free preview", "count": counts["has_free_preview"].get("1", 0)},
+            {"value": False, "label": "No free preview", "count": counts["has_free_preview"].get("0", 0)},
+        ],
+        "tutor": grouped("tutor"),
+    }
@@ -0,0 +1,32 @@
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework import status
+
+from courses.search import search_courses, search_lessons
+from .serializers import CourseSerializer, LessonSearchSerializer
+
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 50
+
+
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def search(request):
+    """
+    Ranked search over course and lesson titles and descriptions
+    """
+    query = request.query_params.get('q', '').strip()
+    try:
+        limit = min(int(request.query_params.get('limit', DEFAULT_LIMIT)), MAX_LIMIT)
+    except ValueError:
+        return Response({'error': 'limit must be an integer'}, status=status.HTTP_400_BAD_REQUEST)
+
+    if not query or limit < 1:
+        return Response({'courses': [], 'lessons': []})
+
+    context = {'request': request}
+    return Response({
+        'courses': CourseSerializer(search_courses(query)[:limit], many=True, context=context).data,
+        'lessons': LessonSearchSerializer(search_lessons(query)[:limit], many=True, context=context).data,
+    })
@@ -51,6 +51,28 @@ class LessonDetailSerializer(serializers.ModelSerializer):
         fields = ("id", "title", "slug", "description", "is_free_preview", "order", "duration", "created_at")
 
 
+class LessonSearchSerializer(serializers.ModelSerializer):
+    part_title = serializers.CharField(source="part.title", read_only=True)
+    course_title = serializers.CharField(source="part.course.title", read_only=True)
+    course_slug = serializers.CharField(source="part.course.slug", read_only=True)
+    rank = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = Lesson
+        fields = (
+            "id",
+            "title",
+            "slug",
+            "order",
+            "duration",
+            "is_free_preview",
+            "part_title",
+            "course_title",
+            "course_slug",
+            "rank",
+        )
+
+
 class CoursePartDetailSerializer(serializers.ModelSerializer):
     lessons = LessonSerializer(many=True, read_only=True)
 
@@ -65,6 +87,20 @@ class CommentSerializer(serializers.ModelSerializer):
         fields = ("id", "user", "lesson", "text", "created_at")
 
 
+class CommentAuthorSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = User
+        fields = ("id", "first_name", "last_name")
+
+
+class LessonCommentSerializer(serializers.ModelSerializer):
+    user = CommentAuthorSerializer(read_only=True)
+
+    class Meta:
+        model = Comment
+        fields = ("id", "user", "text", "created_at")
+
+
 class CourseSerializer(serializers.ModelSerializer):
     category = CategorySerializer()
     parts = CoursePartSerializer(many=True, read_only=True)
@@ -82,6 +118,8 @@ class CourseSerializer(serializers.ModelSerializer):
             "tutors",
             "category",
             "parts",
+            "lessons_count",
+            "total_duration",
             "created_at",
             "updated_at",
         )
@@ -97,7 +135,42 @@ class CourseStatsSerializer(CourseSerializer):
     number_of_pending_payments = serializers.SerializerMethodField(read_only=True)
 
     class Meta(CourseSerializer.Meta):
-        pass
+        fields = CourseSerializer.Meta.fields + (
+            "number_of_lessons",
+            "number_of_comments",
+            "number_of_tutors",
+            "number_of_enrolled",
+            "number_of_payments",
+            "number_of_failed_payments",
+            "number_of_completed_payments",
+            "number_of_pending_payments",
+        )
+
+    # Every getter reads an annotation from Course.objects.with_stats(), so
+    # a page costs no per-course queries.
+    def get_number_of_lessons(self, course):
+        return course.number_of_lessons
+
+    def get_number_of_comments(self, course):
+        return course.number_of_comments
+
+    def get_number_of_tutors(self, course):
+        return course.number_of_tutors
+
+    def get_number_of_enrolled(self, course):
+        return course.number_of_enrolled
+
+    def get_number_of_payments(self, course):
+        return course.number_of_payments
+
+    def get_number_of_failed_payments(self, course):
+        return course.number_of_failed_payments
+
+    def get_number_of_completed_payments(self, course):
+        return course.number_of_completed_payments
+
+    def get_number_of_pending_payments(self, course):
+        return course.number_of_pending_payments
 
 
 class EnrollmentSerializer(serializers.ModelSerializer):
@@ -109,17 +182,44 @@ class EnrollmentSerializer(serializers.ModelSerializer):
         fields = ("id", "student", "course", "enrolled_at")
 
 
+class DashboardCourseSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Course
+        fields = ("id", "title", "slug", "thumbnail", "lessons_count", "total_duration")
+
+
+class DashboardEnrollmentSerializer(serializers.ModelSerializer):
+    """A learner home page card; see courses.dashboard"""
+    course = DashboardCourseSerializer(read_only=True)
+    progress = serializers.SerializerMethodField()
+    last_lesson = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Enrollment
+        fields = ("id", "course", "enrolled_at", "progress", "last_lesson")
+
+    def get_progress(self, enrollment):
+        completed = enrollment.completed_lessons
+        total = enrollment.course.lessons_count
+        return {
+            "completed_lessons": completed,
+            "percent": min(100, round(100 * completed / total)) if total else 0,
+        }
+
+    def get_last_lesson(self, enrollment):
+        if not enrollment.last_lesson_slug:
+            return None
+        return {
+            "slug": enrollment.last_lesson_slug,
+            "title": enrollment.last_lesson_title,
+            "position": enrollment.last_lesson_position,
+        }
+
+
 class CourseDetailSerializer(serializers.ModelSerializer):
     categories = CategorySerializer(many=True, read_only=True)
     tutors = TutorSerializer(many=True, read_only=True)
     parts = CoursePartDetailSerializer(many=True, read_only=True)
-    is_enrolled = serializers.SerializerMethodField(read_only=True)
-
-    def get_is_enrolled(self, course):
-        user = self.context.get("request").user
-        if not user or user.is_anonymous:
-            return False
-        return Enrollment.objects.filter(course=course, student=user).exists()
 
     class Meta:
         model = Course
@@ -131,10 +231,48 @@ class CourseDetailSerializer(serializers.ModelSerializer):
             "price",
             "thumbnail",
             "tutors",
-            "is_enrolled",
             "parts",
+            "lessons_count",
+            "total_duration",
             "categories",
             "categories",
             "created_at",
             "updated_at",
         )
+
+
+class LessonProgressSerializer(serializers.Serializer):
+    position = serializers.IntegerField(min_value=0)
+    completed = serializers.BooleanField(default=False)
+
+
+class LessonManifestSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Lesson
+        fields = ("title", "description", "video_service_id", "duration", "is_free_preview", "order")
+
+
+class CoursePartManifestSerializer(serializers.ModelSerializer):
+    lessons = LessonManifestSerializer(many=True)
+
+    class Meta:
+        model = CoursePart
+        fields = ("title", "description", "order", "lessons")
+
+
+class CourseManifestSerializer(serializers.ModelSerializer):
+    """A whole course with its parts and lessons, for courses.importer"""
+    category = serializers.SlugRelatedField(
+        slug_field="slug", queryset=Category.objects.all(), required=False, allow_null=True
+    )
+    parts = CoursePartManifestSerializer(many=True, allow_empty=False)
+
+    class Meta:
+        model = Course
+        fields = ("title", "description", "price", "category", "is_published", "parts")
+
+    def validate_parts(self, parts):
+        titles = [part["title"] for part in parts]
+        if len(set(titles)) != len(titles):
+            raise serializers.ValidationError("Part titles must be unique within the course.")
+        return parts
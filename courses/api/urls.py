@@ -2,6 +2,7 @@ from rest_framework.routers import DefaultRouter
 from django.urls import path
 
 from . import views
+from . import search_views
 from . import vdocipher_views
 
 router = DefaultRouter()
@@ -18,4 +19,8 @@ vdocipher_urls = [
     path('vdocipher/video/<str:video_id>/otp/', vdocipher_views.get_video_otp, name='vdocipher-video-otp'),
 ]
 
-urlpatterns = router.urls + vdocipher_urls
+search_urls = [
+    path('search/', search_views.search, name='course-search'),
+]
+
+urlpatterns = router.urls + vdocipher_urls + search_urls
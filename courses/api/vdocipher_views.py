@@ -1,43 +1,35 @@
-from rest_framework.decorators import api_view, permission_classes
+from adrf.decorators import api_view
+from rest_framework.decorators import permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
 from django.conf import settings
-import requests
 import logging
-from urllib.parse import quote
+
+from courses import vdocipher
 
 logger = logging.getLogger(__name__)
 
 
 @api_view(['POST'])
 @permission_classes([IsAuthenticated])
-def get_upload_credentials(request):
+async def get_upload_credentials(request):
     """
     Get VdoCipher upload credentials for video upload
     """
     try:
         title = request.data.get('title', 'Untitled Video')
         folder_id = request.data.get('folderId', 'root')
-        
-        # Request upload credentials from VdoCipher
-        # VdoCipher expects title as query parameter, not in body
-        # URL encode the title to handle special characters
-        encoded_title = quote(title)
-        vdocipher_url = f'https://dev.vdocipher.com/api/videos?title={encoded_title}&folderId={folder_id}'
-        
+
         # Log the request details (without exposing the full API key)
         logger.info(f"Requesting VdoCipher credentials for: {title}")
-        logger.debug(f"VdoCipher URL: {vdocipher_url}")
         logger.debug(f"API Key present: {bool(settings.VIDEO_SERVICE_SECRET_KEY)}")
-        
-        response = requests.put(
-            vdocipher_url,
-            headers=settings.VDOCIPHER_HEADERS
-        )
-        
+
+        # VdoCipher expects title as query parameter, not in body
+        response = await vdocipher.aget_upload_credentials(title, folder_id)
+
         logger.info(f"VdoCipher response status: {response.status_code}")
-        
+
         if response.status_code == 200:
             data = response.json()
             logger.info(f"Successfully got credentials, videoId: {data.get('videoId', 'N/A')}")
@@ -47,7 +39,6 @@ def get_upload_credentials(request):
         else:
             logger.error(f"VdoCipher API error: {response.status_code}")
             logger.error(f"VdoCipher response: {response.text}")
-            logger.error(f"Request URL: {vdocipher_url}")
             return Response(
                 {
                     'error': 'Failed to get upload credentials from VdoCipher',
@@ -56,7 +47,14 @@ def get_upload_credentials(request):
                 },
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
-            
+
+    except vdocipher.CircuitOpenError as e:
+        logger.warning(f"VdoCipher circuit open, not requesting upload credentials: {e}")
+        return Response(
+            {'error': 'Video service is temporarily unavailable'},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE
+        )
+
     except Exception as e:
         logger.error(f"Error getting VdoCipher credentials: {str(e)}")
         return Response(
@@ -67,28 +65,27 @@ def get_upload_credentials(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
-def get_video_otp(request, video_id):
+async def get_video_otp(request, video_id):
     """
     Get OTP for video playback
     """
     try:
-        payload = {'ttl': 300}  # 5 minutes
-        
-        response = requests.post(
-            f'https://dev.vdocipher.com/api/videos/{video_id}/otp',
-            json=payload,
-            headers=settings.VDOCIPHER_HEADERS
+        return Response(await vdocipher.aget_video_otp(video_id, request.user), status=status.HTTP_200_OK)
+
+    except vdocipher.CircuitOpenError as e:
+        logger.warning(f"VdoCipher circuit open, not requesting OTP: {e}")
+        return Response(
+            {'error': 'Video service is temporarily unavailable'},
+            status=status.HTTP_503_SERVICE_UNAVAILABLE
         )
-        
-        if response.status_code == 200:
-            return Response(response.json(), status=status.HTTP_200_OK)
-        else:
-            logger.error(f"VdoCipher OTP error: {response.status_code} - {response.text}")
-            return Response(
-                {'error': 'Failed to get video OTP'},
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR
-            )
-            
+
+    except vdocipher.VdoCipherError as e:
+        logger.error(f"VdoCipher OTP error: {e.status_code} - {e.details}")
+        return Response(
+            {'error': 'Failed to get video OTP'},
+            status=status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+
     except Exception as e:
         logger.error(f"Error getting video OTP: {str(e)}")
         return Response(
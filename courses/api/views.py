@@ -1,24 +1,41 @@
 from rest_framework import viewsets, permissions
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.response import Response
 from django.conf import settings
+from django.core.cache import cache
+import hashlib
 import logging
-import json
-import requests
+from django_filters.rest_framework import DjangoFilterBackend
 
+from eleven_tutors.conditional import ConditionalGetMixin
+from eleven_tutors.exports import ExportSerializer, export_response, export_tutor
+from eleven_tutors.pagination import CreatedAtCursorPagination, SelectablePagination
+from eleven_tutors.viewsets import AsyncModelViewSet
+from courses.cache import get_course_detail
+from courses.dashboard import get_dashboard
+from courses.entitlements import ais_enrolled, is_enrolled
+from courses.exports import ENROLLMENT_COLUMNS, enrollments_export
+from courses.importer import ManifestError, import_course, manifest_from_csv
+from courses.progress import get_progress, record_progress
 from courses.models import Category, Course, CoursePart, Lesson, Comment, Enrollment
+from courses.vdocipher import VdoCipherError, aget_video_otp, aget_video_otps
+from users.models import User
+from .filters import CourseFilter, course_facets
 from .serializers import CourseSerializer, LessonSerializer, CategorySerializer, CommentSerializer, \
-    EnrollmentSerializer, CoursePartSerializer, CourseDetailSerializer, LessonDetailSerializer, CoursePartCreateSerializer, LessonCreateSerializer
+    EnrollmentSerializer, CoursePartSerializer, CourseDetailSerializer, LessonDetailSerializer, CoursePartCreateSerializer, LessonCreateSerializer, \
+    CourseManifestSerializer, LessonCommentSerializer, LessonProgressSerializer, CourseStatsSerializer
 
 logger = logging.getLogger(__name__)
 
 
-class CategoryViewSet(viewsets.ModelViewSet):
+class CategoryViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
 
 
-class CoursePartViewSet(viewsets.ModelViewSet):
+class CoursePartViewSet(AsyncModelViewSet):
     permission_classes = [permissions.IsAuthenticated]
     queryset = CoursePart.objects.all()
     serializer_class = CoursePartSerializer
@@ -27,8 +44,45 @@ class CoursePartViewSet(viewsets.ModelViewSet):
     def get_serializer_class(self):
         return CoursePartCreateSerializer if self.action == "create" else CoursePartSerializer
 
+    @action(detail=True, methods=["get"])
+    async def otps(self, request, slug=None):
+        """Playback OTPs for the next lessons of a part, fetched concurrently"""
+        try:
+            limit = int(request.query_params.get("limit", settings.VDOCIPHER_OTP_PREFETCH_LIMIT))
+        except ValueError:
+            raise ValidationError({"limit": "Must be an integer."})
+        limit = max(1, min(limit, settings.VDOCIPHER_OTP_PREFETCH_LIMIT))
 
-class LessonViewSet(viewsets.ModelViewSet):
+        part = await CoursePart.objects.filter(slug=slug).only("id", "course_id").afirst()
+        if part is None:
+            raise NotFound()
+
+        lessons = Lesson.objects.filter(part=part).only(
+            "id", "slug", "order", "video_service_id", "is_free_preview"
+        )
+        after = request.query_params.get("after")
+        if after:
+            current = await lessons.filter(slug=after).afirst()
+            if current is None:
+                raise NotFound()
+            lessons = lessons.filter(order__gt=current.order)
+
+        # One entitlement check for the whole part; without it only free
+        # previews can be played.
+        if not await ais_enrolled(request.user, part.course_id):
+            lessons = lessons.filter(is_free_preview=True)
+
+        lessons = [lesson async for lesson in lessons.order_by("order")[:limit]]
+        otps = await aget_video_otps([lesson.video_service_id for lesson in lessons], request.user)
+
+        return Response([
+            {"id": lesson.id, "slug": lesson.slug, **otps[lesson.video_service_id]}
+            for lesson in lessons
+            if lesson.video_service_id in otps
+        ])
+
+
+class LessonViewSet(AsyncModelViewSet):
     queryset = Lesson.objects.all()
     serializer_class = LessonSerializer
     lookup_field = "slug"
@@ -50,38 +104,60 @@ class LessonViewSet(viewsets.ModelViewSet):
             return LessonSerializer
         return LessonDetailSerializer
 
-    def retrieve(self, request, slug=None, *args, **kwargs):
-        lesson = Lesson.objects.filter(slug=slug).first()
-        enrollment = None
-
-        try: enrollment = Enrollment.objects.filter(course=lesson.part.course, student=request.user).first()
-        except Exception as e: logger.error(e)
-
-        not_allowed = not enrollment and not lesson.is_free_preview if lesson else True
-
-        if not_allowed:
+    async def retrieve(self, request, slug=None, *args, **kwargs):
+        lesson = await Lesson.objects.with_access(request.user).filter(slug=slug).afirst()
+        if lesson is None or not lesson.is_accessible:
             return Response(status=404)
 
         serializer = self.get_serializer(lesson)
 
         data = serializer.data
 
-        payload_str = json.dumps({"ttl": 300})
+        try:
+            data.update(await aget_video_otp(lesson.video_service_id, request.user))
+        except VdoCipherError as e:
+            logger.error(f"VdoCipher OTP error for lesson {lesson.slug}: {e.status_code} - {e.details}")
+
+        return Response(data)
 
-        response = requests.post(
-            url=f"https://dev.vdocipher.com/api/videos/{lesson.video_service_id}/otp",
-            headers=settings.VDOCIPHER_HEADERS,
-            data=payload_str
+    @action(detail=True, methods=["get"])
+    def comments(self, request, slug=None):
+        """The lesson's comments, newest first, with keyset pagination"""
+        lesson_id = Lesson.objects.filter(slug=slug).values_list("id", flat=True).first()
+        if lesson_id is None:
+            raise NotFound()
+
+        queryset = Comment.objects.filter(lesson_id=lesson_id).select_related("user").only(
+            "id", "text", "created_at", "user__id", "user__first_name", "user__last_name"
         )
-        json_response = response.json()
-        data.update(json_response)
+        paginator = CreatedAtCursorPagination()
+        page = paginator.paginate_queryset(queryset, request, view=self)
+        return paginator.get_paginated_response(LessonCommentSerializer(page, many=True).data)
 
-        return Response(data)
+    @action(detail=True, methods=["get", "post"])
+    def progress(self, request, slug=None):
+        """
+        GET the learner's resume position for the lesson; POST a player
+        heartbeat. Heartbeats are buffered and written in bulk, so they are
+        answered with 202 before reaching the database.
+        """
+        lesson = Lesson.objects.with_access(request.user).filter(slug=slug).first()
+        if lesson is None or not lesson.is_accessible:
+            raise NotFound()
+
+        if request.method == "GET":
+            return Response(get_progress(request.user, lesson))
+
+        serializer = LessonProgressSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        record_progress(request.user, lesson, **serializer.validated_data)
+        return Response(status=202)
 
 
 class CommentViewSet(viewsets.ModelViewSet):
     queryset = Comment.objects.all()
     serializer_class = CommentSerializer
+    pagination_class = SelectablePagination
 
     def get_queryset(self):
         queryset = super().get_queryset()
@@ -91,24 +167,163 @@ class CommentViewSet(viewsets.ModelViewSet):
 class EnrollmentViewSet(viewsets.ModelViewSet):
     queryset = Enrollment.objects.all()
     serializer_class = EnrollmentSerializer
+    pagination_class = SelectablePagination
     http_method_names = ["get"]
 
     def get_queryset(self):
         queryset = Enrollment.objects.filter(student=self.request.user)
         return queryset.order_by("-enrolled_at")
 
+    @action(detail=False, methods=["get"])
+    def dashboard(self, request):
+        """Compact "my learning" cards for the learner home page"""
+        entries = get_dashboard(request.user)
+        # Cached entries are request-independent; resolve thumbnails against
+        # this request the way the serializer would have.
+        return Response([
+            {
+                **entry,
+                "course": {
+                    **entry["course"],
+                    "thumbnail": entry["course"]["thumbnail"]
+                    and request.build_absolute_uri(entry["course"]["thumbnail"]),
+                },
+            }
+            for entry in entries
+        ])
+
+    @action(detail=False, methods=["get"])
+    def export(self, request):
+        """Enrollments as a streamed CSV or NDJSON file: all for admins, a tutor's own courses otherwise"""
+        serializer = ExportSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        tutor = export_tutor(request.user, params["tutor"])
+        queryset = enrollments_export(params["since"], params["until"], tutor)
+        return export_response(request, queryset, ENROLLMENT_COLUMNS, params["output"], "enrollments")
+
 
-class CourseViewSet(viewsets.ModelViewSet):
+class CourseViewSet(ConditionalGetMixin, viewsets.ModelViewSet):
     permission_classes = [permissions.AllowAny]
     queryset = Course.objects.all()
     serializer_class = CourseSerializer
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = CourseFilter
     lookup_field = "slug"
 
     def get_queryset(self):
         queryset = super().get_queryset()
+        if self.action == "list":
+            queryset = queryset.for_catalog()
         return queryset.order_by("-created_at")
 
     def get_serializer_class(self):
         if self.action == "list":
             return CourseSerializer
         return CourseDetailSerializer
+
+    def get_validator_querysets(self):
+        # Catalog cards also render part titles, category and tutor names,
+        # and the free-preview filter and facet depend on lessons.
+        return [
+            Course.objects.all(),
+            CoursePart.objects.all(),
+            Category.objects.all(),
+            Lesson.objects.all(),
+            User.objects.filter(pk__in=Course.tutors.through.objects.values("user_id")),
+        ]
+
+    def get_validator_fingerprint(self, request):
+        if self.action != "retrieve":
+            return []
+        course = get_course_detail(self.kwargs["slug"])
+        return [course is not None and is_enrolled(request.user, course["id"])]
+
+    def retrieve(self, request, slug=None, *args, **kwargs):
+        return self.conditional_response(self.get_course, request, slug=slug)
+
+    def get_course(self, request, slug=None):
+        course = get_course_detail(slug)
+        if course is None:
+            raise NotFound()
+
+        # The cached tree is request-independent; resolve the thumbnail
+        # against this request the way the serializer would have.
+        thumbnail = course["thumbnail"] and request.build_absolute_uri(course["thumbnail"])
+
+        return Response({
+            **course,
+            "thumbnail": thumbnail,
+            "is_enrolled": is_enrolled(request.user, course["id"]),
+        })
+
+    @action(
+        detail=False,
+        methods=["post"],
+        url_path="import",
+        permission_classes=[permissions.IsAuthenticated],
+    )
+    def import_manifest(self, request):
+        """Create a course with all its parts and lessons from one manifest"""
+        if "file" in request.FILES:
+            lines = (line.decode("utf-8-sig") for line in request.FILES["file"])
+            course_fields = {field: value for field, value in request.data.items() if field != "file"}
+            try:
+                manifest = manifest_from_csv(lines, **course_fields)
+            except (ManifestError, UnicodeDecodeError) as e:
+                raise ValidationError({"file": str(e)})
+        else:
+            manifest = request.data
+
+        serializer = CourseManifestSerializer(data=manifest)
+        serializer.is_valid(raise_exception=True)
+        try:
+            course = import_course(serializer.validated_data, tutors=[request.user])
+        except ManifestError as e:
+            raise ValidationError({"detail": str(e)})
+
+        lessons_count = sum(len(part["lessons"]) for part in serializer.validated_data["parts"])
+        return Response({"id": course.id, "slug": course.slug, "lessons_count": lessons_count}, status=201)
+
+    @action(
+        detail=False,
+        methods=["get"],
+        permission_classes=[permissions.IsAuthenticated],
+        pagination_class=SelectablePagination,
+    )
+    def stats(self, request):
+        """
+        Catalog cards with lesson, comment, tutor, enrollment and payment
+        counts: every course for admins, a tutor's own courses otherwise.
+        """
+        user = request.user
+        is_admin = user.is_staff or user.role == User.RoleChoices.ADMIN
+        key = "courses:stats:{}:{}".format(
+            "all" if is_admin else user.pk,
+            hashlib.md5(request.get_full_path().encode()).hexdigest(),
+        )
+
+        data = cache.get(key)
+        if data is None:
+            # with_stats() counts in subqueries, so the tutor filter doesn't
+            # change number_of_tutors.
+            queryset = Course.objects.for_catalog().with_stats().order_by("-created_at")
+            if not is_admin:
+                queryset = queryset.filter(tutors=user)
+            page = self.paginate_queryset(queryset)
+            serializer = CourseStatsSerializer(page, many=True, context={"request": request})
+            data = self.get_paginated_response(serializer.data).data
+            cache.set(key, data, timeout=settings.COURSE_STATS_CACHE_TIMEOUT)
+
+        return Response(data)
+
+    @action(detail=False, methods=["get"])
+    def facets(self, request):
+        """Counts per catalog filter value, e.g. for the catalog sidebar"""
+        return self.conditional_response(self.get_facets, request)
+
+    def get_facets(self, request):
+        filterset = CourseFilter(request.query_params, queryset=Course.objects.all())
+        if not filterset.is_valid():
+            raise ValidationError(filterset.errors)
+        return Response(course_facets(request.query_params, Course.objects.all()))
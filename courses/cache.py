@@ -0,0 +1,51 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+# Bump whenever the shape of CourseDetailSerializer changes so that stale
+# trees written by the previous release are never served.
+COURSE_DETAIL_CACHE_VERSION = 1
+
+
+def course_detail_cache_key(slug):
+    return f"courses:detail:{slug}"
+
+
+def get_course_detail(slug):
+    """
+    Return the user-independent course tree (course, tutors, parts, lessons)
+    for the given slug, building and caching it on a miss.
+    Returns None when no course has that slug.
+    """
+    from courses.api.serializers import CourseDetailSerializer
+    from courses.models import Course
+
+    key = course_detail_cache_key(slug)
+    data = cache.get(key, version=COURSE_DETAIL_CACHE_VERSION)
+    if data is not None:
+        return data
+
+    course = Course.objects.for_detail().filter(slug=slug).first()
+    if course is None:
+        return None
+
+    data = dict(CourseDetailSerializer(course).data)
+    cache.set(
+        key,
+        data,
+        timeout=settings.COURSE_DETAIL_CACHE_TIMEOUT,
+        version=COURSE_DETAIL_CACHE_VERSION,
+    )
+    return data
+
+
+def invalidate_course_detail(*slugs):
+    """
+    Drop cached trees once the surrounding transaction commits, so a reader
+    can't repopulate the cache with rows that are about to change.
+    """
+    keys = [course_detail_cache_key(slug) for slug in set(slugs) if slug]
+    if keys:
+        transaction.on_commit(
+            lambda: cache.delete_many(keys, version=COURSE_DETAIL_CACHE_VERSION)
+        )
@@ -0,0 +1,82 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db.models import Count, DecimalField, DurationField, F, IntegerField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+from courses.models import Comment, Course, CoursePart, Enrollment, Lesson
+
+
+def bump_course_counters(courses, **deltas):
+    """
+    Atomically add `deltas` (counter field -> amount, may be negative) to
+    the counters of `courses`, a course id or a Course queryset. A single
+    UPDATE ... SET field = field + delta, so concurrent writers never lose
+    increments.
+    """
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if not deltas or courses is None:
+        return
+    if not hasattr(courses, "update"):
+        courses = Course.objects.filter(pk=courses)
+    courses.update(**{field: F(field) + delta for field, delta in deltas.items()})
+
+
+def course_id_for_part(part_id):
+    return CoursePart.objects.filter(pk=part_id).values_list("course_id", flat=True).first()
+
+
+def course_id_for_lesson(lesson_id):
+    return Lesson.objects.filter(pk=lesson_id).values_list("part__course_id", flat=True).first()
+
+
+def _count(queryset, course_path):
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{course_path: OuterRef("pk")})
+            .order_by()
+            .values(course_path)
+            .annotate(total=Count("pk"))
+            .values("total")
+        ),
+        0,
+        output_field=IntegerField(),
+    )
+
+
+def recompute_course_counters(courses=None):
+    """
+    Rebuild every stored counter from the source tables with one UPDATE of
+    correlated subqueries. Repairs drift from writes that bypass signals
+    (raw SQL, queryset.update(), SET_NULL cascades, parts moved between
+    courses). Returns the number of courses updated.
+    """
+    from payments.models import Payment
+
+    if courses is None:
+        courses = Course.objects.all()
+
+    lessons = Lesson.objects.filter(part__course=OuterRef("pk")).order_by().values("part__course")
+    revenue = (
+        Payment.objects.filter(order__courses=OuterRef("pk"), status=Payment.StatusChoices.COMPLETED)
+        .order_by()
+        .values("order__courses")
+        .annotate(total=Sum("amount"))
+        .values("total")
+    )
+
+    return courses.update(
+        lessons_count=_count(Lesson.objects.all(), "part__course"),
+        enrollments_count=_count(Enrollment.objects.all(), "course"),
+        comments_count=_count(Comment.objects.all(), "lesson__part__course"),
+        total_duration=Coalesce(
+            Subquery(lessons.annotate(total=Sum("duration")).values("total")),
+            timedelta(0),
+            output_field=DurationField(),
+        ),
+        completed_revenue=Coalesce(
+            Subquery(revenue),
+            Decimal("0"),
+            output_field=DecimalField(max_digits=12, decimal_places=2),
+        ),
+    )
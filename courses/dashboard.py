@@ -0,0 +1,109 @@
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+# Bump whenever the shape of the dashboard entries changes.
+DASHBOARD_CACHE_VERSION = 3
+
+
+def dashboard_cache_key(user_id):
+    return f"courses:dashboard:{user_id}"
+
+
+def course_version_key(course_id):
+    return f"courses:dashboard:course:{course_id}"
+
+
+def get_course_versions(course_ids):
+    """The current version of each course, None for courses never edited."""
+    keys = {course_version_key(course_id): course_id for course_id in course_ids}
+    versions = cache.get_many(list(keys))
+    return {course_id: versions.get(key) for key, course_id in keys.items()}
+
+
+def build_dashboard(user):
+    from courses.api.serializers import DashboardEnrollmentSerializer
+    from courses.models import Enrollment, LessonProgress
+
+    progress = LessonProgress.objects.filter(student=user, course=OuterRef("course"))
+    completed = (
+        progress.filter(completed=True)
+        .order_by()
+        .values("course")
+        .annotate(total=Count("pk"))
+        .values("total")
+    )
+    last = progress.order_by("-last_watched_at")
+
+    enrollments = (
+        Enrollment.objects.filter(student=user)
+        .select_related("course")
+        .annotate(
+            completed_lessons=Coalesce(Subquery(completed), 0, output_field=IntegerField()),
+            last_lesson_slug=Subquery(last.values("lesson__slug")[:1]),
+            last_lesson_title=Subquery(last.values("lesson__title")[:1]),
+            last_lesson_position=Subquery(last.values("position")[:1]),
+        )
+        .only(
+            "id",
+            "enrolled_at",
+            "course__id",
+            "course__title",
+            "course__slug",
+            "course__thumbnail",
+            "course__lessons_count",
+            "course__total_duration",
+        )
+        .order_by("-enrolled_at")
+    )
+    return [dict(entry) for entry in DashboardEnrollmentSerializer(enrollments, many=True).data]
+
+
+def get_dashboard(user):
+    """
+    The learner home page: one entry per enrollment, newest first, with the
+    course card, progress and last lesson. Built in one query and cached per
+    user until their enrollments change, their lesson progress is flushed,
+    or one of their courses or its lessons is edited (see
+    invalidate_course_dashboards).
+    """
+    from courses.entitlements import get_enrolled_course_ids
+
+    key = dashboard_cache_key(user.pk)
+    cached = cache.get(key, version=DASHBOARD_CACHE_VERSION)
+    if cached is not None and get_course_versions(cached["course_versions"]) == cached["course_versions"]:
+        return cached["entries"]
+
+    # Versions are read before the rows, so an edit committed meanwhile
+    # leaves the entry already out of date rather than stale for the TTL.
+    course_versions = get_course_versions(get_enrolled_course_ids(user))
+    entries = build_dashboard(user)
+    cache.set(
+        key,
+        {"course_versions": course_versions, "entries": entries},
+        timeout=settings.DASHBOARD_CACHE_TIMEOUT,
+        version=DASHBOARD_CACHE_VERSION,
+    )
+    return entries
+
+
+def invalidate_dashboard(user_id):
+    key = dashboard_cache_key(user_id)
+    transaction.on_commit(lambda: cache.delete(key, version=DASHBOARD_CACHE_VERSION))
+
+
+def invalidate_course_dashboards(*course_ids):
+    """
+    Outdate the cached dashboards of everyone enrolled in `course_ids` by
+    moving the courses' versions once the surrounding transaction commits,
+    instead of finding and deleting each learner's entry.
+    """
+    keys = [course_version_key(course_id) for course_id in set(course_ids) if course_id]
+    if keys:
+        transaction.on_commit(
+            lambda: cache.set_many({key: uuid.uuid4().hex for key in keys}, timeout=None)
+        )
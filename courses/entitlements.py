@@ -0,0 +1,77 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+
+def entitlements_cache_key(user_id):
+    return f"courses:entitlements:{user_id}"
+
+
+def get_enrolled_course_ids(user):
+    """
+    Return the ids (as strings) of every course the user is enrolled in.
+
+    The set is memoized on the user object for the rest of the request and
+    cached across requests until an Enrollment for that user changes.
+    """
+    if not user or not user.is_authenticated:
+        return frozenset()
+
+    course_ids = getattr(user, "_enrolled_course_ids", None)
+    if course_ids is not None:
+        return course_ids
+
+    key = entitlements_cache_key(user.pk)
+    course_ids = cache.get(key)
+    if course_ids is None:
+        from courses.models import Enrollment
+
+        course_ids = frozenset(
+            str(course_id)
+            for course_id in Enrollment.objects.filter(student=user).values_list(
+                "course_id", flat=True
+            )
+        )
+        cache.set(key, course_ids, timeout=settings.ENTITLEMENTS_CACHE_TIMEOUT)
+
+    user._enrolled_course_ids = course_ids
+    return course_ids
+
+
+async def aget_enrolled_course_ids(user):
+    """Async version of get_enrolled_course_ids(), for async views."""
+    if not user or not user.is_authenticated:
+        return frozenset()
+
+    course_ids = getattr(user, "_enrolled_course_ids", None)
+    if course_ids is not None:
+        return course_ids
+
+    key = entitlements_cache_key(user.pk)
+    course_ids = await cache.aget(key)
+    if course_ids is None:
+        from courses.models import Enrollment
+
+        course_ids = frozenset([
+            str(course_id)
+            async for course_id in Enrollment.objects.filter(student=user).values_list(
+                "course_id", flat=True
+            )
+        ])
+        await cache.aset(key, course_ids, timeout=settings.ENTITLEMENTS_CACHE_TIMEOUT)
+
+    user._enrolled_course_ids = course_ids
+    return course_ids
+
+
+def is_enrolled(user, course_id):
+    return str(course_id) in get_enrolled_course_ids(user)
+
+
+async def ais_enrolled(user, course_id):
+    return str(course_id) in await aget_enrolled_course_ids(user)
+
+
+def invalidate_entitlements(user_id):
+    key = entitlements_cache_key(user_id)
+    transaction.on_commit(lambda: cache.delete(key))
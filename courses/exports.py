@@ -0,0 +1,21 @@
+from eleven_tutors.exports import in_range
+from courses.models import Enrollment
+
+ENROLLMENT_COLUMNS = (
+    "id",
+    "enrolled_at",
+    "student_id",
+    "student_email",
+    "course_id",
+    "course_title",
+)
+
+
+def enrollments_export(since=None, until=None, tutor=None):
+    """Enrollments oldest first, optionally only those in a tutor's courses."""
+    queryset = in_range(Enrollment.objects.all(), "created_at", since, until)
+    if tutor:
+        queryset = queryset.filter(course__tutors=tutor)
+    return queryset.order_by("created_at", "id").values_list(
+        "id", "enrolled_at", "student_id", "student__email", "course_id", "course__title"
+    )
@@ -0,0 +1,122 @@
+import csv
+import uuid
+
+from django.db import IntegrityError, transaction
+
+from courses.counters import recompute_course_counters
+from courses.models import Course, CoursePart, Lesson
+
+CSV_LESSON_FIELDS = ("title", "description", "video_service_id", "duration", "is_free_preview", "order")
+
+# A lesson whose slug is taken gets a fresh id; with Lesson.SLUG_ID_LENGTH
+# characters of it in the slug, a second round is already rare.
+LESSON_SLUG_ATTEMPTS = 8
+
+
+class ManifestError(ValueError):
+    pass
+
+
+def manifest_from_csv(lines, **course):
+    """
+    Build a course manifest from CSV with one row per lesson: a `part`
+    column plus the lesson columns in CSV_LESSON_FIELDS. Parts keep the order
+    in which they first appear. Course fields are passed as keyword arguments.
+    """
+    parts = {}
+    for row in csv.DictReader(lines):
+        part_title = (row.get("part") or "").strip()
+        if not part_title:
+            raise ManifestError("Every row needs a part")
+        lesson = {
+            field: row[field].strip()
+            for field in CSV_LESSON_FIELDS
+            if row.get(field) and row[field].strip()
+        }
+        parts.setdefault(part_title, {"title": part_title, "lessons": []})["lessons"].append(lesson)
+    return {**course, "parts": list(parts.values())}
+
+
+def assign_lesson_slugs(lessons):
+    taken = set()
+    pending = lessons
+    for _ in range(LESSON_SLUG_ATTEMPTS):
+        existing = set(
+            Lesson.objects.filter(slug__in=[lesson.slug for lesson in pending]).values_list("slug", flat=True)
+        )
+        retry = []
+        for lesson in pending:
+            if lesson.slug in taken or lesson.slug in existing:
+                lesson.id = uuid.uuid4()
+                lesson.slug = Lesson.build_slug(lesson.id, lesson.title)
+                retry.append(lesson)
+            else:
+                taken.add(lesson.slug)
+        if not retry:
+            return
+        pending = retry
+
+    titles = sorted({lesson.title for lesson in pending})
+    raise ManifestError(f"Could not find free slugs for lessons: {', '.join(titles)}")
+
+
+def build_rows(manifest):
+    course_fields = {field: value for field, value in manifest.items() if field != "parts"}
+    course = Course(**course_fields)
+    course.slug = Course.build_slug(course.title)
+
+    parts, lessons = [], []
+    for part_index, part_data in enumerate(manifest["parts"]):
+        part_fields = {field: value for field, value in part_data.items() if field != "lessons"}
+        part_fields.setdefault("order", part_index)
+        part = CoursePart(course=course, **part_fields)
+        part.slug = CoursePart.build_slug(course.title, part.title)
+        parts.append(part)
+
+        for lesson_index, lesson_data in enumerate(part_data["lessons"]):
+            lesson = Lesson(part=part, **{"order": lesson_index, **lesson_data})
+            lesson.slug = Lesson.build_slug(lesson.id, lesson.title)
+            lessons.append(lesson)
+
+    return course, parts, lessons
+
+
+def import_course(manifest, tutors=()):
+    """
+    Create a course with all its parts and lessons from a validated
+    manifest (see CourseManifestSerializer) and return it.
+
+    Slugs and order are computed up front and the rows are written with one
+    bulk_create per table inside one transaction, so the cost does not grow
+    with a save() and its signals per row. Counters are recomputed once at
+    the end; the course detail cache is invalidated by the course's own
+    save() on commit.
+
+    The slug checks run inside the transaction, and a concurrent import
+    that takes a slug between check and insert is caught by the unique
+    constraints, so either way the import fails as a whole with a
+    ManifestError.
+    """
+    course, parts, lessons = build_rows(manifest)
+
+    try:
+        with transaction.atomic():
+            check_slugs(course, parts)
+            assign_lesson_slugs(lessons)
+            course.save()
+            course.tutors.add(*tutors)
+            CoursePart.objects.bulk_create(parts)
+            Lesson.objects.bulk_create(lessons, batch_size=1000)
+            recompute_course_counters(Course.objects.filter(pk=course.pk))
+    except IntegrityError as e:
+        raise ManifestError(f"The course clashes with one saved meanwhile: {e}") from e
+
+    return course
+
+
+def check_slugs(course, parts):
+    if Course.objects.filter(slug=course.slug).exists():
+        raise ManifestError(f"A course with slug {course.slug!r} already exists")
+    part_slugs = [part.slug for part in parts]
+    if len(set(part_slugs)) != len(part_slugs) or CoursePart.objects.filter(slug__in=part_slugs).exists():
+        raise ManifestError("Part titles must be unique within the course")
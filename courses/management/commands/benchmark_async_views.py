@@ -0,0 +1,138 @@
+import asyncio
+import json
+import statistics
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.core.management.base import BaseCommand
+from django.test import AsyncClient, Client, override_settings
+from django.urls import reverse
+from rest_framework_simplejwt.tokens import AccessToken
+
+from courses import vdocipher
+from users.models import User
+
+
+class FakeVdoCipherHandler(BaseHTTPRequestHandler):
+    """Answers every OTP request after `latency` seconds."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+    latency = 0.2
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length") or 0))
+        time.sleep(self.latency)
+        body = json.dumps({"otp": uuid.uuid4().hex, "playbackInfo": "benchmark"}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class FakeVdoCipherServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+
+class Command(BaseCommand):
+    help = (
+        "Serve a fake VdoCipher with injected latency and compare throughput of "
+        "the video OTP endpoint through the WSGI handler (a fixed pool of sync "
+        "workers) and the ASGI handler (a single event loop)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--latency", type=int, default=200, help="Upstream latency in ms.")
+        parser.add_argument("--requests", type=int, default=400)
+        parser.add_argument(
+            "--wsgi-workers", type=int, default=9, help="Concurrent sync workers (gunicorn workers x threads)."
+        )
+        parser.add_argument("--concurrency", type=int, default=200, help="In-flight requests on the ASGI loop.")
+
+    def handle(self, *args, **options):
+        handler = type("Handler", (FakeVdoCipherHandler,), {"latency": options["latency"] / 1000})
+        server = FakeVdoCipherServer(("127.0.0.1", 0), handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        user = User.objects.create_user(email=f"benchmark-{uuid.uuid4().hex}@example.com")
+        headers = {"Authorization": f"Bearer {AccessToken.for_user(user)}"}
+        run = uuid.uuid4().hex[:8]
+
+        def paths(mode):
+            # A fresh video id per request, so every call misses the OTP cache.
+            return [
+                reverse("vdocipher-video-otp", kwargs={"video_id": f"benchmark-{run}-{mode}-{index}"})
+                for index in range(options["requests"])
+            ]
+
+        try:
+            with override_settings(
+                VDOCIPHER_API_URL=f"http://127.0.0.1:{server.server_port}",
+                CACHES={"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}},
+            ):
+                self.stdout.write(
+                    f"{options['requests']} OTP requests, upstream latency {options['latency']} ms"
+                )
+                self.report(
+                    f"wsgi ({options['wsgi_workers']} workers)",
+                    *self.run_wsgi(paths("wsgi"), options["wsgi_workers"], headers),
+                )
+                self.report(
+                    f"asgi ({options['concurrency']} in flight)",
+                    *asyncio.run(self.run_asgi(paths("asgi"), options["concurrency"], headers)),
+                )
+        finally:
+            server.shutdown()
+            user.delete()
+
+    def run_wsgi(self, paths, workers, headers):
+        local = threading.local()
+
+        def fetch(path):
+            if not hasattr(local, "client"):
+                local.client = Client()
+            started = time.perf_counter()
+            response = local.client.get(path, headers=headers)
+            return time.perf_counter() - started, response.status_code
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            results = list(pool.map(fetch, paths))
+        return results, time.perf_counter() - started
+
+    async def run_asgi(self, paths, concurrency, headers):
+        # Stand in for eleven_tutors.asgi, which this process never imports.
+        vdocipher.use_async_clients()
+        client = AsyncClient()
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def fetch(path):
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.get(path, headers=headers)
+                return time.perf_counter() - started, response.status_code
+
+        started = time.perf_counter()
+        try:
+            results = await asyncio.gather(*(fetch(path) for path in paths))
+            return results, time.perf_counter() - started
+        finally:
+            await vdocipher.get_async_client().session.aclose()
+            vdocipher.use_async_clients(False)
+
+    def report(self, label, results, elapsed):
+        timings = sorted(duration * 1000 for duration, _ in results)
+        errors = sum(1 for _, status in results if status != 200)
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        self.stdout.write(
+            f"{label:<24} {len(results) / elapsed:8.1f} req/s   "
+            f"median {statistics.median(timings):8.2f} ms   p95 {p95:8.2f} ms   errors {errors}"
+        )
@@ -0,0 +1,99 @@
+import statistics
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+
+from courses.models import Course, CoursePart, Enrollment, Lesson
+from users.models import User
+
+
+def lazy_access(slug, user):
+    """The access check LessonViewSet.retrieve used to run."""
+    lesson = Lesson.objects.filter(slug=slug).first()
+    if lesson is None:
+        return None, False
+    course = lesson.part.course
+    if lesson.is_free_preview:
+        return lesson, True
+    return lesson, Enrollment.objects.filter(student=user, course=course).exists()
+
+
+def annotated_access(slug, user):
+    lesson = Lesson.objects.with_access(user).filter(slug=slug).first()
+    return lesson, bool(lesson and lesson.is_accessible)
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed enrolled and unenrolled lessons inside a transaction, compare query "
+        "counts and latency of the lazy and the annotated lesson access check, "
+        "and roll everything back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--courses", type=int, default=200)
+        parser.add_argument("--lessons-per-course", type=int, default=50)
+        parser.add_argument("--runs", type=int, default=500)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            user, samples = self.seed(options["courses"], options["lessons_per_course"])
+            self.stdout.write(f"{len(samples)} sample lessons ({connection.vendor})")
+
+            for label, check in (("lazy", lazy_access), ("annotated", annotated_access)):
+                self.report(label, check, user, samples, options["runs"])
+
+            transaction.set_rollback(True)
+
+    def seed(self, course_count, lessons_per_course):
+        user = User.objects.create_user(email=f"benchmark-{uuid.uuid4().hex}@example.com")
+        courses = Course.objects.bulk_create(
+            Course(title=f"Benchmark course {index}", slug=f"benchmark-course-{uuid.uuid4().hex}", price=10)
+            for index in range(course_count)
+        )
+        parts = CoursePart.objects.bulk_create(
+            CoursePart(course=course, title="Part", slug=f"benchmark-part-{uuid.uuid4().hex}")
+            for course in courses
+        )
+        lessons = Lesson.objects.bulk_create(
+            (
+                Lesson(
+                    part=part,
+                    title=f"Lesson {order}",
+                    slug=f"benchmark-lesson-{uuid.uuid4().hex}",
+                    order=order,
+                    is_free_preview=order == 0,
+                )
+                for part in parts
+                for order in range(lessons_per_course)
+            ),
+            batch_size=5000,
+        )
+        Enrollment.objects.bulk_create(Enrollment(student=user, course=course) for course in courses[::2])
+
+        # Each course's free preview and first paid lesson, alternating
+        # between enrolled and unenrolled courses, so every branch of the
+        # check is exercised.
+        samples = [lesson.slug for lesson in lessons if lesson.order < 2]
+        return user, samples
+
+    def report(self, label, check, user, samples, runs):
+        with CaptureQueriesContext(connection) as queries:
+            decisions = [check(slug, user)[1] for slug in samples]
+        per_check = len(queries) / len(samples)
+
+        timings = []
+        for index in range(runs):
+            slug = samples[index % len(samples)]
+            started = time.perf_counter()
+            check(slug, user)
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        self.stdout.write(
+            f"{label:<10} {per_check:4.1f} queries/check   allowed {sum(decisions)}/{len(decisions)}   "
+            f"median {statistics.median(timings):8.3f} ms   p95 {p95:8.3f} ms"
+        )
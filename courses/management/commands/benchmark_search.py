@@ -0,0 +1,122 @@
+import random
+import statistics
+import time
+import uuid
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from courses.models import Course, CoursePart, Lesson
+from courses.search import search_courses, search_lessons, uses_full_text_search
+
+VOCABULARY = (
+    "algebra calculus geometry statistics probability matrix vector integral derivative "
+    "limit series function graph theorem proof equation variable python javascript "
+    "database network security algorithm recursion sorting search tree heap queue stack "
+    "economics market supply demand inflation interest policy finance accounting budget "
+    "chemistry molecule reaction organic physics energy momentum force wave quantum "
+    "biology cell genetics evolution ecology anatomy history empire revolution war "
+    "literature poetry novel essay grammar vocabulary writing reading introduction "
+    "advanced practice exam review project lab tutorial workshop fundamentals"
+).split()
+
+QUERIES = ("calculus", "python recursion", "market inflation", "quantum energy", "exam review")
+
+
+def sentence(rng, low, high):
+    return " ".join(rng.choices(VOCABULARY, k=rng.randint(low, high)))
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a synthetic catalog inside a transaction, time course and lesson "
+        "search against it and roll everything back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--lessons", type=int, default=100_000)
+        parser.add_argument("--lessons-per-part", type=int, default=10)
+        parser.add_argument("--parts-per-course", type=int, default=10)
+        parser.add_argument("--runs", type=int, default=20)
+        parser.add_argument("--seed", type=int, default=11)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+
+        with transaction.atomic():
+            started = time.perf_counter()
+            self.seed(rng, **options)
+            self.stdout.write(
+                f"Seeded {options['lessons']} lessons in {time.perf_counter() - started:.1f}s "
+                f"({connection.vendor})"
+            )
+
+            modes = [("icontains", False)]
+            if uses_full_text_search():
+                with connection.cursor() as cursor:
+                    cursor.execute("ANALYZE courses_course; ANALYZE courses_lesson;")
+                modes.insert(0, ("full-text", True))
+
+            for label, full_text in modes:
+                for query in QUERIES:
+                    self.report(label, "courses", query, options["runs"],
+                                lambda: list(search_courses(query, full_text)[:20]))
+                    self.report(label, "lessons", query, options["runs"],
+                                lambda: list(search_lessons(query, full_text)[:20]))
+
+            transaction.set_rollback(True)
+
+    def seed(self, rng, lessons, lessons_per_part, parts_per_course, **options):
+        lessons_per_course = lessons_per_part * parts_per_course
+        course_count = max(1, lessons // lessons_per_course)
+
+        courses = [
+            Course(
+                title=sentence(rng, 2, 5),
+                slug=f"benchmark-course-{index}",
+                description=sentence(rng, 30, 80),
+                price=rng.choice((0, 19, 49, 99)),
+            )
+            for index in range(course_count)
+        ]
+        Course.objects.bulk_create(courses, batch_size=1000)
+
+        parts = [
+            CoursePart(
+                course=course,
+                title=sentence(rng, 2, 4),
+                slug=f"{course.slug}--part-{order}",
+                order=order,
+            )
+            for course in courses
+            for order in range(parts_per_course)
+        ]
+        CoursePart.objects.bulk_create(parts, batch_size=5000)
+
+        Lesson.objects.bulk_create(
+            (
+                Lesson(
+                    part=part,
+                    title=sentence(rng, 3, 6),
+                    slug=f"benchmark-lesson-{uuid.uuid4().hex}",
+                    description=sentence(rng, 20, 60),
+                    order=order,
+                )
+                for part in parts
+                for order in range(lessons_per_part)
+            ),
+            batch_size=5000,
+        )
+
+    def report(self, label, kind, query, runs, execute):
+        timings = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            execute()
+            timings.append((time.perf_counter() - started) * 1000)
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        self.stdout.write(
+            f"{label:<10} {kind:<8} {query!r:<22} "
+            f"median {statistics.median(timings):8.2f} ms   p95 {p95:8.2f} ms"
+        )
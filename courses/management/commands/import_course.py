@@ -0,0 +1,61 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from courses.api.serializers import CourseManifestSerializer
+from courses.importer import ManifestError, import_course, manifest_from_csv
+from users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        "Import a course with all its parts and lessons from a JSON manifest, "
+        "or from a CSV with one row per lesson plus the course fields as options."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("manifest", help="Path to a .json or .csv manifest")
+        parser.add_argument("--tutor", action="append", default=[], help="Tutor email (repeatable)")
+        parser.add_argument("--title", help="Course title (CSV manifests)")
+        parser.add_argument("--description", help="Course description (CSV manifests)")
+        parser.add_argument("--price", help="Course price (CSV manifests)")
+        parser.add_argument("--category", help="Category slug (CSV manifests)")
+        parser.add_argument("--publish", action="store_true", help="Publish the course (CSV manifests)")
+
+    def handle(self, *args, **options):
+        path = options["manifest"]
+        try:
+            with open(path, encoding="utf-8-sig", newline="") as file:
+                if path.endswith(".csv"):
+                    course_fields = {
+                        field: options[field]
+                        for field in ("title", "description", "price", "category")
+                        if options[field] is not None
+                    }
+                    manifest = manifest_from_csv(file, is_published=options["publish"], **course_fields)
+                else:
+                    manifest = json.load(file)
+        except (OSError, ValueError) as e:
+            raise CommandError(f"Could not read {path}: {e}")
+
+        tutors = list(User.objects.filter(email__in=options["tutor"]))
+        missing = set(options["tutor"]) - {tutor.email for tutor in tutors}
+        if missing:
+            raise CommandError(f"No users with email: {', '.join(sorted(missing))}")
+
+        serializer = CourseManifestSerializer(data=manifest)
+        if not serializer.is_valid():
+            raise CommandError(json.dumps(serializer.errors, indent=2))
+
+        started = time.perf_counter()
+        try:
+            course = import_course(serializer.validated_data, tutors=tutors)
+        except ManifestError as e:
+            raise CommandError(str(e))
+
+        lessons_count = sum(len(part["lessons"]) for part in serializer.validated_data["parts"])
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {course.slug} ({len(serializer.validated_data['parts'])} parts, "
+            f"{lessons_count} lessons) in {time.perf_counter() - started:.2f}s"
+        ))
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from courses.counters import recompute_course_counters
+from courses.models import Course
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the denormalized Course counters (lessons, enrollments, "
+        "comments, total duration, completed revenue) from the source tables."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "slugs", nargs="*", help="Only recompute these courses (default: all)"
+        )
+
+    def handle(self, *args, **options):
+        courses = Course.objects.all()
+        if options["slugs"]:
+            courses = courses.filter(slug__in=options["slugs"])
+
+        updated = recompute_course_counters(courses)
+        self.stdout.write(self.style.SUCCESS(f"Recomputed counters for {updated} course(s)"))
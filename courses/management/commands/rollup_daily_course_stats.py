@@ -0,0 +1,53 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from courses.models import Course
+from courses.rollups import rebuild_daily_stats
+
+CHUNK_DAYS = 31
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the daily course rollups (enrollments, comments, payments, "
+        "completed revenue) from the source tables. Defaults to yesterday and "
+        "today; use --since to backfill."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "slugs", nargs="*", help="Only rebuild these courses (default: all)"
+        )
+        parser.add_argument("--days", type=int, default=2, help="Rebuild the last N days")
+        parser.add_argument("--since", help="Rebuild from this date (YYYY-MM-DD) instead")
+        parser.add_argument("--until", help="Rebuild up to this date (default: today)")
+
+    def handle(self, *args, **options):
+        try:
+            until = date.fromisoformat(options["until"]) if options["until"] else timezone.localdate()
+            since = (
+                date.fromisoformat(options["since"])
+                if options["since"]
+                else until - timedelta(days=options["days"] - 1)
+            )
+        except ValueError as e:
+            raise CommandError(f"Invalid date: {e}")
+        if since > until:
+            raise CommandError("--since must not be after --until")
+
+        courses = None
+        if options["slugs"]:
+            courses = Course.objects.filter(slug__in=options["slugs"])
+
+        # Chunks keep each transaction and grouped query small during long
+        # backfills.
+        rows = 0
+        start = since
+        while start <= until:
+            end = min(until, start + timedelta(days=CHUNK_DAYS - 1))
+            rows += rebuild_daily_stats(start, end, courses)
+            start = end + timedelta(days=1)
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {rows} rollup row(s) from {since} to {until}"))
@@ -0,0 +1,79 @@
+# Generated by Django 5.2.1 on 2026-10-16 20:44
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+# PostgreSQL keeps search_vector current through BEFORE INSERT/UPDATE
+# triggers, so bulk_create() and queryset.update() stay indexed too. Other
+# backends (SQLite in tests) leave the column NULL and courses.search falls
+# back to icontains matching.
+SEARCH_TABLES = {
+    "courses_course": "courses_course_search_vector",
+    "courses_lesson": "courses_lesson_search_vector",
+}
+
+CREATE_SQL = """
+CREATE FUNCTION {name}_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(NEW.description, '')), 'B');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER {name}_trigger
+    BEFORE INSERT OR UPDATE OF title, description ON {table}
+    FOR EACH ROW EXECUTE FUNCTION {name}_update();
+
+UPDATE {table} SET search_vector =
+    setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+    setweight(to_tsvector('english', coalesce(description, '')), 'B');
+
+CREATE INDEX {name}_idx ON {table} USING gin (search_vector);
+"""
+
+DROP_SQL = """
+DROP INDEX IF EXISTS {name}_idx;
+DROP TRIGGER IF EXISTS {name}_trigger ON {table};
+DROP FUNCTION IF EXISTS {name}_update();
+"""
+
+
+def create_search_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for table, name in SEARCH_TABLES.items():
+        schema_editor.execute(CREATE_SQL.format(table=table, name=name))
+
+
+def drop_search_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+    for table, name in SEARCH_TABLES.items():
+        schema_editor.execute(DROP_SQL.format(table=table, name=name))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("courses", "0004_comment_comment_created_at_id_idx_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="course",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="lesson",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(create_search_triggers, drop_search_triggers),
+    ]
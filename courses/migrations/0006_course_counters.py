@@ -0,0 +1,41 @@
+# Generated by Django 5.2.1 on 2026-10-16 20:49
+
+import datetime
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("courses", "0005_search_vectors"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="course",
+            name="comments_count",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="course",
+            name="completed_revenue",
+            field=models.DecimalField(
+                decimal_places=2, default=0, editable=False, max_digits=12
+            ),
+        ),
+        migrations.AddField(
+            model_name="course",
+            name="enrollments_count",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="course",
+            name="lessons_count",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="course",
+            name="total_duration",
+            field=models.DurationField(default=datetime.timedelta(0), editable=False),
+        ),
+    ]
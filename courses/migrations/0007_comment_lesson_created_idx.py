@@ -0,0 +1,20 @@
+# Generated by Django 5.2.1 on 2026-10-16 21:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("courses", "0006_course_counters"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                fields=["lesson", "-created_at", "-id"],
+                name="comment_lesson_created_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.1 on 2026-10-16 21:40
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("courses", "0008_lessonprogress"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DailyCourseStats",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("date", models.DateField()),
+                ("enrollments", models.IntegerField(default=0)),
+                ("comments", models.IntegerField(default=0)),
+                ("completed_payments", models.IntegerField(default=0)),
+                (
+                    "completed_revenue",
+                    models.DecimalField(decimal_places=2, default=0, max_digits=12),
+                ),
+                ("failed_payments", models.IntegerField(default=0)),
+                ("pending_payments", models.IntegerField(default=0)),
+                (
+                    "course",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="daily_stats",
+                        to="courses.course",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(fields=["date"], name="daily_course_stats_date_idx")
+                ],
+                "unique_together": {("course", "date")},
+            },
+        ),
+    ]
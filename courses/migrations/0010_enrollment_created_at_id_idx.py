@@ -0,0 +1,19 @@
+# Generated by Django 5.2.1 on 2026-10-16 21:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("courses", "0009_dailycoursestats"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="enrollment",
+            index=models.Index(
+                fields=["created_at", "id"], name="enrollment_created_at_id_idx"
+            ),
+        ),
+    ]
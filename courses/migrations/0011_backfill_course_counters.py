@@ -0,0 +1,76 @@
+# Generated by Django 5.2.1 on 2026-10-16 22:40
+
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import migrations
+from django.db.models import Count, DecimalField, DurationField, IntegerField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+# Payment.StatusChoices.COMPLETED; historical models don't carry choices classes.
+COMPLETED = 2
+
+
+def count(queryset, course_path):
+    return Coalesce(
+        Subquery(
+            queryset.filter(**{course_path: OuterRef("pk")})
+            .order_by()
+            .values(course_path)
+            .annotate(total=Count("pk"))
+            .values("total")
+        ),
+        0,
+        output_field=IntegerField(),
+    )
+
+
+def backfill_course_counters(apps, schema_editor):
+    """
+    Fill the counters added in 0006 for courses that existed before it; the
+    signals only keep them current from then on. The same correlated
+    subqueries as courses.counters.recompute_course_counters, on the
+    historical models.
+    """
+    Course = apps.get_model("courses", "Course")
+    Lesson = apps.get_model("courses", "Lesson")
+    Enrollment = apps.get_model("courses", "Enrollment")
+    Comment = apps.get_model("courses", "Comment")
+    Payment = apps.get_model("payments", "Payment")
+
+    lessons = Lesson.objects.filter(part__course=OuterRef("pk")).order_by().values("part__course")
+    revenue = (
+        Payment.objects.filter(order__courses=OuterRef("pk"), status=COMPLETED)
+        .order_by()
+        .values("order__courses")
+        .annotate(total=Sum("amount"))
+        .values("total")
+    )
+
+    Course.objects.update(
+        lessons_count=count(Lesson.objects.all(), "part__course"),
+        enrollments_count=count(Enrollment.objects.all(), "course"),
+        comments_count=count(Comment.objects.all(), "lesson__part__course"),
+        total_duration=Coalesce(
+            Subquery(lessons.annotate(total=Sum("duration")).values("total")),
+            timedelta(0),
+            output_field=DurationField(),
+        ),
+        completed_revenue=Coalesce(
+            Subquery(revenue),
+            Decimal("0"),
+            output_field=DecimalField(max_digits=12, decimal_places=2),
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("courses", "0010_enrollment_created_at_id_idx"),
+        ("payments", "0004_payment_payment_created_at_id_idx_and_more"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_course_counters, migrations.RunPython.noop),
+    ]
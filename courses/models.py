@@ -1,4 +1,7 @@
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models.functions import Coalesce
+from datetime import timedelta
 import uuid
 from slugify import slugify
 
@@ -19,6 +22,117 @@ class Category(BaseModel):
         super(Category, self).save(*args, **kwargs)
 
 
+class CourseQuerySet(models.QuerySet):
+    def for_catalog(self):
+        """
+        Catalog cards: category joined in, parts and tutors prefetched,
+        every table projected down to the columns CourseSerializer renders.
+        Runs three queries regardless of page size.
+        """
+        return self.select_related("category").only(
+            "id",
+            "title",
+            "slug",
+            "description",
+            "price",
+            "thumbnail",
+            "lessons_count",
+            "total_duration",
+            "created_at",
+            "updated_at",
+            "category__id",
+            "category__name",
+            "category__slug",
+        ).prefetch_related(
+            models.Prefetch(
+                "parts",
+                queryset=CoursePart.objects.only("id", "title", "order", "course_id"),
+            ),
+            models.Prefetch(
+                "tutors",
+                queryset=User.objects.only("id", "first_name", "last_name", "email"),
+            ),
+        )
+
+    def with_free_preview(self):
+        return self.annotate(
+            has_free_preview=models.Exists(
+                Lesson.objects.filter(part__course=models.OuterRef("pk"), is_free_preview=True)
+            )
+        )
+
+    def with_stats(self):
+        """
+        Annotate the figures CourseStatsSerializer renders. Lessons, comments
+        and enrollments come from the stored counters (as annotations, so
+        they load even under for_catalog()'s only()); tutors and payments by
+        status are correlated subqueries, so nothing is joined or grouped
+        per course and the payment counts scale with one course's payments.
+        """
+        from payments.models import Payment
+
+        def count(queryset, course_path):
+            return Coalesce(
+                models.Subquery(
+                    queryset.filter(**{course_path: models.OuterRef("pk")})
+                    .order_by()
+                    .values(course_path)
+                    .annotate(total=models.Count("pk"))
+                    .values("total")
+                ),
+                0,
+            )
+
+        def payments(status=None):
+            queryset = Payment.objects.all()
+            if status is not None:
+                queryset = queryset.filter(status=status)
+            return count(queryset, "order__courses")
+
+        return self.annotate(
+            number_of_lessons=models.F("lessons_count"),
+            number_of_comments=models.F("comments_count"),
+            number_of_enrolled=models.F("enrollments_count"),
+            number_of_tutors=count(User.objects.all(), "courses"),
+            number_of_payments=payments(),
+            number_of_completed_payments=payments(Payment.StatusChoices.COMPLETED),
+            number_of_failed_payments=payments(Payment.StatusChoices.FAILED),
+            number_of_pending_payments=payments(Payment.StatusChoices.PENDING),
+        )
+
+    def for_detail(self):
+        """
+        The full Course -> CoursePart -> Lesson tree rendered by
+        CourseDetailSerializer, in four queries.
+        """
+        return self.prefetch_related(
+            models.Prefetch(
+                "tutors",
+                queryset=User.objects.only("id", "first_name", "last_name", "email"),
+            ),
+            models.Prefetch(
+                "parts",
+                queryset=CoursePart.objects.only(
+                    "id", "title", "order", "course_id", "created_at"
+                ).prefetch_related(
+                    models.Prefetch(
+                        "lessons",
+                        queryset=Lesson.objects.only(
+                            "id",
+                            "title",
+                            "slug",
+                            "order",
+                            "duration",
+                            "created_at",
+                            "is_free_preview",
+                            "part_id",
+                        ),
+                    )
+                ),
+            ),
+        )
+
+
 class Course(BaseModel):
     id = models.UUIDField(
         primary_key=True, default=uuid.uuid4, editable=False, unique=True
@@ -33,12 +147,56 @@ class Course(BaseModel):
     )
     price = models.DecimalField(max_digits=10, decimal_places=2, default=0.00)
     is_published = models.BooleanField(default=False)
+    # Maintained by a database trigger on PostgreSQL (see migration 0005).
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    # Denormalized counters, maintained incrementally by courses.signals and
+    # payments.signals; `manage.py recompute_course_counters` repairs drift.
+    lessons_count = models.IntegerField(default=0, editable=False)
+    enrollments_count = models.IntegerField(default=0, editable=False)
+    comments_count = models.IntegerField(default=0, editable=False)
+    total_duration = models.DurationField(default=timedelta(0), editable=False)
+    completed_revenue = models.DecimalField(
+        max_digits=12, decimal_places=2, default=0, editable=False
+    )
+
+    # Columns owned by the database (F() updates and triggers). A regular
+    # save() must never write back its possibly stale in-memory copies.
+    DATABASE_MAINTAINED_FIELDS = (
+        "search_vector",
+        "lessons_count",
+        "enrollments_count",
+        "comments_count",
+        "total_duration",
+        "completed_revenue",
+    )
+
+    objects = CourseQuerySet.as_manager()
 
     def __str__(self):
         return self.title
 
+    @staticmethod
+    def build_slug(title):
+        return slugify(title)
+
     def save(self, *args, **kwargs):
-        self.slug = slugify(self.title)
+        self.slug = self.build_slug(self.title)
+        # Callers choosing the columns themselves, or forcing an INSERT
+        # (which Django refuses to combine with update_fields), keep theirs.
+        if (
+            not self._state.adding
+            and not kwargs.get("force_insert")
+            and kwargs.get("update_fields") is None
+        ):
+            deferred = self.get_deferred_fields()
+            kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.DATABASE_MAINTAINED_FIELDS
+                and field.attname not in deferred
+            ]
         super(Course, self).save(*args, **kwargs)
 
 
@@ -55,11 +213,33 @@ class CoursePart(BaseModel):
     def __str__(self):
         return f"{self.course.title} - {self.title}"
 
+    @staticmethod
+    def build_slug(course_title, title):
+        return slugify(course_title + "--" + title)
+
     def save(self, *args, **kwargs):
-        self.slug = slugify(self.course.title + "--" + self.title)
+        self.slug = self.build_slug(self.course.title, self.title)
         super(CoursePart, self).save(*args, **kwargs)
 
 
+class LessonQuerySet(models.QuerySet):
+    def with_access(self, user):
+        """
+        Lessons with their part joined in and `is_accessible` annotated:
+        free previews, or lessons of a course `user` is enrolled in. The
+        lesson, its course id and the access decision come back in one query.
+        """
+        if user and user.is_authenticated:
+            enrolled = models.Exists(
+                Enrollment.objects.filter(student=user, course=models.OuterRef("part__course"))
+            )
+        else:
+            enrolled = models.Value(False)
+        return self.select_related("part").annotate(
+            is_accessible=models.Q(is_free_preview=True) | enrolled
+        )
+
+
 class Lesson(BaseModel):
     id = models.UUIDField(
         primary_key=True, default=uuid.uuid4, editable=False, unique=True
@@ -74,12 +254,26 @@ class Lesson(BaseModel):
     order = models.PositiveIntegerField(default=0)
     duration = models.DurationField(null=True, blank=True)
     is_free_preview = models.BooleanField(default=False)
+    # Maintained by a database trigger on PostgreSQL (see migration 0005).
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = LessonQuerySet.as_manager()
 
     def __str__(self):
         return f"{self.part.course.title} - {self.part.title} - {self.title}"
 
+    # Characters of the id prefixed to the title in slugs, so repeated
+    # titles ("Introduction", "Summary") stay unique. Older lessons carry
+    # one character and keep their slug until their title changes.
+    SLUG_ID_LENGTH = 8
+
+    @classmethod
+    def build_slug(cls, lesson_id, title):
+        return slugify(uuid.UUID(str(lesson_id)).hex[:cls.SLUG_ID_LENGTH] + "--" + title, max_length=255)
+
     def save(self, *args, **kwargs):
-        self.slug = slugify(self.id.__str__()[10] + "--" + self.title)
+        if not self.slug or self.slug.split("-", 1)[-1] != slugify(self.title):
+            self.slug = self.build_slug(self.id, self.title)
         super(Lesson, self).save(*args, **kwargs)
 
 
@@ -89,6 +283,15 @@ class Comment(BaseModel):
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, related_name="comments")
     lesson = models.ForeignKey(Lesson, on_delete=models.SET_NULL, null=True, related_name="comments")
 
+    class Meta(BaseModel.Meta):
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="comment_created_at_id_idx"),
+            # Per-lesson feed, newest first (CreatedAtCursorPagination order).
+            models.Index(
+                fields=["lesson", "-created_at", "-id"], name="comment_lesson_created_idx"
+            ),
+        ]
+
     def __str__(self):
         return f"{self.user} - {self.lesson}"
 
@@ -107,3 +310,77 @@ class Enrollment(BaseModel):
 
     class Meta:
         unique_together = ("student", "course")
+        indexes = [
+            models.Index(
+                fields=["student", "created_at", "id"],
+                name="enrollment_student_created_idx",
+            ),
+            models.Index(
+                fields=["created_at", "id"], name="enrollment_created_at_id_idx"
+            ),
+        ]
+
+
+class LessonProgress(BaseModel):
+    id = models.UUIDField(
+        primary_key=True, default=uuid.uuid4, editable=False, unique=True
+    )
+    student = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="lesson_progress"
+    )
+    lesson = models.ForeignKey(
+        Lesson, on_delete=models.CASCADE, related_name="progress"
+    )
+    # Denormalized from lesson.part.course for per-course progress queries.
+    course = models.ForeignKey(
+        Course, on_delete=models.CASCADE, related_name="lesson_progress"
+    )
+    # Seconds: where to resume, and the furthest point ever reached.
+    position = models.PositiveIntegerField(default=0)
+    max_position = models.PositiveIntegerField(default=0)
+    completed = models.BooleanField(default=False)
+    # Heartbeats are buffered and upserted in bulk by courses.progress.
+    last_watched_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ("student", "lesson")
+        indexes = [
+            models.Index(
+                fields=["student", "course", "-last_watched_at"],
+                name="progress_student_course_idx",
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.student} - {self.lesson_id} - {self.position}s"
+
+
+class DailyCourseStats(models.Model):
+    """
+    Per course per day activity, so dashboards read a few hundred rollup
+    rows instead of the raw transaction history. Kept current by
+    courses.rollups from signals; `manage.py rollup_daily_course_stats`
+    rebuilds days from the source tables.
+    """
+    course = models.ForeignKey(
+        Course, on_delete=models.CASCADE, related_name="daily_stats"
+    )
+    date = models.DateField()
+    enrollments = models.IntegerField(default=0)
+    comments = models.IntegerField(default=0)
+    completed_payments = models.IntegerField(default=0)
+    # Same attribution as Course.completed_revenue: a completed payment
+    # counts in full towards every course of its order. Tutor earnings are
+    # read from payments.RevenueLine instead.
+    completed_revenue = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    failed_payments = models.IntegerField(default=0)
+    pending_payments = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ("course", "date")
+        indexes = [
+            models.Index(fields=["date"], name="daily_course_stats_date_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.course_id} - {self.date}"
@@ -0,0 +1,243 @@
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.utils import timezone
+
+from courses.dashboard import invalidate_dashboard
+
+logger = logging.getLogger(__name__)
+
+
+class ProgressBuffer:
+    """
+    Per-process buffer of player heartbeats, merged per (student, lesson):
+    the latest heartbeat sets the resume position, max_position only grows
+    and completion is sticky. Entries are written with one bulk upsert once
+    the buffer is `max_size` entries large or its oldest entry is
+    `flush_interval` seconds old, instead of one UPDATE per heartbeat. Once
+    started, a daemon thread checks the age every `flush_interval` seconds,
+    so an idle buffer is flushed too.
+
+    Heartbeats still in the buffer are lost if the process dies, which at
+    most costs a viewer the last `flush_interval` seconds of position.
+    """
+
+    def __init__(self, flush_interval=None, max_size=None, clock=time.monotonic):
+        self.flush_interval = (
+            flush_interval if flush_interval is not None else settings.LESSON_PROGRESS_FLUSH_INTERVAL
+        )
+        self.max_size = max_size if max_size is not None else settings.LESSON_PROGRESS_BUFFER_SIZE
+        self.clock = clock
+        self.entries = {}
+        self.oldest = None
+        self.lock = threading.Lock()
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def record(self, student_id, lesson_id, course_id, position, completed=False):
+        now = timezone.now()
+        with self.lock:
+            entry = self.entries.get((student_id, lesson_id))
+            if entry is None:
+                self.entries[(student_id, lesson_id)] = {
+                    "course_id": course_id,
+                    "position": position,
+                    "max_position": position,
+                    "completed": completed,
+                    "last_watched_at": now,
+                }
+            else:
+                entry["position"] = position
+                entry["max_position"] = max(entry["max_position"], position)
+                entry["completed"] = entry["completed"] or completed
+                entry["last_watched_at"] = now
+            if self.oldest is None:
+                self.oldest = self.clock()
+            due = len(self.entries) >= self.max_size or self.is_stale()
+
+        if due:
+            self.flush()
+
+    def is_stale(self):
+        return self.oldest is not None and self.clock() - self.oldest >= self.flush_interval
+
+    def start(self):
+        """Start the background flush thread, once."""
+        with self.lock:
+            if self.thread is not None:
+                return
+            self.thread = threading.Thread(target=self.run, name="lesson-progress-flush", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+
+    def run(self):
+        while not self.stopped.wait(self.flush_interval):
+            with self.lock:
+                due = self.is_stale()
+            if due:
+                # The thread keeps its own connection; drop it once stale
+                # the way the request cycle would.
+                close_old_connections()
+                self.flush()
+
+    def pending(self, student_id, lesson_id):
+        with self.lock:
+            entry = self.entries.get((student_id, lesson_id))
+            return dict(entry) if entry else None
+
+    def drain(self):
+        with self.lock:
+            entries, self.entries, self.oldest = self.entries, {}, None
+        return entries
+
+    def flush(self):
+        """Write every buffered entry; returns how many rows were upserted."""
+        entries = self.drain()
+        if not entries:
+            return 0
+        try:
+            return write_progress(entries)
+        except Exception:
+            # Put the heartbeats back so the next flush retries them; newer
+            # ones recorded meanwhile take precedence.
+            logger.exception(f"Failed to flush {len(entries)} lesson progress entries")
+            with self.lock:
+                for key, entry in entries.items():
+                    current = self.entries.get(key)
+                    if current is not None:
+                        current["max_position"] = max(current["max_position"], entry["max_position"])
+                        current["completed"] = current["completed"] or entry["completed"]
+                    else:
+                        self.entries[key] = entry
+                if self.oldest is None:
+                    self.oldest = self.clock()
+            return 0
+
+
+UPSERT_SQL = """
+INSERT INTO {table} ({columns}) VALUES {rows}
+ON CONFLICT ({student}, {lesson}) DO UPDATE SET
+    {position} = CASE WHEN EXCLUDED.{last_watched_at} >= {table}.{last_watched_at}
+        THEN EXCLUDED.{position} ELSE {table}.{position} END,
+    {last_watched_at} = CASE WHEN EXCLUDED.{last_watched_at} >= {table}.{last_watched_at}
+        THEN EXCLUDED.{last_watched_at} ELSE {table}.{last_watched_at} END,
+    {max_position} = {greatest}({table}.{max_position}, EXCLUDED.{max_position}),
+    {completed} = {table}.{completed} OR EXCLUDED.{completed},
+    {updated_at} = EXCLUDED.{updated_at}
+"""
+
+UPSERT_FIELDS = (
+    "id", "created_at", "updated_at", "student", "lesson", "course",
+    "position", "max_position", "completed", "last_watched_at",
+)
+
+
+def write_progress(entries, batch_size=1000):
+    """
+    Upsert merged heartbeats, keyed by (student_id, lesson_id), with one
+    INSERT ... ON CONFLICT DO UPDATE per `batch_size` entries. The merge
+    happens in the conflict clause, so concurrent flushes (from other
+    processes, or the flush thread racing a request) never move
+    max_position or completion backwards, nor the resume position to an
+    older heartbeat.
+    """
+    from courses.models import LessonProgress
+
+    opts = LessonProgress._meta
+    fields = [opts.get_field(name) for name in UPSERT_FIELDS]
+    quote = connection.ops.quote_name
+    names = {field.name: quote(field.column) for field in fields}
+    now = timezone.now()
+
+    rows = [
+        LessonProgress(
+            created_at=now,
+            updated_at=now,
+            student_id=student_id,
+            lesson_id=lesson_id,
+            course_id=entry["course_id"],
+            position=entry["position"],
+            max_position=entry["max_position"],
+            completed=entry["completed"],
+            last_watched_at=entry["last_watched_at"],
+        )
+        for (student_id, lesson_id), entry in entries.items()
+    ]
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        for index in range(0, len(rows), batch_size):
+            batch = rows[index:index + batch_size]
+            placeholders = "({})".format(", ".join(["%s"] * len(fields)))
+            sql = UPSERT_SQL.format(
+                table=quote(opts.db_table),
+                columns=", ".join(names[field.name] for field in fields),
+                rows=", ".join([placeholders] * len(batch)),
+                greatest="GREATEST" if connection.vendor == "postgresql" else "MAX",
+                **names,
+            )
+            cursor.execute(sql, [
+                field.get_db_prep_save(getattr(row, field.attname), connection)
+                for row in batch
+                for field in fields
+            ])
+        for student_id in {student_id for student_id, _ in entries}:
+            invalidate_dashboard(student_id)
+    return len(rows)
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def get_buffer():
+    """
+    The process-wide buffer, started on first use (so after any fork) and
+    flushed once more when the process exits.
+    """
+    global _buffer
+    if _buffer is None:
+        with _buffer_lock:
+            if _buffer is None:
+                _buffer = ProgressBuffer()
+                _buffer.start()
+                atexit.register(flush_at_exit, _buffer)
+    return _buffer
+
+
+def flush_at_exit(buffer):
+    buffer.stop()
+    close_old_connections()
+    buffer.flush()
+
+
+def record_progress(user, lesson, position, completed=False):
+    get_buffer().record(user.pk, lesson.pk, lesson.part.course_id, position, completed)
+
+
+def get_progress(user, lesson):
+    """Stored progress for one lesson, overlaid with this process's buffer."""
+    from courses.models import LessonProgress
+
+    progress = (
+        LessonProgress.objects.filter(student=user, lesson=lesson)
+        .values("position", "max_position", "completed", "last_watched_at")
+        .first()
+    ) or {"position": 0, "max_position": 0, "completed": False, "last_watched_at": None}
+
+    pending = get_buffer().pending(user.pk, lesson.pk)
+    if pending:
+        progress = {
+            "position": pending["position"],
+            "max_position": max(progress["max_position"], pending["max_position"]),
+            "completed": progress["completed"] or pending["completed"],
+            "last_watched_at": pending["last_watched_at"],
+        }
+    return progress
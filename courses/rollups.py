@@ -0,0 +1,134 @@
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from courses.models import Comment, DailyCourseStats, Enrollment
+
+ROLLUP_FIELDS = (
+    "enrollments",
+    "comments",
+    "completed_payments",
+    "completed_revenue",
+    "failed_payments",
+    "pending_payments",
+)
+
+
+def rollup_date(moment):
+    """The day a row is rolled up under: its local date, as TruncDate sees it."""
+    return timezone.localdate(moment) if moment else timezone.localdate()
+
+
+def payment_counter(status):
+    from payments.models import Payment
+
+    return {
+        Payment.StatusChoices.COMPLETED: "completed_payments",
+        Payment.StatusChoices.FAILED: "failed_payments",
+        Payment.StatusChoices.PENDING: "pending_payments",
+    }.get(status)
+
+
+def payment_deltas(status, amount, sign=1):
+    """Rollup deltas for adding (sign=1) or removing (sign=-1) one payment."""
+    from payments.models import Payment
+
+    counter = payment_counter(status)
+    deltas = {counter: sign} if counter else {}
+    if status == Payment.StatusChoices.COMPLETED:
+        deltas["completed_revenue"] = sign * amount
+    return deltas
+
+
+def bump_daily_stats(course_ids, date, **deltas):
+    """
+    Atomically add `deltas` to the rollup rows of `course_ids` on `date`:
+    missing rows are inserted empty first, then one UPDATE ... SET field =
+    field + delta, so concurrent writers never lose increments.
+
+    Removals (only negative deltas) never insert rows: there is nothing to
+    take away from a missing row, and during a course delete cascade an
+    insert would point at the course being deleted.
+    """
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    course_ids = [course_id for course_id in course_ids if course_id]
+    if not deltas or not course_ids:
+        return
+
+    if any(delta > 0 for delta in deltas.values()):
+        DailyCourseStats.objects.bulk_create(
+            [DailyCourseStats(course_id=course_id, date=date) for course_id in course_ids],
+            ignore_conflicts=True,
+        )
+    DailyCourseStats.objects.filter(course_id__in=course_ids, date=date).update(
+        **{field: F(field) + delta for field, delta in deltas.items()}
+    )
+
+
+def day_bounds(since, until):
+    start = timezone.make_aware(datetime.combine(since, time.min))
+    end = timezone.make_aware(datetime.combine(until + timedelta(days=1), time.min))
+    return start, end
+
+
+def rebuild_daily_stats(since, until=None, courses=None):
+    """
+    Recompute the rollup rows for every day from `since` to `until`
+    (inclusive, default today) from the source tables, with one grouped
+    query per table. Used for backfills and to repair drift from writes
+    that bypass signals. Returns the number of rows written.
+    """
+    from payments.models import Payment
+
+    until = until or timezone.localdate()
+    start, end = day_bounds(since, until)
+
+    def grouped(queryset, course_path, *fields, **aggregates):
+        if courses is not None:
+            queryset = queryset.filter(**{f"{course_path}__in": courses})
+        return (
+            queryset.filter(created_at__gte=start, created_at__lt=end)
+            .annotate(day=TruncDate("created_at"), rollup_course=F(course_path))
+            .exclude(rollup_course=None)
+            .order_by()
+            .values("rollup_course", "day", *fields)
+            .annotate(**aggregates)
+        )
+
+    totals = defaultdict(lambda: dict.fromkeys(ROLLUP_FIELDS, 0))
+
+    for row in grouped(Enrollment.objects.all(), "course", total=Count("pk")):
+        totals[row["rollup_course"], row["day"]]["enrollments"] += row["total"]
+
+    for row in grouped(Comment.objects.all(), "lesson__part__course", total=Count("pk")):
+        totals[row["rollup_course"], row["day"]]["comments"] += row["total"]
+
+    payments = grouped(
+        Payment.objects.all(), "order__courses", "status", total=Count("pk"), amount=Sum("amount")
+    )
+    for row in payments:
+        entry = totals[row["rollup_course"], row["day"]]
+        counter = payment_counter(row["status"])
+        if counter:
+            entry[counter] += row["total"]
+        if row["status"] == Payment.StatusChoices.COMPLETED:
+            entry["completed_revenue"] += row["amount"]
+
+    stale = DailyCourseStats.objects.filter(date__gte=since, date__lte=until)
+    if courses is not None:
+        stale = stale.filter(course__in=courses)
+
+    with transaction.atomic():
+        stale.delete()
+        DailyCourseStats.objects.bulk_create(
+            [
+                DailyCourseStats(course_id=course_id, date=day, **entry)
+                for (course_id, day), entry in totals.items()
+            ],
+            batch_size=1000,
+        )
+    return len(totals)
@@ -0,0 +1,71 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import Case, F, FloatField, Q, Value, When
+
+from courses.models import Course, Lesson
+
+# Must match the text search configuration used by the triggers in
+# migration 0005_search_vectors.
+SEARCH_CONFIG = "english"
+
+
+def uses_full_text_search():
+    return connection.vendor == "postgresql"
+
+
+def rank_by_relevance(queryset, query, full_text=None):
+    """
+    Filter `queryset` (Course or Lesson) down to rows matching `query`,
+    annotated with `rank` and ordered best match first.
+
+    On PostgreSQL this is a GIN index lookup on the trigger-maintained
+    search_vector. Other backends (or `full_text=False`) fall back to
+    icontains matching, with title hits ranked above description-only hits.
+    """
+    if full_text is None:
+        full_text = uses_full_text_search()
+
+    if full_text:
+        search_query = SearchQuery(query, config=SEARCH_CONFIG, search_type="websearch")
+        return (
+            queryset.filter(search_vector=search_query)
+            .annotate(rank=SearchRank(F("search_vector"), search_query))
+            .order_by("-rank", "-created_at")
+        )
+
+    return (
+        queryset.filter(Q(title__icontains=query) | Q(description__icontains=query))
+        .annotate(
+            rank=Case(
+                When(title__icontains=query, then=Value(1.0)),
+                default=Value(0.5),
+                output_field=FloatField(),
+            )
+        )
+        .order_by("-rank", "-created_at")
+    )
+
+
+def search_courses(query, full_text=None):
+    return rank_by_relevance(Course.objects.for_catalog(), query, full_text)
+
+
+def search_lessons(query, full_text=None):
+    return rank_by_relevance(
+        Lesson.objects.select_related("part__course").only(
+            "id",
+            "title",
+            "slug",
+            "order",
+            "duration",
+            "is_free_preview",
+            "created_at",
+            "part__id",
+            "part__title",
+            "part__course__id",
+            "part__course__title",
+            "part__course__slug",
+        ),
+        query,
+        full_text,
+    )
@@ -0,0 +1,155 @@
+from datetime import timedelta
+
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from courses.cache import invalidate_course_detail
+from courses.counters import bump_course_counters, course_id_for_lesson, course_id_for_part
+from courses.dashboard import invalidate_course_dashboards, invalidate_dashboard
+from courses.entitlements import invalidate_entitlements
+from courses.models import Comment, Course, CoursePart, Enrollment, Lesson
+from courses.rollups import bump_daily_stats, rollup_date
+
+
+@receiver(pre_save, sender=Course)
+def remember_previous_course_slug(sender, instance, **kwargs):
+    # Course.save() re-slugifies the title, so the old slug has to be
+    # captured before it is overwritten.
+    instance._previous_slug = (
+        sender.objects.filter(pk=instance.pk).values_list("slug", flat=True).first()
+    )
+
+
+@receiver(post_save, sender=Course)
+@receiver(post_delete, sender=Course)
+def invalidate_course(sender, instance, **kwargs):
+    invalidate_course_detail(instance.slug, getattr(instance, "_previous_slug", None))
+    invalidate_course_dashboards(instance.pk)
+
+
+@receiver(post_save, sender=CoursePart)
+@receiver(post_delete, sender=CoursePart)
+def invalidate_course_part(sender, instance, **kwargs):
+    invalidate_course_detail(
+        *Course.objects.filter(pk=instance.course_id).values_list("slug", flat=True)
+    )
+
+
+@receiver(post_save, sender=Lesson)
+@receiver(post_delete, sender=Lesson)
+def invalidate_lesson(sender, instance, **kwargs):
+    courses = list(Course.objects.filter(parts=instance.part_id).values_list("pk", "slug"))
+    invalidate_course_detail(*(slug for _, slug in courses))
+    # Dashboard cards show lesson counts and the last lesson's title, also
+    # on the course a lesson was moved away from.
+    previous = getattr(instance, "_previous_counters", None)
+    invalidate_course_dashboards(
+        *(pk for pk, _ in courses), previous and previous["part__course_id"]
+    )
+
+
+@receiver(m2m_changed, sender=Course.tutors.through)
+def invalidate_course_tutors(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "post_clear"):
+        return
+    if not reverse:
+        courses = Course.objects.filter(pk=instance.pk)
+    elif pk_set:
+        courses = Course.objects.filter(pk__in=pk_set)
+    else:
+        return
+
+    invalidate_course_detail(*courses.values_list("slug", flat=True))
+    # Tutor lists are part of the catalog cards and course detail, so bump
+    # updated_at to move their ETags along with them.
+    courses.update(updated_at=timezone.now())
+
+
+@receiver(post_save, sender=Enrollment)
+@receiver(post_delete, sender=Enrollment)
+def invalidate_enrollment(sender, instance, **kwargs):
+    invalidate_entitlements(instance.student_id)
+    invalidate_dashboard(instance.student_id)
+
+
+@receiver(post_save, sender=Enrollment)
+def count_enrollment(sender, instance, created, **kwargs):
+    if created:
+        bump_course_counters(instance.course_id, enrollments_count=1)
+        bump_daily_stats([instance.course_id], rollup_date(instance.created_at), enrollments=1)
+
+
+@receiver(post_delete, sender=Enrollment)
+def uncount_enrollment(sender, instance, **kwargs):
+    bump_course_counters(instance.course_id, enrollments_count=-1)
+    bump_daily_stats([instance.course_id], rollup_date(instance.created_at), enrollments=-1)
+
+
+def changes_lesson_counters(update_fields):
+    return update_fields is None or not update_fields.isdisjoint({"part", "part_id", "duration"})
+
+
+@receiver(pre_save, sender=Lesson)
+def remember_previous_lesson(sender, instance, update_fields=None, **kwargs):
+    if not changes_lesson_counters(update_fields):
+        return
+    instance._previous_counters = (
+        sender.objects.filter(pk=instance.pk).values("part__course_id", "duration").first()
+    )
+
+
+@receiver(post_save, sender=Lesson)
+def count_lesson(sender, instance, created, update_fields=None, **kwargs):
+    if not changes_lesson_counters(update_fields):
+        return
+    course_id = course_id_for_part(instance.part_id)
+    duration = instance.duration or timedelta(0)
+    previous = getattr(instance, "_previous_counters", None)
+
+    if created or previous is None:
+        bump_course_counters(course_id, lessons_count=1, total_duration=duration)
+    elif previous["part__course_id"] != course_id:
+        bump_course_counters(
+            previous["part__course_id"],
+            lessons_count=-1,
+            total_duration=-(previous["duration"] or timedelta(0)),
+        )
+        bump_course_counters(course_id, lessons_count=1, total_duration=duration)
+    else:
+        bump_course_counters(
+            course_id, total_duration=duration - (previous["duration"] or timedelta(0))
+        )
+
+
+@receiver(pre_delete, sender=Lesson)
+def remember_lesson_comments(sender, instance, **kwargs):
+    # Comment.lesson is SET_NULL, which runs as a bulk UPDATE without
+    # signals, so the detached comments have to be counted up front.
+    instance._comments_count = Comment.objects.filter(lesson=instance).count()
+
+
+@receiver(post_delete, sender=Lesson)
+def uncount_lesson(sender, instance, **kwargs):
+    bump_course_counters(
+        course_id_for_part(instance.part_id),
+        lessons_count=-1,
+        total_duration=-(instance.duration or timedelta(0)),
+        comments_count=-getattr(instance, "_comments_count", 0),
+    )
+
+
+@receiver(post_save, sender=Comment)
+def count_comment(sender, instance, created, **kwargs):
+    if created and instance.lesson_id:
+        course_id = course_id_for_lesson(instance.lesson_id)
+        bump_course_counters(course_id, comments_count=1)
+        bump_daily_stats([course_id], rollup_date(instance.created_at), comments=1)
+
+
+@receiver(post_delete, sender=Comment)
+def uncount_comment(sender, instance, **kwargs):
+    if instance.lesson_id:
+        course_id = course_id_for_lesson(instance.lesson_id)
+        bump_course_counters(course_id, comments_count=-1)
+        bump_daily_stats([course_id], rollup_date(instance.created_at), comments=-1)
@@ -1,3 +1,1218 @@
+import io
+import json
+import os
+import tempfile
+import time
+import uuid
+from datetime import timedelta
+from importlib import import_module
+from unittest import mock, skipUnless
+
+import httpx
+import requests
+from asgiref.sync import async_to_sync
+from django.apps import apps
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.http import QueryDict
+from django.db import connection
 from django.test import TestCase
+from django.utils import timezone
+
+from rest_framework.test import APIClient
+
+from courses import vdocipher
+from courses.api.filters import course_facets
+from courses.cache import get_course_detail
+from courses.api.serializers import CourseManifestSerializer
+from courses.models import (
+    Category, Comment, Course, CoursePart, DailyCourseStats, Enrollment, Lesson, LessonProgress,
+)
+from courses.dashboard import get_dashboard
+from courses.entitlements import ais_enrolled, get_enrolled_course_ids, is_enrolled
+from courses.importer import ManifestError, import_course
+from courses.progress import ProgressBuffer, write_progress
+from payments.models import Order, Payment
+from users.models import User
+
+
+def make_user(email, **fields):
+    return User.objects.create_user(email=email, password="password", **fields)
+
+
+def make_courses(count, start=0):
+    """Published courses with a category, two tutors and two parts of two lessons each."""
+    category, _ = Category.objects.get_or_create(name="Programming")
+    courses = []
+    for index in range(start, start + count):
+        course = Course.objects.create(
+            title=f"Course {index}", price=10, category=category, is_published=True
+        )
+        course.tutors.add(
+            make_user(f"tutor-{index}-a@example.com", role=User.RoleChoices.TUTOR),
+            make_user(f"tutor-{index}-b@example.com", role=User.RoleChoices.TUTOR),
+        )
+        for part_index in range(2):
+            part = CoursePart.objects.create(course=course, title=f"Part {part_index}", order=part_index)
+            for lesson_index in range(2):
+                Lesson.objects.create(
+                    part=part,
+                    title=f"Lesson {index}.{part_index}.{lesson_index}",
+                    order=lesson_index,
+                    is_free_preview=lesson_index == 0,
+                )
+        courses.append(course)
+    return courses
+
+
+class DailyCourseStatsTests(TestCase):
+    def setUp(self):
+        self.course = Course.objects.create(title="Python Basics", price=10)
+        self.student = make_user("student@example.com")
+
+    def test_enrollment_is_rolled_up(self):
+        Enrollment.objects.create(student=self.student, course=self.course)
+
+        self.assertEqual(DailyCourseStats.objects.get(course=self.course).enrollments, 1)
+
+    def test_deleting_a_course_with_enrollments(self):
+        Enrollment.objects.create(student=self.student, course=self.course)
+
+        self.course.delete()
+
+        self.assertFalse(Course.objects.exists())
+        self.assertFalse(DailyCourseStats.objects.exists())
+
+    def test_removal_does_not_create_rows(self):
+        enrollment = Enrollment.objects.create(student=self.student, course=self.course)
+        DailyCourseStats.objects.all().delete()
+
+        enrollment.delete()
+
+        self.assertFalse(DailyCourseStats.objects.exists())
+
+
+class AsyncVdoCipherClientTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_wsgi_uses_the_pooled_sync_client(self):
+        client = mock.Mock()
+        client.get_otp.return_value = {"otp": "otp", "playbackInfo": "info"}
+
+        with mock.patch.object(vdocipher, "get_client", return_value=client):
+            otp = async_to_sync(vdocipher.aget_video_otp)("video", None)
+
+        self.assertEqual(otp, {"otp": "otp", "playbackInfo": "info"})
+        client.get_otp.assert_called_once()
+        self.assertIsNone(async_to_sync(self.running_client)())
+
+    @staticmethod
+    async def running_client():
+        return vdocipher.get_async_client()
+
+
+class CatalogQueryCountTests(TestCase):
+    # Validators (see ConditionalGetMixin), page count, courses with their
+    # category, parts and tutors.
+    CATALOG_QUERIES = 9
+
+    def test_catalog_query_count_does_not_grow_with_courses(self):
+        client = APIClient()
+
+        make_courses(3)
+        with self.assertNumQueries(self.CATALOG_QUERIES):
+            response = client.get("/api/courses/courses/")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["count"], 3)
+
+        make_courses(6, start=3)
+        with self.assertNumQueries(self.CATALOG_QUERIES):
+            response = client.get("/api/courses/courses/")
+        self.assertEqual(response.json()["count"], 9)
+
+
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.course = make_courses(1)[0]
+        self.client = APIClient()
+
+    def assert_catalog_changed(self, etag):
+        response = self.client.get("/api/courses/courses/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_not_modified_from_validators_only(self):
+        etag = self.client.get("/api/courses/courses/")["ETag"]
+
+        # One aggregate per validator queryset, nothing fetched.
+        with self.assertNumQueries(5):
+            response = self.client.get("/api/courses/courses/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_lesson_edit_changes_the_etag(self):
+        etag = self.client.get("/api/courses/courses/")["ETag"]
+        Lesson.objects.filter(part__course=self.course).first().save()
+        self.assert_catalog_changed(etag)
+
+    def test_tutor_rename_changes_the_etag(self):
+        etag = self.client.get("/api/courses/courses/")["ETag"]
+        tutor = self.course.tutors.first()
+        tutor.first_name = "Renamed"
+        tutor.save()
+        self.assert_catalog_changed(etag)
+
+    def test_course_detail_etag_depends_on_enrollment(self):
+        student = make_user("student@example.com")
+        self.client.force_authenticate(student)
+        url = f"/api/courses/courses/{self.course.slug}/"
+        etag = self.client.get(url)["ETag"]
+
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Enrollment.objects.create(student=student, course=self.course)
+
+        # A fresh user, as on a real request: enrollments are memoized on it.
+        self.client.force_authenticate(User.objects.get(pk=student.pk))
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()["is_enrolled"])
+
+
+class LessonAccessQueryCountTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.course = make_courses(1)[0]
+        self.lesson = Lesson.objects.filter(part__course=self.course, is_free_preview=False).first()
+        self.student = make_user("student@example.com")
+        self.client = APIClient()
+        self.client.force_authenticate(self.student)
+
+    def retrieve(self):
+        with mock.patch("courses.api.views.aget_video_otp", return_value={"otp": "otp"}):
+            return self.client.get(f"/api/courses/lessons/{self.lesson.slug}/")
+
+    def test_enrolled_lesson_in_one_query(self):
+        Enrollment.objects.create(student=self.student, course=self.course)
+
+        # The lesson, its part and the access decision come back together.
+        with self.assertNumQueries(1):
+            response = self.retrieve()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["otp"], "otp")
+
+    def test_locked_lesson_in_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.retrieve()
+
+        self.assertEqual(response.status_code, 404)
+
+
+class ProgressBufferTests(TestCase):
+    def test_record_merges_heartbeats(self):
+        buffer = ProgressBuffer(flush_interval=60, max_size=100)
+        buffer.record("student", "lesson", "course", 90)
+        buffer.record("student", "lesson", "course", 30, completed=True)
+        buffer.record("student", "lesson", "course", 40)
+
+        pending = buffer.pending("student", "lesson")
+        self.assertEqual(pending["position"], 40)
+        self.assertEqual(pending["max_position"], 90)
+        self.assertTrue(pending["completed"])
+
+    def test_record_flushes_a_full_buffer(self):
+        buffer = ProgressBuffer(flush_interval=60, max_size=2)
+        with mock.patch("courses.progress.write_progress", return_value=2) as write:
+            buffer.record("student", "first", "course", 10)
+            write.assert_not_called()
+            buffer.record("student", "second", "course", 20)
+
+        write.assert_called_once()
+        self.assertEqual(set(write.call_args.args[0]), {("student", "first"), ("student", "second")})
+
+    def test_idle_buffer_is_flushed(self):
+        buffer = ProgressBuffer(flush_interval=0.05, max_size=100)
+        with mock.patch("courses.progress.write_progress", return_value=1) as write:
+            buffer.record("student", "lesson", "course", 30)
+            write.assert_not_called()
+
+            buffer.start()
+            try:
+                deadline = time.monotonic() + 5
+                while not write.called and time.monotonic() < deadline:
+                    time.sleep(0.01)
+            finally:
+                buffer.stop()
+
+        write.assert_called_once()
+        self.assertEqual(write.call_args.args[0][("student", "lesson")]["position"], 30)
+        self.assertIsNone(buffer.pending("student", "lesson"))
+
+
+class BackfillCourseCountersTests(TestCase):
+    COUNTERS = ("lessons_count", "enrollments_count", "comments_count", "total_duration", "completed_revenue")
+
+    def test_backfill_matches_the_signal_maintained_counters(self):
+        course = make_courses(1)[0]
+        Lesson.objects.filter(part__course=course).update(duration=timedelta(minutes=5))
+        Enrollment.objects.create(student=make_user("student@example.com"), course=course)
+        course.refresh_from_db()
+        maintained = {field: getattr(course, field) for field in self.COUNTERS}
+        Course.objects.update(lessons_count=0, enrollments_count=0, total_duration=timedelta(0))
+
+        migration = import_module("courses.migrations.0011_backfill_course_counters")
+        migration.backfill_course_counters(apps, None)
+
+        course.refresh_from_db()
+        self.assertEqual({field: getattr(course, field) for field in self.COUNTERS}, {
+            **maintained, "total_duration": timedelta(minutes=20),
+        })
+        self.assertEqual(maintained["lessons_count"], 4)
+        self.assertEqual(maintained["enrollments_count"], 1)
+
+
+class WriteProgressTests(TestCase):
+    def setUp(self):
+        course = make_courses(1)[0]
+        self.lesson = Lesson.objects.filter(part__course=course).first()
+        self.student = make_user("student@example.com")
+        self.key = (self.student.pk, self.lesson.pk)
+
+    def write(self, position, max_position, completed, watched_at):
+        write_progress({self.key: {
+            "course_id": self.lesson.part.course_id,
+            "position": position,
+            "max_position": max_position,
+            "completed": completed,
+            "last_watched_at": watched_at,
+        }})
+        return LessonProgress.objects.get(student=self.student, lesson=self.lesson)
+
+    def test_upsert_never_moves_progress_backwards(self):
+        now = timezone.now()
+        self.write(120, 120, True, now)
+
+        # A flush carrying older, lower heartbeats, e.g. from another process.
+        progress = self.write(30, 30, False, now - timedelta(seconds=5))
+        self.assertEqual(progress.position, 120)
+        self.assertEqual(progress.max_position, 120)
+        self.assertTrue(progress.completed)
+        self.assertEqual(progress.last_watched_at, now)
+
+        # A newer heartbeat rewinds the resume position only.
+        progress = self.write(10, 10, False, now + timedelta(seconds=5))
+        self.assertEqual(progress.position, 10)
+        self.assertEqual(progress.max_position, 120)
+        self.assertTrue(progress.completed)
+        self.assertEqual(LessonProgress.objects.count(), 1)
+
+
+class CourseStatsTests(TestCase):
+    # Page count, courses with every figure as a subquery, parts, tutors.
+    STATS_QUERIES = 4
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(make_user("admin@example.com", role=User.RoleChoices.ADMIN))
+        self.student = make_user("buyer@example.com")
+
+    def pay(self, courses, status):
+        order = Order.objects.create(user=self.student, total_amount=10)
+        order.courses.add(*courses)
+        Payment.objects.create(user=self.student, order=order, amount=10, status=status)
+
+    def stats(self):
+        cache.clear()
+        response = self.client.get("/api/courses/courses/stats/")
+        self.assertEqual(response.status_code, 200)
+        return {course["id"]: course for course in response.json()["results"]}
+
+    def test_figures_of_a_multi_tutor_multi_order_course(self):
+        course, other = make_courses(2)
+        course.tutors.add(make_user("tutor-c@example.com", role=User.RoleChoices.TUTOR))
+        self.pay([course, other], Payment.StatusChoices.COMPLETED)
+        self.pay([course], Payment.StatusChoices.COMPLETED)
+        self.pay([course], Payment.StatusChoices.FAILED)
+        self.pay([course], Payment.StatusChoices.PENDING)
+        Enrollment.objects.create(student=make_user("student@example.com"), course=course)
+
+        stats = self.stats()[str(course.pk)]
+
+        self.assertEqual(stats["number_of_tutors"], 3)
+        self.assertEqual(stats["number_of_lessons"], 4)
+        self.assertEqual(stats["number_of_enrolled"], 1)
+        self.assertEqual(stats["number_of_payments"], 4)
+        self.assertEqual(stats["number_of_completed_payments"], 2)
+        self.assertEqual(stats["number_of_failed_payments"], 1)
+        self.assertEqual(stats["number_of_pending_payments"], 1)
+        self.assertEqual(self.stats()[str(other.pk)]["number_of_payments"], 1)
+
+    def test_query_count_does_not_grow_with_courses(self):
+        for course in make_courses(3):
+            self.pay([course], Payment.StatusChoices.COMPLETED)
+        with self.assertNumQueries(self.STATS_QUERIES):
+            self.client.get("/api/courses/courses/stats/")
+
+        for course in make_courses(6, start=3):
+            self.pay([course], Payment.StatusChoices.PENDING)
+        cache.clear()
+        with self.assertNumQueries(self.STATS_QUERIES):
+            response = self.client.get("/api/courses/courses/stats/")
+        self.assertEqual(response.json()["count"], 9)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeSession:
+    """Answers each request with the next scripted status code or exception."""
+
+    def __init__(self, *outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+
+    def request(self, method, url, **kwargs):
+        self.calls += 1
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return mock.Mock(status_code=outcome, text="", json=lambda: {"otp": "otp"})
+
+
+class AsyncFakeSession(FakeSession):
+    async def request(self, method, url, **kwargs):
+        return FakeSession.request(self, method, url, **kwargs)
+
+
+class VdoCipherClientTests(TestCase):
+    def make_client(self, *outcomes, max_retries=2, breaker=None):
+        self.sleeps = []
+        self.session = FakeSession(*outcomes)
+        return vdocipher.VdoCipherClient(
+            base_url="https://vdocipher.test",
+            headers={},
+            session=self.session,
+            max_retries=max_retries,
+            backoff=1,
+            breaker=breaker or vdocipher.CircuitBreaker(failure_threshold=100),
+            sleep=self.sleeps.append,
+        )
+
+    def test_async_client_shares_the_retry_policy(self):
+        sleeps = []
+
+        async def sleep(delay):
+            sleeps.append(delay)
+
+        session = AsyncFakeSession(503, httpx.ReadTimeout("slow"), 200)
+        client = vdocipher.AsyncVdoCipherClient(
+            base_url="https://vdocipher.test",
+            headers={},
+            session=session,
+            max_retries=2,
+            backoff=1,
+            breaker=vdocipher.CircuitBreaker(failure_threshold=100),
+            sleep=sleep,
+        )
+
+        self.assertEqual(async_to_sync(client.get_otp)("video", 300), {"otp": "otp"})
+        self.assertEqual(session.calls, 3)
+        self.assertEqual(len(sleeps), 2)
+
+    def test_base_client_is_abstract(self):
+        with self.assertRaises(TypeError):
+            vdocipher.BaseVdoCipherClient(session=FakeSession())
+
+    def test_idempotent_calls_retry_with_jittered_backoff(self):
+        client = self.make_client(503, requests.Timeout(), 200)
+
+        with mock.patch("courses.vdocipher.random.uniform", side_effect=lambda low, high: high) as uniform:
+            self.assertEqual(client.get_otp("video", 300), {"otp": "otp"})
+
+        self.assertEqual(self.session.calls, 3)
+        self.assertEqual([call.args for call in uniform.call_args_list], [(0, 1), (0, 2)])
+        self.assertEqual(self.sleeps, [1, 2])
+
+    def test_retries_are_bounded(self):
+        client = self.make_client(503, 503, 503, max_retries=2)
+
+        with self.assertRaises(vdocipher.VdoCipherError) as raised:
+            client.get_otp("video", 300)
+        self.assertEqual(raised.exception.status_code, 503)
+        self.assertEqual(self.session.calls, 3)
+
+    def test_non_retryable_errors_fail_at_once(self):
+        client = self.make_client(requests.TooManyRedirects())
+        with self.assertRaises(vdocipher.VdoCipherError):
+            client.get_otp("video", 300)
+        self.assertEqual(self.session.calls, 1)
+
+        client = self.make_client(404)
+        with self.assertRaises(vdocipher.VdoCipherError):
+            client.get_otp("video", 300)
+        self.assertEqual(self.session.calls, 1)
+
+    def test_non_idempotent_calls_only_retry_when_nothing_was_sent(self):
+        client = self.make_client(requests.ConnectTimeout(), 503, 200)
+        self.assertEqual(client.get_upload_credentials("title", "folder").status_code, 200)
+        self.assertEqual(self.session.calls, 3)
+
+        # A read timeout or a 500 may have created the video already.
+        client = self.make_client(requests.ReadTimeout(), 200)
+        with self.assertRaises(vdocipher.VdoCipherError):
+            client.get_upload_credentials("title", "folder")
+        self.assertEqual(self.session.calls, 1)
+
+        client = self.make_client(500, 200)
+        self.assertEqual(client.get_upload_credentials("title", "folder").status_code, 500)
+        self.assertEqual(self.session.calls, 1)
+
+    def test_breaker_opens_after_consecutive_failures_and_recovers(self):
+        clock = FakeClock()
+        breaker = vdocipher.CircuitBreaker(failure_threshold=2, reset_timeout=30, clock=clock)
+        client = self.make_client(503, 503, 200, 200, max_retries=0, breaker=breaker)
+
+        for _ in range(2):
+            with self.assertRaises(vdocipher.VdoCipherError):
+                client.get_otp("video", 300)
+        self.assertTrue(breaker.is_open)
+
+        with self.assertRaises(vdocipher.CircuitOpenError):
+            client.get_otp("video", 300)
+        self.assertEqual(self.session.calls, 2)
+
+        clock.now = 30
+        self.assertEqual(client.get_otp("video", 300), {"otp": "otp"})
+        self.assertFalse(breaker.is_open)
+        self.assertEqual(client.get_otp("video", 300), {"otp": "otp"})
+
+    def test_half_open_breaker_lets_one_probe_through(self):
+        clock = FakeClock()
+        breaker = vdocipher.CircuitBreaker(failure_threshold=1, reset_timeout=30, clock=clock)
+        breaker.record_failure()
+
+        self.assertFalse(breaker.allow())
+        clock.now = 30
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+
+        breaker.record_failure()
+        clock.now = 59
+        self.assertFalse(breaker.allow())
+
+
+class CourseCounterSignalTests(TestCase):
+    def setUp(self):
+        self.course, self.other = make_courses(2)
+        self.lesson = Lesson.objects.filter(part__course=self.course).first()
+        self.student = make_user("student@example.com")
+
+    def counters(self, course, *fields):
+        course.refresh_from_db()
+        return tuple(getattr(course, field) for field in fields)
+
+    def test_duration_changes(self):
+        self.lesson.duration = timedelta(minutes=10)
+        self.lesson.save()
+        self.assertEqual(self.counters(self.course, "total_duration"), (timedelta(minutes=10),))
+
+        self.lesson.duration = timedelta(minutes=4)
+        self.lesson.save(update_fields=["duration"])
+        self.assertEqual(self.counters(self.course, "total_duration"), (timedelta(minutes=4),))
+
+    def test_moving_a_lesson_between_courses(self):
+        self.lesson.duration = timedelta(minutes=10)
+        self.lesson.save()
+
+        self.lesson.part = CoursePart.objects.filter(course=self.other).first()
+        self.lesson.save()
+
+        self.assertEqual(self.counters(self.course, "lessons_count", "total_duration"), (3, timedelta(0)))
+        self.assertEqual(self.counters(self.other, "lessons_count", "total_duration"), (5, timedelta(minutes=10)))
+
+    def test_saves_that_skip_part_and_duration_skip_the_counters(self):
+        self.lesson.title = "Renamed"
+        # The UPDATE and the course slug lookup for cache invalidation; no
+        # pre-read of the previous part and duration.
+        with self.assertNumQueries(2):
+            self.lesson.save(update_fields=["title", "slug", "updated_at"])
+        self.assertEqual(self.counters(self.course, "lessons_count"), (4,))
+
+    def test_comments(self):
+        comment = Comment.objects.create(user=self.student, lesson=self.lesson, text="First")
+        Comment.objects.create(user=self.student, lesson=self.lesson, text="Second")
+        self.assertEqual(self.counters(self.course, "comments_count"), (2,))
+
+        comment.delete()
+        self.assertEqual(self.counters(self.course, "comments_count"), (1,))
+
+        # Deleting the lesson detaches the other comment through SET_NULL.
+        self.lesson.delete()
+        self.assertEqual(self.counters(self.course, "comments_count", "lessons_count"), (0, 3))
+
+    def test_payment_status_transitions(self):
+        order = Order.objects.create(user=self.student, total_amount=10)
+        order.courses.add(self.course, self.other)
+        payment = Payment.objects.create(user=self.student, order=order, amount=10)
+        self.assertEqual(self.counters(self.course, "completed_revenue"), (0,))
+
+        payment.status = Payment.StatusChoices.COMPLETED
+        payment.save()
+        self.assertEqual(self.counters(self.course, "completed_revenue"), (10,))
+        self.assertEqual(self.counters(self.other, "completed_revenue"), (10,))
+
+        payment.status = Payment.StatusChoices.REFUNDED
+        payment.save()
+        self.assertEqual(self.counters(self.course, "completed_revenue"), (0,))
+
+        payment.status = Payment.StatusChoices.COMPLETED
+        payment.save()
+        payment.delete()
+        self.assertEqual(self.counters(self.course, "completed_revenue"), (0,))
+
+
+class CourseSaveTests(TestCase):
+    def test_regular_save_leaves_counters_alone(self):
+        course = make_courses(1)[0]
+        stale = Course.objects.get(pk=course.pk)
+        Enrollment.objects.create(student=make_user("student@example.com"), course=course)
+
+        stale.title = "Renamed"
+        stale.save()
+
+        course.refresh_from_db()
+        self.assertEqual((course.title, course.enrollments_count), ("Renamed", 1))
+
+    def test_force_insert_of_a_copy(self):
+        course = make_courses(1)[0]
+        course.pk = uuid.uuid4()
+        course.title = "Copy"
+        course.save(force_insert=True)
+
+        self.assertEqual(Course.objects.filter(title__in=["Course 0", "Copy"]).count(), 2)
+
+    def test_explicit_update_fields_are_kept(self):
+        course = make_courses(1)[0]
+        course.price = 99
+        course.title = "Ignored"
+        course.save(update_fields=["price"])
+
+        course.refresh_from_db()
+        self.assertEqual((course.title, course.price), ("Course 0", 99))
+
+
+class DashboardCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.course, self.other = make_courses(2)
+        self.student = make_user("student@example.com")
+        Enrollment.objects.create(student=self.student, course=self.course)
+
+    def dashboard(self):
+        # A fresh user, as on a real request: enrollments are memoized on it.
+        return get_dashboard(User.objects.get(pk=self.student.pk))
+
+    def test_course_edit_outdates_the_card(self):
+        self.assertEqual(self.dashboard()[0]["course"]["title"], "Course 0")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.course.title = "Renamed"
+            self.course.save()
+
+        self.assertEqual(self.dashboard()[0]["course"]["title"], "Renamed")
+
+    def test_lesson_changes_outdate_the_card(self):
+        self.dashboard()
+        with self.captureOnCommitCallbacks(execute=True):
+            Lesson.objects.filter(part__course=self.course).first().delete()
+
+        self.assertEqual(self.dashboard()[0]["course"]["lessons_count"], 3)
+
+    def test_other_courses_keep_the_cache(self):
+        self.dashboard()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.other.title = "Renamed"
+            self.other.save()
+
+        # Only the user lookup: the cached cards are reused.
+        with self.assertNumQueries(1):
+            self.dashboard()
+
+
+class ImportCourseTests(TestCase):
+    CSV = (
+        "part,title,duration,is_free_preview\n"
+        "Basics,Introduction,00:05:00,true\n"
+        "Basics,Variables,00:10:00,\n"
+        "Functions,Introduction,00:04:00,\n"
+    )
+
+    def setUp(self):
+        cache.clear()
+        self.tutor = make_user("tutor@example.com", role=User.RoleChoices.TUTOR)
+        self.api = APIClient()
+        self.api.force_authenticate(self.tutor)
+
+    def manifest(self, title="Python", lessons_per_part=2):
+        return {
+            "title": title,
+            "price": "10.00",
+            "parts": [
+                {
+                    "title": f"Part {part_index}",
+                    "lessons": [{"title": "Introduction"} for _ in range(lessons_per_part)],
+                }
+                for part_index in range(2)
+            ],
+        }
+
+    def write_file(self, suffix, content):
+        file = tempfile.NamedTemporaryFile("w", suffix=suffix, delete=False, encoding="utf-8")
+        with file:
+            file.write(content)
+        self.addCleanup(os.remove, file.name)
+        return file.name
+
+    def test_endpoint_imports_a_json_manifest(self):
+        response = self.api.post("/api/courses/courses/import/", self.manifest(), format="json")
+
+        self.assertEqual(response.status_code, 201)
+        course = Course.objects.get(slug=response.data["slug"])
+        self.assertEqual(response.data["lessons_count"], 4)
+        self.assertEqual(list(course.tutors.all()), [self.tutor])
+        self.assertEqual(course.lessons_count, 4)
+        self.assertEqual(
+            list(CoursePart.objects.filter(course=course).order_by("order").values_list("title", flat=True)),
+            ["Part 0", "Part 1"],
+        )
+
+    def test_endpoint_imports_a_csv_manifest(self):
+        upload = SimpleUploadedFile("lessons.csv", self.CSV.encode(), content_type="text/csv")
+        response = self.api.post(
+            "/api/courses/courses/import/",
+            {"file": upload, "title": "Python", "price": "10.00"},
+            format="multipart",
+        )
+
+        self.assertEqual(response.status_code, 201)
+        course = Course.objects.get(slug=response.data["slug"])
+        self.assertEqual(course.lessons_count, 3)
+        self.assertEqual(course.total_duration, timedelta(minutes=19))
+        basics = CoursePart.objects.get(course=course, title="Basics")
+        self.assertEqual(
+            list(basics.lessons.order_by("order").values_list("title", "is_free_preview")),
+            [("Introduction", True), ("Variables", False)],
+        )
+
+    def test_endpoint_rejects_a_duplicate_course(self):
+        self.api.post("/api/courses/courses/import/", self.manifest(), format="json")
+        response = self.api.post("/api/courses/courses/import/", self.manifest(), format="json")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(Course.objects.count(), 1)
+
+    def test_repeated_lesson_titles_get_unique_slugs(self):
+        # Far more lessons with the same title than one id character covers.
+        response = self.api.post(
+            "/api/courses/courses/import/", self.manifest(lessons_per_part=40), format="json"
+        )
+
+        self.assertEqual(response.status_code, 201)
+        slugs = list(Lesson.objects.values_list("slug", flat=True))
+        self.assertEqual(len(slugs), 80)
+        self.assertEqual(len(set(slugs)), 80)
+
+    def test_concurrent_import_of_the_same_course_fails_whole(self):
+        serializer = CourseManifestSerializer(data=self.manifest())
+        serializer.is_valid(raise_exception=True)
+        import_course(serializer.validated_data)
+
+        # As if another import committed between the slug check and the insert.
+        with mock.patch("courses.importer.check_slugs"):
+            with self.assertRaises(ManifestError):
+                import_course(serializer.validated_data)
+
+        self.assertEqual(Course.objects.count(), 1)
+        self.assertEqual(Lesson.objects.count(), 4)
+
+    def test_command_imports_a_json_manifest(self):
+        path = self.write_file(".json", json.dumps(self.manifest()))
+        out = io.StringIO()
+
+        call_command("import_course", path, "--tutor", self.tutor.email, stdout=out)
+
+        course = Course.objects.get(slug="python")
+        self.assertEqual(list(course.tutors.all()), [self.tutor])
+        self.assertEqual(course.lessons_count, 4)
+        self.assertIn("Imported python (2 parts, 4 lessons)", out.getvalue())
+
+    def test_command_imports_a_csv_manifest(self):
+        path = self.write_file(".csv", self.CSV)
+
+        call_command(
+            "import_course", path, "--title", "Python", "--price", "10", "--publish",
+            "--tutor", self.tutor.email, stdout=io.StringIO(),
+        )
+
+        course = Course.objects.get(slug="python")
+        self.assertTrue(course.is_published)
+        self.assertEqual(course.lessons_count, 3)
+        self.assertEqual(
+            list(CoursePart.objects.filter(course=course).order_by("order").values_list("title", flat=True)),
+            ["Basics", "Functions"],
+        )
+
+    def test_command_reports_errors(self):
+        path = self.write_file(".json", json.dumps(self.manifest()))
+        call_command("import_course", path, stdout=io.StringIO())
+
+        with self.assertRaises(CommandError):
+            call_command("import_course", path, stdout=io.StringIO())
+        with self.assertRaisesMessage(CommandError, "No users with email: nobody@example.com"):
+            call_command("import_course", path, "--tutor", "nobody@example.com", stdout=io.StringIO())
+
+
+class CourseFacetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.python, self.django = make_courses(2)
+        self.math = Course.objects.create(
+            title="Algebra", price=0, category=Category.objects.create(name="Math"), is_published=True
+        )
+        self.teacher = make_user(
+            "teacher@example.com", role=User.RoleChoices.TUTOR, first_name="Ada", last_name="Lovelace"
+        )
+        self.math.tutors.add(self.teacher)
+        self.python.tutors.add(self.teacher)
+
+    def facets(self, query=""):
+        response = self.client.get(f"/api/courses/courses/facets/{query}")
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def counts(self, facet_values):
+        return {entry["value"]: entry["count"] for entry in facet_values}
+
+    def test_counts_every_facet(self):
+        facets = self.facets()
+
+        self.assertEqual(facets["category"], [
+            {"value": "programming", "label": "Programming", "count": 2},
+            {"value": "math", "label": "Math", "count": 1},
+        ])
+        self.assertEqual(
+            self.counts(facets["price_band"]), {"free": 1, "under-50": 2, "50-100": 0, "100-plus": 0}
+        )
+        self.assertEqual(self.counts(facets["has_free_preview"]), {True: 2, False: 1})
+        tutors = facets["tutor"]
+        self.assertEqual(tutors[0], {"value": self.teacher.pk, "label": "Ada Lovelace", "count": 2})
+        self.assertEqual(len(tutors), 5)
+        self.assertEqual({entry["count"] for entry in tutors[1:]}, {1})
+
+    def test_each_facet_ignores_its_own_filter(self):
+        facets = self.facets("?category=math")
+
+        # The category facet still shows the sibling category ...
+        self.assertEqual(self.counts(facets["category"]), {"programming": 2, "math": 1})
+        # ... while the others only count Math courses.
+        self.assertEqual(
+            self.counts(facets["price_band"]), {"free": 1, "under-50": 0, "50-100": 0, "100-plus": 0}
+        )
+        self.assertEqual(self.counts(facets["has_free_preview"]), {True: 0, False: 1})
+        self.assertEqual(self.counts(facets["tutor"]), {self.teacher.pk: 1})
+
+        facets = self.facets(f"?tutor={self.teacher.pk}&has_free_preview=true")
+        self.assertEqual(self.counts(facets["category"]), {"programming": 1})
+        self.assertEqual(self.counts(facets["has_free_preview"]), {True: 1, False: 1})
+        self.assertEqual(self.counts(facets["tutor"])[self.teacher.pk], 1)
+
+    def test_all_facets_take_one_query(self):
+        with self.assertNumQueries(1):
+            course_facets(QueryDict("category=math&price_band=free"), Course.objects.all())
+
+
+class SearchTestsMixin:
+    def setUp(self):
+        cache.clear()
+        self.titled = Course.objects.create(
+            title="Intro to Calculus", description="Limits and series", price=10, is_published=True
+        )
+        self.described = Course.objects.create(
+            title="Applied Mathematics", description="Some calculus for engineers", price=10, is_published=True
+        )
+        Course.objects.create(title="Poetry", description="Sonnets", price=10, is_published=True)
+        part = CoursePart.objects.create(course=self.titled, title="Limits", order=0)
+        self.lesson = Lesson.objects.create(part=part, title="Calculus warm-up", order=0)
+        Lesson.objects.create(part=part, title="Sonnet forms", order=1)
+
+    def search(self, query):
+        response = self.client.get("/api/courses/search/", {"q": query})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_title_hits_rank_above_description_hits(self):
+        results = self.search("calculus")
+
+        self.assertEqual(
+            [course["id"] for course in results["courses"]], [str(self.titled.pk), str(self.described.pk)]
+        )
+
+    def test_lesson_hits_carry_their_course(self):
+        lessons = self.search("calculus")["lessons"]
+
+        self.assertEqual([lesson["id"] for lesson in lessons], [str(self.lesson.pk)])
+        self.assertEqual(lessons[0]["part_title"], "Limits")
+        self.assertEqual(lessons[0]["course_slug"], self.titled.slug)
+
+
+class SearchTests(SearchTestsMixin, TestCase):
+    """The icontains fallback, on whatever backend the tests run against."""
+
+    def search(self, query):
+        with mock.patch("courses.search.uses_full_text_search", return_value=False):
+            return super().search(query)
+
+
+@skipUnless(connection.vendor == "postgresql", "Full-text search needs PostgreSQL")
+class PostgresSearchTests(SearchTestsMixin, TestCase):
+    """Ranked full-text search on the trigger-maintained search vectors."""
+
+    def test_triggers_index_bulk_writes(self):
+        # queryset.update() and bulk_create() bypass save() and signals.
+        Course.objects.filter(pk=self.described.pk).update(title="Calculus for Engineers")
+        part = CoursePart.objects.get(course=self.titled)
+        Lesson.objects.bulk_create([Lesson(part=part, title="Integral calculus", slug="integral", order=2)])
+
+        results = self.search("calculus")
+
+        self.assertEqual(
+            {course["id"] for course in results["courses"]}, {str(self.titled.pk), str(self.described.pk)}
+        )
+        self.assertEqual(
+            {lesson["title"] for lesson in results["lessons"]}, {"Calculus warm-up", "Integral calculus"}
+        )
+
+    def test_stemmed_words_match(self):
+        sonnet = Lesson.objects.get(title="Sonnet forms")
+
+        self.assertEqual([lesson["id"] for lesson in self.search("sonnets")["lessons"]], [str(sonnet.pk)])
+
+
+class CourseDetailCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.course = make_courses(1)[0]
+        self.lesson = Lesson.objects.get(part__course=self.course, title="Lesson 0.0.0")
+
+    def lesson_titles(self, slug):
+        return [lesson["title"] for part in get_course_detail(slug)["parts"] for lesson in part["lessons"]]
+
+    def test_cached_tree_costs_no_queries(self):
+        get_course_detail(self.course.slug)
+
+        with self.assertNumQueries(0):
+            get_course_detail(self.course.slug)
+
+    def test_lesson_edit_drops_the_tree_on_commit(self):
+        self.assertIn("Lesson 0.0.0", self.lesson_titles(self.course.slug))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.lesson.title = "Renamed"
+            self.lesson.save()
+            # Until the edit commits, readers keep getting the cached tree.
+            self.assertIn("Lesson 0.0.0", self.lesson_titles(self.course.slug))
+
+        titles = self.lesson_titles(self.course.slug)
+        self.assertIn("Renamed", titles)
+        self.assertNotIn("Lesson 0.0.0", titles)
+
+    def test_lesson_delete_drops_the_tree(self):
+        get_course_detail(self.course.slug)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.lesson.delete()
+
+        self.assertNotIn("Lesson 0.0.0", self.lesson_titles(self.course.slug))
+
+    def test_course_rename_drops_the_old_slug(self):
+        old_slug = self.course.slug
+        get_course_detail(old_slug)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.course.title = "Renamed"
+            self.course.save()
+
+        self.assertIsNone(get_course_detail(old_slug))
+        self.assertEqual(get_course_detail(self.course.slug)["title"], "Renamed")
+
+
+class EntitlementCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.course, self.other = make_courses(2)
+        self.student = make_user("student@example.com")
+
+    def fresh_student(self):
+        # The enrolled ids are memoized on the user object for a request.
+        return User.objects.get(pk=self.student.pk)
+
+    def test_enrolled_ids_are_cached_across_requests(self):
+        get_enrolled_course_ids(self.fresh_student())
+        student = self.fresh_student()
+
+        with self.assertNumQueries(0):
+            self.assertFalse(is_enrolled(student, self.course.pk))
+
+    def test_enrolling_drops_the_cached_ids(self):
+        self.assertFalse(is_enrolled(self.fresh_student(), self.course.pk))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            enrollment = Enrollment.objects.create(student=self.student, course=self.course)
+
+        student = self.fresh_student()
+        self.assertTrue(is_enrolled(student, self.course.pk))
+        self.assertFalse(is_enrolled(student, self.other.pk))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            enrollment.delete()
+
+        self.assertFalse(is_enrolled(self.fresh_student(), self.course.pk))
+
+    def test_async_lookup_sees_the_new_enrollment(self):
+        self.assertFalse(async_to_sync(ais_enrolled)(self.fresh_student(), self.course.pk))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Enrollment.objects.create(student=self.student, course=self.course)
+
+        self.assertTrue(async_to_sync(ais_enrolled)(self.fresh_student(), self.course.pk))
+
+    def test_other_users_keep_their_cache(self):
+        other_student = make_user("other@example.com")
+        get_enrolled_course_ids(User.objects.get(pk=other_student.pk))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Enrollment.objects.create(student=self.student, course=self.course)
+
+        other_student = User.objects.get(pk=other_student.pk)
+        with self.assertNumQueries(0):
+            self.assertFalse(is_enrolled(other_student, self.course.pk))
+
+
+class CursorPaginationTests(TestCase):
+    def setUp(self):
+        user = make_user("student@example.com")
+        lesson = make_courses(1)[0].parts.first().lessons.first()
+        Comment.objects.bulk_create(
+            [Comment(user=user, lesson=lesson, text=f"Comment {index}") for index in range(25)]
+        )
+        # Every row shares one timestamp, e.g. from a bulk import.
+        Comment.objects.update(created_at=timezone.now())
+        self.api = APIClient()
+        self.api.force_authenticate(user)
+
+    def walk(self, url):
+        ids = []
+        while url:
+            response = self.api.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn("count", response.data)
+            ids += [comment["id"] for comment in response.data["results"]]
+            url = response.data["next"]
+        return ids
+
+    def test_equal_timestamps_page_without_gaps_or_repeats(self):
+        ids = self.walk("/api/courses/comments/?pagination=cursor&page_size=10")
+
+        expected = sorted((str(pk) for pk in Comment.objects.values_list("pk", flat=True)), reverse=True)
+        self.assertEqual(ids, expected)
+
+    def test_new_rows_do_not_shift_later_pages(self):
+        response = self.api.get("/api/courses/comments/?pagination=cursor&page_size=10")
+        first_page = [comment["id"] for comment in response.data["results"]]
+        Comment.objects.create(text="Newer")
+
+        ids = first_page + self.walk(response.data["next"])
+
+        self.assertEqual(len(ids), 25)
+        self.assertEqual(len(set(ids)), 25)
+        self.assertFalse(Comment.objects.filter(pk__in=ids, text="Newer").exists())
+
+    def test_previous_link_returns_the_same_page(self):
+        first = self.api.get("/api/courses/comments/?pagination=cursor&page_size=10").data
+        second = self.api.get(first["next"]).data
+
+        self.assertEqual(self.api.get(second["previous"]).data["results"], first["results"])
+
+    def test_malformed_cursor_is_not_found(self):
+        response = self.api.get("/api/courses/comments/?cursor=cD1ub3QtYS1kYXRl")
+
+        self.assertEqual(response.status_code, 404)
+
+
+class VideoOtpCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.alice = make_user("alice@example.com")
+        self.bob = make_user("bob@example.com")
+        self.vdo = mock.Mock()
+        # A distinct OTP per call, so reuse is visible.
+        self.vdo.get_otp.side_effect = lambda video_id, ttl: {"otp": f"otp-{self.vdo.get_otp.call_count}"}
+        patcher = mock.patch.object(vdocipher, "get_client", return_value=self.vdo)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_otp_is_reused_per_user_and_video(self):
+        first = vdocipher.get_video_otp("video-1", self.alice)
+
+        self.assertEqual(vdocipher.get_video_otp("video-1", self.alice), first)
+        self.assertNotEqual(vdocipher.get_video_otp("video-2", self.alice), first)
+        self.assertNotEqual(vdocipher.get_video_otp("video-1", self.bob), first)
+        self.assertEqual(self.vdo.get_otp.call_count, 3)
+        self.assertEqual(vdocipher.otp_cache_stats(), {"hit": 1, "miss": 3})
+
+    def test_cache_keys_separate_users_and_videos(self):
+        keys = {
+            vdocipher.otp_cache_key(self.alice, "video-1"),
+            vdocipher.otp_cache_key(self.alice, "video-2"),
+            vdocipher.otp_cache_key(self.bob, "video-1"),
+            vdocipher.otp_cache_key(None, "video-1"),
+        }
+
+        self.assertEqual(len(keys), 4)
+
+    def test_errors_are_not_cached(self):
+        self.vdo.get_otp.side_effect = [
+            vdocipher.VdoCipherError("down", status_code=503),
+            {"otp": "fresh"},
+        ]
+
+        with self.assertRaises(vdocipher.VdoCipherError):
+            vdocipher.get_video_otp("video-1", self.alice)
+
+        self.assertIsNone(cache.get(vdocipher.otp_cache_key(self.alice, "video-1")))
+        self.assertEqual(vdocipher.get_video_otp("video-1", self.alice), {"otp": "fresh"})
+
+    def test_async_lookup_shares_the_cache(self):
+        first = vdocipher.get_video_otp("video-1", self.alice)
+
+        self.assertEqual(async_to_sync(vdocipher.aget_video_otp)("video-1", self.alice), first)
+        self.assertEqual(self.vdo.get_otp.call_count, 1)
+
+    def test_async_errors_are_not_cached(self):
+        self.vdo.get_otp.side_effect = [
+            vdocipher.VdoCipherError("down", status_code=503),
+            {"otp": "fresh"},
+        ]
+
+        with self.assertRaises(vdocipher.VdoCipherError):
+            async_to_sync(vdocipher.aget_video_otp)("video-1", self.alice)
+
+        self.assertEqual(async_to_sync(vdocipher.aget_video_otp)("video-1", self.alice), {"otp": "fresh"})
+        self.assertEqual(self.vdo.get_otp.call_count, 2)
+
+
+class PartOtpsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.course = make_courses(1)[0]
+        self.part = CoursePart.objects.create(course=self.course, title="Extras", order=2)
+        self.lessons = [
+            Lesson.objects.create(
+                part=self.part,
+                title=f"Extra {index}",
+                order=index,
+                video_service_id=f"video-{index}",
+                is_free_preview=index in (0, 2),
+            )
+            for index in range(4)
+        ]
+        self.student = make_user("student@example.com")
+        self.api = APIClient()
+        self.api.force_authenticate(self.student)
+
+        async def fake_otps(video_ids, user):
+            return {video_id: {"otp": f"otp-{video_id}", "playbackInfo": "info"} for video_id in video_ids}
+
+        patcher = mock.patch("courses.api.views.aget_video_otps", side_effect=fake_otps)
+        self.aget_video_otps = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def otps(self, query=""):
+        response = self.api.get(f"/api/courses/course-parts/{self.part.slug}/otps/{query}")
+        self.assertEqual(response.status_code, 200)
+        return [entry["slug"] for entry in response.json()]
+
+    def test_non_enrolled_students_only_get_free_previews(self):
+        self.assertEqual(self.otps(), [self.lessons[0].slug, self.lessons[2].slug])
+        # Locked lessons' videos are never even requested from VdoCipher.
+        self.assertEqual(self.aget_video_otps.call_args.args[0], ["video-0", "video-2"])
+
+    def test_enrolled_students_get_every_lesson(self):
+        Enrollment.objects.create(student=self.student, course=self.course)
+
+        self.assertEqual(self.otps(), [lesson.slug for lesson in self.lessons])
+
+    def test_after_and_limit_select_the_next_lessons(self):
+        Enrollment.objects.create(student=self.student, course=self.course)
+
+        self.assertEqual(
+            self.otps(f"?after={self.lessons[0].slug}&limit=2"), [self.lessons[1].slug, self.lessons[2].slug]
+        )
+
+    def test_lessons_without_an_otp_are_left_out(self):
+        self.aget_video_otps.side_effect = None
+        self.aget_video_otps.return_value = {"video-2": {"otp": "otp", "playbackInfo": "info"}}
+
+        self.assertEqual(self.otps(), [self.lessons[2].slug])
+
+    def test_unknown_part_or_lesson_is_not_found(self):
+        self.assertEqual(self.api.get("/api/courses/course-parts/missing/otps/").status_code, 404)
+        response = self.api.get(f"/api/courses/course-parts/{self.part.slug}/otps/?after=missing")
+        self.assertEqual(response.status_code, 404)
+
+
+class LessonCommentFeedTests(TestCase):
+    def setUp(self):
+        self.student = make_user("student@example.com")
+        lessons = Lesson.objects.filter(part__course=make_courses(1)[0]).order_by("part__order", "order")
+        self.lesson, other_lesson = lessons[0], lessons[1]
+        now = timezone.now()
+        comments = Comment.objects.bulk_create(
+            [Comment(user=self.student, lesson=self.lesson, text=f"Comment {index}") for index in range(7)]
+            + [Comment(user=self.student, lesson=other_lesson, text="Elsewhere")]
+        )
+        # Two pairs of comments share a timestamp.
+        for comment, minutes in zip(comments, (0, 1, 1, 2, 3, 3, 4, 5)):
+            Comment.objects.filter(pk=comment.pk).update(created_at=now + timedelta(minutes=minutes))
+        self.api = APIClient()
+        self.api.force_authenticate(self.student)
+
+    def test_pages_run_newest_first_without_gaps(self):
+        url = f"/api/courses/lessons/{self.lesson.slug}/comments/?page_size=3"
+        ids, pages = [], 0
+        while url:
+            response = self.api.get(url)
+            self.assertEqual(response.status_code, 200)
+            ids += [comment["id"] for comment in response.data["results"]]
+            url = response.data["next"]
+            pages += 1
+
+        expected = [
+            str(pk) for pk in Comment.objects.filter(lesson=self.lesson)
+            .order_by("-created_at", "-id").values_list("pk", flat=True)
+        ]
+        self.assertEqual(ids, expected)
+        self.assertEqual(pages, 3)
 
-# Create your tests here.
+    def test_unknown_lesson_is_not_found(self):
+        self.assertEqual(self.api.get("/api/courses/lessons/missing/comments/").status_code, 404)
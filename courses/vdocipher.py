@@ -0,0 +1,441 @@
+import abc
+import asyncio
+import functools
+import logging
+import random
+import ssl
+import threading
+import time
+import weakref
+
+import certifi
+import httpx
+import requests
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+OTP_STATS_KEYS = {"hit": "vdocipher:otp:hits", "miss": "vdocipher:otp:misses"}
+
+# Responses worth another attempt. Non-idempotent calls only retry the
+# statuses that guarantee VdoCipher did not act on the request.
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+NON_IDEMPOTENT_RETRY_STATUSES = frozenset({429, 503})
+
+
+class VdoCipherError(Exception):
+    def __init__(self, message, status_code=None, details=None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.details = details
+
+
+class CircuitOpenError(VdoCipherError):
+    pass
+
+
+class CircuitBreaker:
+    """
+    Fails fast once `failure_threshold` consecutive calls have failed, then
+    lets a single trial call through every `reset_timeout` seconds until
+    one succeeds. State is per process.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+        self.lock = threading.Lock()
+
+    @property
+    def is_open(self):
+        return self.opened_at is not None
+
+    def allow(self):
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if self.clock() - self.opened_at >= self.reset_timeout:
+                # Half-open: re-arm the timer so only this caller probes.
+                self.opened_at = self.clock()
+                return True
+            return False
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.failures >= self.failure_threshold:
+                self.opened_at = self.clock()
+
+
+class BaseVdoCipherClient(abc.ABC):
+    """
+    Configuration and retry policy shared by the sync and async clients:
+    connect/read timeouts on every call, bounded retries with jittered
+    exponential backoff and a circuit breaker.
+
+    `session` may be any object with a `request(method, url, **kwargs)`
+    compatible with the client's HTTP library, which lets tests and load
+    tests swap in a local fake transport.
+    """
+
+    # Transport errors retried for idempotent calls, and the subset that
+    # proves the request never reached VdoCipher.
+    retry_errors = ()
+    connect_errors = ()
+    transport_error = Exception
+
+    def __init__(
+        self,
+        base_url=None,
+        headers=None,
+        session=None,
+        timeout=None,
+        max_retries=None,
+        backoff=None,
+        breaker=None,
+        pool_size=None,
+        sleep=None,
+    ):
+        self.base_url = (base_url or settings.VDOCIPHER_API_URL).rstrip("/")
+        self.headers = headers if headers is not None else settings.VDOCIPHER_HEADERS
+        self.timeout = timeout or (
+            settings.VDOCIPHER_CONNECT_TIMEOUT,
+            settings.VDOCIPHER_READ_TIMEOUT,
+        )
+        self.max_retries = settings.VDOCIPHER_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff = settings.VDOCIPHER_RETRY_BACKOFF if backoff is None else backoff
+        self.breaker = breaker or CircuitBreaker(
+            failure_threshold=settings.VDOCIPHER_BREAKER_THRESHOLD,
+            reset_timeout=settings.VDOCIPHER_BREAKER_RESET_TIMEOUT,
+        )
+        self.session = session or self.build_session(pool_size)
+        if sleep is not None:
+            self.sleep = sleep
+
+    @abc.abstractmethod
+    def build_session(self, pool_size):
+        """The pooled HTTP session used when none is passed in."""
+
+    def prepare(self, path, idempotent):
+        if not self.breaker.allow():
+            raise CircuitOpenError("VdoCipher circuit is open", status_code=503)
+        url = f"{self.base_url}/{path.lstrip('/')}"
+        if idempotent:
+            return url, RETRY_STATUSES, self.retry_errors
+        return url, NON_IDEMPOTENT_RETRY_STATUSES, self.connect_errors
+
+    def check_response(self, response, retry_statuses):
+        """Return an error to retry on, or None once `response` is final."""
+        if response.status_code in retry_statuses:
+            return VdoCipherError(
+                "VdoCipher is unavailable",
+                status_code=response.status_code,
+                details=response.text,
+            )
+        if response.status_code >= 500:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        return None
+
+    def transport_failed(self, error):
+        self.breaker.record_failure()
+        return VdoCipherError(f"VdoCipher request failed: {error}")
+
+    def retry_delay(self, attempt):
+        # Full jitter keeps workers from retrying in lockstep.
+        return random.uniform(0, self.backoff * 2 ** attempt)
+
+    @staticmethod
+    def parse_otp(response):
+        if response.status_code != 200:
+            raise VdoCipherError(
+                "Failed to get video OTP", status_code=response.status_code, details=response.text
+            )
+        return response.json()
+
+    @staticmethod
+    def upload_params(title, folder_id):
+        return {"title": title, "folderId": folder_id}
+
+
+class VdoCipherClient(BaseVdoCipherClient):
+    """
+    Blocking client: one pooled keep-alive `requests.Session` per process.
+    """
+
+    retry_errors = (requests.ConnectionError, requests.Timeout)
+    connect_errors = (requests.ConnectTimeout,)
+    transport_error = requests.RequestException
+    sleep = staticmethod(time.sleep)
+
+    def build_session(self, pool_size):
+        session = requests.Session()
+        # Retries are handled in request() so they share the breaker and
+        # backoff policy; the adapter only pools connections.
+        adapter = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=pool_size or settings.VDOCIPHER_POOL_SIZE,
+            max_retries=0,
+        )
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def request(self, method, path, idempotent=True, **kwargs):
+        url, retry_statuses, retry_errors = self.prepare(path, idempotent)
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = self.session.request(
+                    method, url, headers=self.headers, timeout=self.timeout, **kwargs
+                )
+            except retry_errors as e:
+                error = VdoCipherError(f"VdoCipher request failed: {e}")
+            except self.transport_error as e:
+                raise self.transport_failed(e) from e
+            else:
+                error = self.check_response(response, retry_statuses)
+                if error is None:
+                    return response
+
+            if attempt < self.max_retries:
+                self.sleep(self.retry_delay(attempt))
+
+        self.breaker.record_failure()
+        raise error
+
+    def get_otp(self, video_id, ttl):
+        return self.parse_otp(self.request("POST", f"videos/{video_id}/otp", json={"ttl": ttl}))
+
+    def get_upload_credentials(self, title, folder_id):
+        # Every call creates a video on VdoCipher's side, so it is not retried
+        # once the request may have reached them.
+        return self.request(
+            "PUT", "videos", idempotent=False, params=self.upload_params(title, folder_id)
+        )
+
+
+class AsyncVdoCipherClient(BaseVdoCipherClient):
+    """
+    Non-blocking client for async views: an `httpx.AsyncClient` whose pool
+    is sized for hundreds of in-flight calls. It is bound to the event loop
+    it was created on, so use get_async_client() rather than sharing one.
+    """
+
+    retry_errors = (httpx.TimeoutException, httpx.NetworkError)
+    connect_errors = (httpx.ConnectTimeout, httpx.ConnectError)
+    transport_error = httpx.HTTPError
+    sleep = staticmethod(asyncio.sleep)
+
+    def build_session(self, pool_size):
+        pool_size = pool_size or settings.VDOCIPHER_ASYNC_POOL_SIZE
+        return httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size),
+            verify=get_ssl_context(),
+        )
+
+    async def request(self, method, path, idempotent=True, **kwargs):
+        url, retry_statuses, retry_errors = self.prepare(path, idempotent)
+        connect, read = self.timeout
+        timeout = httpx.Timeout(read, connect=connect)
+
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = await self.session.request(
+                    method, url, headers=self.headers, timeout=timeout, **kwargs
+                )
+            except retry_errors as e:
+                error = VdoCipherError(f"VdoCipher request failed: {e}")
+            except self.transport_error as e:
+                raise self.transport_failed(e) from e
+            else:
+                error = self.check_response(response, retry_statuses)
+                if error is None:
+                    return response
+
+            if attempt < self.max_retries:
+                await self.sleep(self.retry_delay(attempt))
+
+        self.breaker.record_failure()
+        raise error
+
+    async def get_otp(self, video_id, ttl):
+        return self.parse_otp(
+            await self.request("POST", f"videos/{video_id}/otp", json={"ttl": ttl})
+        )
+
+    async def get_upload_credentials(self, title, folder_id):
+        return await self.request(
+            "PUT", "videos", idempotent=False, params=self.upload_params(title, folder_id)
+        )
+
+
+_breaker = None
+_client = None
+_client_lock = threading.Lock()
+_async_clients = weakref.WeakKeyDictionary()
+# Only an ASGI server runs one long-lived event loop per process, so only
+# then is a client per loop reused. eleven_tutors.asgi turns this on.
+_async_clients_enabled = False
+
+
+@functools.cache
+def get_ssl_context():
+    # Loading the CA bundle costs tens of milliseconds; build it once.
+    return ssl.create_default_context(cafile=certifi.where())
+
+
+def get_breaker():
+    """One breaker per process, shared by the sync and async clients."""
+    global _breaker
+    if _breaker is None:
+        with _client_lock:
+            if _breaker is None:
+                _breaker = CircuitBreaker(
+                    failure_threshold=settings.VDOCIPHER_BREAKER_THRESHOLD,
+                    reset_timeout=settings.VDOCIPHER_BREAKER_RESET_TIMEOUT,
+                )
+    return _breaker
+
+
+def get_client():
+    """The process-wide client, so every request shares its pool and breaker."""
+    global _client
+    if _client is None:
+        breaker = get_breaker()
+        with _client_lock:
+            if _client is None:
+                _client = VdoCipherClient(breaker=breaker)
+    return _client
+
+
+def use_async_clients(enabled=True):
+    global _async_clients_enabled
+    _async_clients_enabled = enabled
+
+
+def get_async_client():
+    """
+    The async client for the running event loop, or None when not served by
+    an ASGI server. Under WSGI every async view runs on a throwaway loop, so
+    a client per loop would never be reused nor closed; callers fall back to
+    the pooled sync client in a thread instead.
+    """
+    if not _async_clients_enabled:
+        return None
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = _async_clients[loop] = AsyncVdoCipherClient(breaker=get_breaker())
+    return client
+
+
+async def aget_otp(video_id, ttl):
+    client = get_async_client()
+    if client is None:
+        return await sync_to_async(get_client().get_otp, thread_sensitive=False)(video_id, ttl)
+    return await client.get_otp(video_id, ttl)
+
+
+async def aget_upload_credentials(title, folder_id):
+    """Async get_upload_credentials() on whichever client suits the server."""
+    client = get_async_client()
+    if client is None:
+        return await sync_to_async(get_client().get_upload_credentials, thread_sensitive=False)(
+            title, folder_id
+        )
+    return await client.get_upload_credentials(title, folder_id)
+
+
+def otp_cache_key(user, video_id):
+    owner = user.pk if user and user.is_authenticated else "anonymous"
+    return f"vdocipher:otp:{owner}:{video_id}"
+
+
+def record_otp_cache(outcome):
+    key = OTP_STATS_KEYS[outcome]
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, timeout=None)
+        cache.incr(key)
+    logger.debug(f"VdoCipher OTP cache {outcome}")
+
+
+async def arecord_otp_cache(outcome):
+    # The cache's async incr is a read-modify-write that loses counts under
+    # concurrency, so use the backend's atomic sync incr in a thread.
+    await sync_to_async(record_otp_cache)(outcome)
+
+
+def otp_cache_stats():
+    stats = cache.get_many(OTP_STATS_KEYS.values())
+    return {outcome: stats.get(key, 0) for outcome, key in OTP_STATS_KEYS.items()}
+
+
+def get_video_otp(video_id, user):
+    """
+    Return VdoCipher's {"otp", "playbackInfo"} for the video, reusing the
+    one issued to this user within the last VDOCIPHER_OTP_CACHE_TIMEOUT
+    seconds. The cache timeout is a fraction of the OTP TTL, so a reused
+    OTP still has most of its lifetime left when the player redeems it.
+    Raises VdoCipherError when VdoCipher does not return one.
+    """
+    key = otp_cache_key(user, video_id)
+    otp = cache.get(key)
+    if otp is not None:
+        record_otp_cache("hit")
+        return otp
+
+    record_otp_cache("miss")
+    otp = get_client().get_otp(video_id, settings.VDOCIPHER_OTP_TTL)
+    cache.set(key, otp, timeout=settings.VDOCIPHER_OTP_CACHE_TIMEOUT)
+    return otp
+
+
+async def aget_video_otp(video_id, user):
+    """Async version of get_video_otp(), for async views."""
+    key = otp_cache_key(user, video_id)
+    otp = await cache.aget(key)
+    if otp is not None:
+        await arecord_otp_cache("hit")
+        return otp
+
+    await arecord_otp_cache("miss")
+    otp = await aget_otp(video_id, settings.VDOCIPHER_OTP_TTL)
+    await cache.aset(key, otp, timeout=settings.VDOCIPHER_OTP_CACHE_TIMEOUT)
+    return otp
+
+
+async def aget_video_otps(video_ids, user):
+    """
+    OTPs for several videos at once, fetched concurrently. Videos whose OTP
+    could not be fetched are left out, so the player can fall back to
+    requesting them one at a time.
+    """
+    video_ids = list(dict.fromkeys(video_id for video_id in video_ids if video_id))
+    results = await asyncio.gather(
+        *(aget_video_otp(video_id, user) for video_id in video_ids), return_exceptions=True
+    )
+
+    otps = {}
+    for video_id, result in zip(video_ids, results):
+        if isinstance(result, VdoCipherError):
+            logger.error(f"VdoCipher OTP error for video {video_id}: {result.status_code} - {result.details}")
+        elif isinstance(result, BaseException):
+            raise result
+        else:
+            otps[video_id] = result
+    return otps
@@ -14,3 +14,9 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "eleven_tutors.settings")
 
 application = get_asgi_application()
+
+# Served by an ASGI server: each worker keeps one event loop, so async views
+# can keep a pooled VdoCipher client per loop.
+from courses.vdocipher import use_async_clients  # noqa: E402
+
+use_async_clients()
@@ -0,0 +1,73 @@
+import hashlib
+
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+
+class ConditionalGetMixin:
+    """
+    ETag / Last-Modified support for list and retrieve on BaseModel-backed
+    viewsets. Validators come from one `max(updated_at)` + `count(*)`
+    aggregate per validator queryset, so a matching conditional request is
+    answered with 304 before anything is fetched or serialized.
+    """
+    cache_max_age = 60
+
+    def get_validator_querysets(self):
+        """
+        Querysets whose rows end up in the response. Any insert, update or
+        delete in them changes the ETag.
+        """
+        queryset = self.get_queryset()
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        if lookup_url_kwarg in self.kwargs:
+            queryset = queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        return [queryset]
+
+    def get_validator_fingerprint(self, request):
+        """Anything else the response depends on, e.g. per-user flags."""
+        return []
+
+    def get_validators(self, request):
+        last_modified = None
+        fingerprint = [request.get_full_path(), request.accepted_renderer.format]
+        fingerprint += map(str, self.get_validator_fingerprint(request))
+
+        for queryset in self.get_validator_querysets():
+            stats = queryset.order_by().aggregate(
+                last_modified=Max("updated_at"), count=Count("pk")
+            )
+            fingerprint.append(f"{stats['count']}:{stats['last_modified']}")
+            if stats["last_modified"] and (
+                last_modified is None or stats["last_modified"] > last_modified
+            ):
+                last_modified = stats["last_modified"]
+
+        etag = quote_etag(hashlib.md5("|".join(fingerprint).encode()).hexdigest())
+        return etag, int(last_modified.timestamp()) if last_modified else None
+
+    def conditional_response(self, handler, request, *args, **kwargs):
+        etag, last_modified = self.get_validators(request)
+
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            response = handler(request, *args, **kwargs)
+
+        if response.status_code in (200, 304):
+            response.headers["ETag"] = etag
+            if last_modified:
+                response.headers["Last-Modified"] = http_date(last_modified)
+            if request.user.is_authenticated:
+                patch_cache_control(response, private=True, no_cache=True)
+            else:
+                patch_cache_control(response, public=True, max_age=self.cache_max_age)
+            patch_vary_headers(response, ("Accept", "Authorization", "Cookie"))
+
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.conditional_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.conditional_response(super().retrieve, request, *args, **kwargs)
@@ -0,0 +1,122 @@
+import csv
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.exceptions import PermissionDenied
+
+from eleven_tutors.serializers import DateRangeSerializer
+
+CONTENT_TYPES = {
+    "csv": "text/csv; charset=utf-8",
+    "ndjson": "application/x-ndjson",
+}
+
+
+class ExportSerializer(DateRangeSerializer):
+    """`from`, `to` (inclusive dates), `tutor` and `output` query parameters"""
+    tutor = serializers.CharField(required=False)
+    # Not `format`: DRF reserves it for picking a renderer.
+    output = serializers.ChoiceField(choices=tuple(CONTENT_TYPES), default="csv")
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        return {
+            "since": attrs.get("from"),
+            "until": attrs.get("to"),
+            "tutor": attrs.get("tutor"),
+            "output": attrs["output"],
+        }
+
+
+def export_tutor(user, tutor=None):
+    """
+    The tutor an export is limited to: whichever was asked for (or none)
+    for admins, always the user themselves for tutors.
+    """
+    if user.is_staff or user.role == user.RoleChoices.ADMIN:
+        return tutor
+    if user.role == user.RoleChoices.TUTOR:
+        return user.pk
+    raise PermissionDenied()
+
+
+def in_range(queryset, field, since=None, until=None):
+    """Rows whose `field` falls on a local day from `since` to `until`, inclusive."""
+    if since:
+        queryset = queryset.filter(**{f"{field}__gte": timezone.make_aware(datetime.combine(since, time.min))})
+    if until:
+        end = datetime.combine(until + timedelta(days=1), time.min)
+        queryset = queryset.filter(**{f"{field}__lt": timezone.make_aware(end)})
+    return queryset
+
+
+class Echo:
+    """A file-like object that hands back what csv.writer writes to it."""
+
+    def write(self, value):
+        return value
+
+
+def line_encoder(output, columns):
+    if output == "csv":
+        return csv.writer(Echo()).writerow
+    encoder = DjangoJSONEncoder(separators=(",", ":"))
+    return lambda row: encoder.encode(dict(zip(columns, row))) + "\n"
+
+
+def export_lines(rows, columns, output):
+    """
+    Encode `rows` (value tuples) as CSV with a header or as NDJSON, joining
+    up to EXPORT_CHUNK_SIZE lines per write so memory stays flat however
+    many rows there are.
+    """
+    encode = line_encoder(output, columns)
+    lines = [encode(columns)] if output == "csv" else []
+    for row in rows:
+        lines.append(encode(row))
+        if len(lines) >= settings.EXPORT_CHUNK_SIZE:
+            yield "".join(lines)
+            lines = []
+    if lines:
+        yield "".join(lines)
+
+
+async def aexport_lines(rows, columns, output):
+    encode = line_encoder(output, columns)
+    lines = [encode(columns)] if output == "csv" else []
+    async for row in rows:
+        lines.append(encode(row))
+        if len(lines) >= settings.EXPORT_CHUNK_SIZE:
+            yield "".join(lines)
+            lines = []
+    if lines:
+        yield "".join(lines)
+
+
+def export_response(request, queryset, columns, output, filename):
+    """
+    Stream a values_list() queryset as a CSV or NDJSON attachment, reading it
+    EXPORT_CHUNK_SIZE rows at a time. Under ASGI the rows come from
+    aiterator(), since Django reads a sync iterator into memory before
+    serving it asynchronously.
+    """
+    chunk_size = settings.EXPORT_CHUNK_SIZE
+    if isinstance(getattr(request, "_request", request), ASGIRequest):
+        content = aexport_lines(queryset.aiterator(chunk_size=chunk_size), columns, output)
+    else:
+        content = export_lines(queryset.iterator(chunk_size=chunk_size), columns, output)
+
+    response = StreamingHttpResponse(content, content_type=CONTENT_TYPES[output])
+    response["Content-Disposition"] = f'attachment; filename="{filename}.{output}"'
+    return response
+
+
+def write_export(stream, queryset, columns, output):
+    """Write an export to a file-like object, for management commands."""
+    for chunk in export_lines(queryset.iterator(chunk_size=settings.EXPORT_CHUNK_SIZE), columns, output):
+        stream.write(chunk)
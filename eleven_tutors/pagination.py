@@ -0,0 +1,139 @@
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, CursorPagination, PageNumberPagination
+
+
+class CreatedAtCursorPagination(CursorPagination):
+    """
+    Keyset pagination over (created_at, id), newest first.
+    Every page costs the same index range scan, with no COUNT(*) or OFFSET.
+
+    DRF's cursor only records the first ordering field and steps through
+    rows sharing it by offset, which drifts when rows are added and stops
+    working past offset_cutoff ties (e.g. rows from one bulk import). Here
+    the cursor records every ordering field, ending with the id, so each
+    position is unique and pages are filtered on the whole key.
+    """
+    ordering = ("-created_at", "-id")
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    position_separator = "|"
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if ordering[-1].lstrip("-") not in ("id", "pk"):
+            ordering += ("-id" if ordering[-1].startswith("-") else "id",)
+        return ordering
+
+    def _get_position_from_instance(self, instance, ordering):
+        return self.position_separator.join(
+            str(instance[field] if isinstance(instance, dict) else getattr(instance, field))
+            for field in (order.lstrip("-") for order in ordering)
+        )
+
+    def keyset_filter(self, position, reverse):
+        values = position.split(self.position_separator, len(self.ordering) - 1)
+        if len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+
+        # (a, b) < (x, y) as (a < x) OR (a = x AND b < y), per field direction.
+        condition, equal = Q(), {}
+        for order, value in zip(self.ordering, values):
+            field = order.lstrip("-")
+            lookup = "lt" if order.startswith("-") != reverse else "gt"
+            condition |= Q(**equal, **{f"{field}__{lookup}": value})
+            equal[field] = value
+        return condition
+
+    def paginate_queryset(self, queryset, request, view=None):
+        # DRF's implementation, with the position filter on the whole key
+        # and no offsets, which unique positions never need.
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse, current_position = (
+            (False, None) if self.cursor is None else (self.cursor.reverse, self.cursor.position)
+        )
+
+        if reverse:
+            queryset = queryset.order_by(
+                *(order[1:] if order.startswith("-") else f"-{order}" for order in self.ordering)
+            )
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        if current_position is not None:
+            try:
+                queryset = queryset.filter(self.keyset_filter(current_position, reverse))
+            except (TypeError, ValueError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        following_position = (
+            self._get_position_from_instance(results[-1], self.ordering)
+            if len(results) > len(self.page) else None
+        )
+
+        if reverse:
+            self.page.reverse()
+            self.has_next, self.next_position = current_position is not None, current_position
+            self.has_previous, self.previous_position = following_position is not None, following_position
+        else:
+            self.has_next, self.next_position = following_position is not None, following_position
+            self.has_previous, self.previous_position = current_position is not None, current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+
+class SelectablePagination(BasePagination):
+    """
+    Page-number pagination by default, switched to keyset pagination when the
+    client asks for `?pagination=cursor` or follows a `cursor` link.
+    """
+    mode_query_param = "pagination"
+    page_number_class = PageNumberPagination
+    cursor_class = CreatedAtCursorPagination
+
+    def __init__(self):
+        self.paginator = self.page_number_class()
+
+    def uses_cursor(self, request):
+        return (
+            request.query_params.get(self.mode_query_param) == "cursor"
+            or self.cursor_class.cursor_query_param in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        paginator_class = self.cursor_class if self.uses_cursor(request) else self.page_number_class
+        self.paginator = paginator_class()
+        return self.paginator.paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        return self.paginator.get_paginated_response(data)
+
+    def get_paginated_response_schema(self, schema):
+        return self.paginator.get_paginated_response_schema(schema)
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            *self.page_number_class().get_schema_operation_parameters(view),
+            *self.cursor_class().get_schema_operation_parameters(view),
+        ]
+
+    def get_results(self, data):
+        return self.paginator.get_results(data)
+
+    def to_html(self):
+        return self.paginator.to_html()
+
+    @property
+    def display_page_controls(self):
+        return getattr(self.paginator, "display_page_controls", False)
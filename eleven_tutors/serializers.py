@@ -0,0 +1,18 @@
+from rest_framework import serializers
+
+
+class DateRangeSerializer(serializers.Serializer):
+    """Optional `from` and `to` (inclusive dates) query parameters"""
+
+    def get_fields(self):
+        # `from` is a keyword, so the date fields can't be class attributes.
+        fields = super().get_fields()
+        fields["from"] = serializers.DateField(required=False)
+        fields["to"] = serializers.DateField(required=False)
+        return fields
+
+    def validate(self, attrs):
+        since, until = attrs.get("from"), attrs.get("to")
+        if since and until and since > until:
+            raise serializers.ValidationError({"from": "Must not be after `to`."})
+        return attrs
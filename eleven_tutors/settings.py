@@ -100,6 +100,59 @@ DATABASES = {
 }
 
 
+# Cache
+# A shared Redis cache is required in production: signal-driven invalidation
+# only reaches every worker when they all read the same store.
+
+CACHES = {
+    "default": (
+        {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("REDIS_URL"),
+        }
+        if os.getenv("REDIS_URL")
+        else {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+    )
+}
+
+# Course detail trees embed presigned thumbnail URLs (querystring_expire
+# below), so keep this comfortably under an hour.
+COURSE_DETAIL_CACHE_TIMEOUT = int(os.getenv("COURSE_DETAIL_CACHE_TIMEOUT", 600))
+
+# Enrolled course ids per user; dropped explicitly whenever an Enrollment
+# changes, the timeout only bounds drift from writes that bypass signals.
+ENTITLEMENTS_CACHE_TIMEOUT = int(os.getenv("ENTITLEMENTS_CACHE_TIMEOUT", 3600))
+
+# "My learning" dashboard per user; dropped when their enrollments change.
+# Course cards embed presigned thumbnail URLs, so keep this short.
+DASHBOARD_CACHE_TIMEOUT = int(os.getenv("DASHBOARD_CACHE_TIMEOUT", 300))
+
+# Player heartbeats are merged in a per-process buffer and upserted in bulk
+# once it holds LESSON_PROGRESS_BUFFER_SIZE entries or its oldest entry is
+# LESSON_PROGRESS_FLUSH_INTERVAL seconds old, checked on every heartbeat and
+# by a background thread every LESSON_PROGRESS_FLUSH_INTERVAL seconds.
+LESSON_PROGRESS_FLUSH_INTERVAL = int(os.getenv("LESSON_PROGRESS_FLUSH_INTERVAL", 10))
+LESSON_PROGRESS_BUFFER_SIZE = int(os.getenv("LESSON_PROGRESS_BUFFER_SIZE", 1000))
+
+# Tutor statistics over a date range, read from the daily course rollups and
+# cached per tutor and range. Rollups keep changing for today, so keep the
+# timeout short.
+TUTOR_STATISTICS_CACHE_TIMEOUT = int(os.getenv("TUTOR_STATISTICS_CACHE_TIMEOUT", 300))
+TUTOR_STATISTICS_MAX_DAYS = int(os.getenv("TUTOR_STATISTICS_MAX_DAYS", 3 * 366))
+
+# Per-course stats pages for the admin and tutor UIs.
+COURSE_STATS_CACHE_TIMEOUT = int(os.getenv("COURSE_STATS_CACHE_TIMEOUT", 60))
+
+# Platform-wide admin statistics are served from a stored snapshot, which is
+# only recomputed on ?refresh=1 or by the refresh_platform_statistics
+# command. Run that at least this often; older snapshots are flagged stale.
+PLATFORM_STATISTICS_REFRESH_INTERVAL = int(os.getenv("PLATFORM_STATISTICS_REFRESH_INTERVAL", 900))
+
+# CSV / NDJSON exports read this many rows per database round trip and write
+# them to the response in one piece.
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", 2000))
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
 
@@ -179,6 +232,33 @@ VDOCIPHER_HEADERS = {
     'Accept': "application/json"
 }
 
+# Every VdoCipher call shares one pooled session. Calls give up after the
+# connect/read timeouts, idempotent ones are retried VDOCIPHER_MAX_RETRIES
+# times with jittered backoff, and after VDOCIPHER_BREAKER_THRESHOLD
+# consecutive failures calls fail fast for VDOCIPHER_BREAKER_RESET_TIMEOUT
+# seconds.
+VDOCIPHER_API_URL = os.getenv("VDOCIPHER_API_URL", "https://dev.vdocipher.com/api")
+VDOCIPHER_CONNECT_TIMEOUT = float(os.getenv("VDOCIPHER_CONNECT_TIMEOUT", 3.05))
+VDOCIPHER_READ_TIMEOUT = float(os.getenv("VDOCIPHER_READ_TIMEOUT", 10))
+VDOCIPHER_MAX_RETRIES = int(os.getenv("VDOCIPHER_MAX_RETRIES", 2))
+VDOCIPHER_RETRY_BACKOFF = float(os.getenv("VDOCIPHER_RETRY_BACKOFF", 0.25))
+VDOCIPHER_POOL_SIZE = int(os.getenv("VDOCIPHER_POOL_SIZE", 10))
+# Async views share one connection pool per event loop (ASGI worker).
+VDOCIPHER_ASYNC_POOL_SIZE = int(os.getenv("VDOCIPHER_ASYNC_POOL_SIZE", 200))
+VDOCIPHER_BREAKER_THRESHOLD = int(os.getenv("VDOCIPHER_BREAKER_THRESHOLD", 5))
+VDOCIPHER_BREAKER_RESET_TIMEOUT = int(os.getenv("VDOCIPHER_BREAKER_RESET_TIMEOUT", 30))
+
+# OTPs are valid for VDOCIPHER_OTP_TTL seconds. Each is reused for the same
+# user and video for at most half of that, so a cached OTP still has at
+# least half its lifetime left when the player redeems it.
+VDOCIPHER_OTP_TTL = int(os.getenv("VDOCIPHER_OTP_TTL", 300))
+VDOCIPHER_OTP_CACHE_TIMEOUT = int(
+    os.getenv("VDOCIPHER_OTP_CACHE_TIMEOUT", VDOCIPHER_OTP_TTL // 2)
+)
+# How many upcoming lessons of a part the player may prefetch OTPs for in
+# one request.
+VDOCIPHER_OTP_PREFETCH_LIMIT = int(os.getenv("VDOCIPHER_OTP_PREFETCH_LIMIT", 5))
+
 # Stripe settings
 STRIPE_SECRET_KEY = os.getenv("STRIPE_SECRET_KEY")
 STRIPE_PUBLIC_KEY = os.getenv("STRIPE_PUBLIC_KEY")
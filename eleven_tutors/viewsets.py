@@ -0,0 +1,18 @@
+from adrf.viewsets import GenericViewSet
+from rest_framework import mixins
+
+
+class AsyncModelViewSet(
+    mixins.CreateModelMixin,
+    mixins.RetrieveModelMixin,
+    mixins.UpdateModelMixin,
+    mixins.DestroyModelMixin,
+    mixins.ListModelMixin,
+    GenericViewSet,
+):
+    """
+    Drop-in ModelViewSet whose actions may be coroutines. Override an action
+    with `async def` to serve it without holding a worker while it waits on
+    an external service; the inherited sync actions keep working and run in
+    a thread.
+    """
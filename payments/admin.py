@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Payment, Order
+from .models import Payment, Order, RevenueLine
 
 
 @admin.register(Payment)
@@ -20,3 +20,11 @@ class OrderAdmin(admin.ModelAdmin):
     search_fields = ("user__username",)
     list_filter = ()
     ordering = ("created_at",)
+
+
+@admin.register(RevenueLine)
+class RevenueLineAdmin(admin.ModelAdmin):
+    list_display = ("payment", "course", "tutor", "amount", "currency", "paid_at")
+    search_fields = ("tutor__email", "course__title", "payment__id")
+    list_filter = ("currency",)
+    ordering = ("-paid_at",)
@@ -1,4 +1,6 @@
 from rest_framework import serializers
+
+from eleven_tutors.exports import ExportSerializer
 from payments.models import Payment, Order
 
 
@@ -19,3 +21,10 @@ class CreatePaymentSerializer(serializers.Serializer):
     class Meta:
         model = Payment
         fields = ("course_id",)
+
+
+class PaymentExportSerializer(ExportSerializer):
+    status = serializers.ChoiceField(choices=Payment.StatusChoices.choices, required=False)
+
+    def validate(self, attrs):
+        return {**super().validate(attrs), "status": attrs.get("status")}
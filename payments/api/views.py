@@ -1,25 +1,31 @@
 from django.conf import settings
 from django.views.decorators.csrf import csrf_exempt
 from django.http import HttpResponse
-from rest_framework import viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied
 from rest_framework.response import Response
 import stripe
 
+from eleven_tutors.exports import export_response
+from eleven_tutors.pagination import SelectablePagination
+from eleven_tutors.viewsets import AsyncModelViewSet
+from payments.exports import PAYMENT_COLUMNS, payments_export
 from payments.models import Payment, Order
 from courses.models import Course, Enrollment
 from users.models import User
-from .serializers import PaymentSerializer, CreatePaymentSerializer
+from .serializers import PaymentSerializer, CreatePaymentSerializer, PaymentExportSerializer
 
 stripe.api_key = settings.STRIPE_SECRET_KEY
 endpoint_secret = settings.STRIPE_WEBHOOK_SECRET
 
 
-class PaymentViewSet(viewsets.ModelViewSet):
+class PaymentViewSet(AsyncModelViewSet):
     """
     A viewset for viewing and editing payment instances.
     """
     queryset = Payment.objects.all()
     serializer_class = PaymentSerializer
+    pagination_class = SelectablePagination
 
     def get_serializer_class(self):
         if self.action == "create":
@@ -37,31 +43,32 @@ class PaymentViewSet(viewsets.ModelViewSet):
             queryset = queryset.filter(user=user)
         return queryset.order_by("-created_at")
 
-    def create(self, request, *args, **kwargs):
+    async def create(self, request, *args, **kwargs):
         serializer = CreatePaymentSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
         course_id = serializer.validated_data["course_id"]
-        course = Course.objects.filter(id=course_id).first()
+        course = await Course.objects.filter(id=course_id).afirst()
         if not course:
             return Response({"detail": "No course found with given slug"}, status=404)
 
-        order = Order.objects.create(
+        order = await Order.objects.acreate(
             user=request.user,
             total_amount=course.price,
         )
 
-        order.courses.add(course)
-        order.save()
+        await order.courses.aadd(course)
+        await order.asave()
 
-        payment = Payment.objects.create(
+        payment = await Payment.objects.acreate(
             user=request.user,
+            order=order,
             amount=course.price,
             method=Payment.PaymentMethodChoices.STRIPE,
             status=Payment.StatusChoices.PENDING,
         )
 
-        checkout_session = stripe.checkout.Session.create(
+        checkout_session = await stripe.checkout.Session.create_async(
             payment_method_types=['card'],
             line_items=[{
                 'price_data': {
@@ -87,6 +94,19 @@ class PaymentViewSet(viewsets.ModelViewSet):
 
         return Response({'checkout_session_id': checkout_session.id})
 
+    @action(detail=False, methods=["get"])
+    def export(self, request):
+        """All payments in a date range as a streamed CSV or NDJSON file, for finance"""
+        user = request.user
+        if not (user.is_staff or user.role == User.RoleChoices.ADMIN):
+            raise PermissionDenied()
+
+        serializer = PaymentExportSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        queryset = payments_export(params["since"], params["until"], params["tutor"], params["status"])
+        return export_response(request, queryset, PAYMENT_COLUMNS, params["output"], "payments")
+
 
 @csrf_exempt
 def stripe_webhook(request):
@@ -0,0 +1,87 @@
+from django.db.models import Case, CharField, Exists, OuterRef, Value, When
+
+from eleven_tutors.exports import in_range
+from payments.models import Order, Payment, RevenueLine
+
+PAYMENT_COLUMNS = (
+    "id",
+    "created_at",
+    "status",
+    "amount",
+    "currency",
+    "method",
+    "user_id",
+    "user_email",
+    "order_id",
+    "transaction_id",
+)
+
+EARNINGS_COLUMNS = (
+    "payment_id",
+    "paid_at",
+    "tutor_id",
+    "tutor_email",
+    "course_id",
+    "course_title",
+    "amount",
+    "currency",
+)
+
+
+def status_label():
+    return Case(
+        *[When(status=value, then=Value(label)) for value, label in Payment.StatusChoices.choices],
+        output_field=CharField(),
+    )
+
+
+def payments_export(since=None, until=None, tutor=None, status=None):
+    """
+    Payments oldest first along the (created_at, id) index. The tutor filter
+    is an EXISTS on the order's courses, so multi-course orders aren't
+    repeated.
+    """
+    queryset = in_range(Payment.objects.all(), "created_at", since, until)
+    if tutor:
+        queryset = queryset.filter(
+            Exists(
+                Order.courses.through.objects.filter(
+                    order_id=OuterRef("order_id"), course__tutors=tutor
+                )
+            )
+        )
+    if status is not None:
+        queryset = queryset.filter(status=status)
+    return (
+        queryset.annotate(status_label=status_label())
+        .order_by("created_at", "id")
+        .values_list(
+            "id",
+            "created_at",
+            "status_label",
+            "amount",
+            "currency",
+            "method",
+            "user_id",
+            "user__email",
+            "order_id",
+            "transaction_id",
+        )
+    )
+
+
+def earnings_export(since=None, until=None, tutor=None):
+    """Tutor revenue lines oldest first: each tutor's share of each completed payment."""
+    queryset = in_range(RevenueLine.objects.all(), "paid_at", since, until)
+    if tutor:
+        queryset = queryset.filter(tutor=tutor)
+    return queryset.order_by("paid_at", "id").values_list(
+        "payment_id",
+        "paid_at",
+        "tutor_id",
+        "tutor__email",
+        "course_id",
+        "course__title",
+        "amount",
+        "currency",
+    )
@@ -0,0 +1,123 @@
+from collections import defaultdict
+from decimal import ROUND_DOWN, Decimal
+
+from django.db import transaction
+from django.db.models import F, Prefetch, Q
+
+from courses.models import Course
+from eleven_tutors.exports import in_range
+from payments.models import Payment, RevenueLine
+from users.models import User
+
+CENT = Decimal("0.01")
+
+
+def split_amount(amount, weights):
+    """
+    Split `amount` into cents in proportion to `weights`. Leftover cents go
+    to the first shares, so the shares always add up to `amount` exactly.
+    """
+    if not any(weights):
+        weights = [1] * len(weights)
+    total = sum(weights)
+    shares = [(amount * weight / total).quantize(CENT, rounding=ROUND_DOWN) for weight in weights]
+    for index in range(int((amount - sum(shares)) / CENT)):
+        shares[index % len(shares)] += CENT
+    return shares
+
+
+def revenue_lines(payment, courses):
+    """
+    Ledger rows for a completed payment: split between `courses` (with
+    prefetched tutors) by their current price, then evenly between each
+    course's tutors. Courses without tutors keep their share unattributed.
+    """
+    courses = sorted(courses, key=lambda course: str(course.pk))
+    if not courses:
+        return []
+
+    lines = []
+    for course, course_share in zip(courses, split_amount(payment.amount, [course.price for course in courses])):
+        tutors = sorted(course.tutors.all(), key=lambda tutor: tutor.pk)
+        if not tutors:
+            continue
+        for tutor, share in zip(tutors, split_amount(course_share, [1] * len(tutors))):
+            lines.append(
+                RevenueLine(
+                    payment_id=payment.pk,
+                    course_id=course.pk,
+                    tutor_id=tutor.pk,
+                    amount=share,
+                    currency=payment.currency,
+                    paid_at=payment.created_at,
+                )
+            )
+    return lines
+
+
+def order_courses(order_ids):
+    """The courses of each order, with their tutor ids, in two queries."""
+    courses = (
+        Course.objects.filter(orders__in=order_ids)
+        .annotate(order_id=F("orders"))
+        .only("id", "price")
+        .prefetch_related(Prefetch("tutors", queryset=User.objects.only("id")))
+    )
+    by_order = defaultdict(list)
+    for course in courses:
+        by_order[course.order_id].append(course)
+    return by_order
+
+
+def record_revenue(payment):
+    """
+    Replace the ledger rows of `payment`: its tutor shares if it is a
+    completed payment for an order, none otherwise.
+    """
+    lines = []
+    if payment.status == Payment.StatusChoices.COMPLETED and payment.order_id:
+        lines = revenue_lines(payment, order_courses([payment.order_id])[payment.order_id])
+
+    with transaction.atomic():
+        RevenueLine.objects.filter(payment_id=payment.pk).delete()
+        RevenueLine.objects.bulk_create(lines)
+
+
+def rebuild_revenue_lines(since=None, until=None, batch_size=1000):
+    """
+    Recompute the ledger for payments created from `since` to `until`
+    (inclusive dates, default all time), `batch_size` payments at a time
+    along the (created_at, id) index. Used to backfill history and to repair
+    drift from writes that bypass signals. Returns the number of rows written.
+    """
+    payments = in_range(Payment.objects.all(), "created_at", since, until)
+    RevenueLine.objects.filter(payment__in=payments).exclude(
+        payment__status=Payment.StatusChoices.COMPLETED, payment__order__isnull=False
+    ).delete()
+
+    completed = (
+        payments.filter(status=Payment.StatusChoices.COMPLETED, order__isnull=False)
+        .only("id", "amount", "currency", "order_id", "created_at")
+        .order_by("created_at", "id")
+    )
+    written = 0
+    batch = list(completed[:batch_size])
+    while batch:
+        courses = order_courses({payment.order_id for payment in batch})
+        lines = [
+            line
+            for payment in batch
+            for line in revenue_lines(payment, courses[payment.order_id])
+        ]
+        with transaction.atomic():
+            RevenueLine.objects.filter(payment__in=batch).delete()
+            RevenueLine.objects.bulk_create(lines, batch_size=1000)
+        written += len(lines)
+
+        last = batch[-1]
+        batch = list(
+            completed.filter(
+                Q(created_at__gt=last.created_at) | Q(created_at=last.created_at, id__gt=last.id)
+            )[:batch_size]
+        )
+    return written
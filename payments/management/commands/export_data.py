@@ -0,0 +1,55 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from courses.exports import ENROLLMENT_COLUMNS, enrollments_export
+from eleven_tutors.exports import CONTENT_TYPES, write_export
+from payments.exports import EARNINGS_COLUMNS, PAYMENT_COLUMNS, earnings_export, payments_export
+from users.models import User
+
+EXPORTS = {
+    "payments": (PAYMENT_COLUMNS, payments_export),
+    "enrollments": (ENROLLMENT_COLUMNS, enrollments_export),
+    "earnings": (EARNINGS_COLUMNS, earnings_export),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream payments, enrollments or tutor earnings to a CSV or NDJSON "
+        "file (or stdout), reading the database in chunks so memory stays "
+        "flat for any number of rows."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("export", choices=tuple(EXPORTS))
+        parser.add_argument("--since", help="From this date (YYYY-MM-DD), inclusive")
+        parser.add_argument("--until", help="Up to this date (YYYY-MM-DD), inclusive")
+        parser.add_argument("--tutor", help="Only rows for this tutor's courses (email)")
+        parser.add_argument("--output", choices=tuple(CONTENT_TYPES), default="csv")
+        parser.add_argument("--file", help="Write to this path instead of stdout")
+
+    def handle(self, *args, **options):
+        try:
+            since = date.fromisoformat(options["since"]) if options["since"] else None
+            until = date.fromisoformat(options["until"]) if options["until"] else None
+        except ValueError as e:
+            raise CommandError(f"Invalid date: {e}")
+
+        tutor = None
+        if options["tutor"]:
+            tutor = User.objects.filter(email=options["tutor"]).values_list("pk", flat=True).first()
+            if tutor is None:
+                raise CommandError(f"No user with email {options['tutor']}")
+
+        columns, export = EXPORTS[options["export"]]
+        queryset = export(since, until, tutor)
+
+        if options["file"]:
+            with open(options["file"], "w", encoding="utf-8", newline="") as file:
+                write_export(file, queryset, columns, options["output"])
+            self.stderr.write(self.style.SUCCESS(f"Wrote {options['export']} to {options['file']}"))
+        else:
+            # Chunks already end in newlines.
+            self.stdout.ending = ""
+            write_export(self.stdout, queryset, columns, options["output"])
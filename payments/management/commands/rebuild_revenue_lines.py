@@ -0,0 +1,29 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from payments.ledger import rebuild_revenue_lines
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the tutor revenue ledger from completed payments. Defaults to "
+        "all history; use --since / --until to repair a date range."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--since", help="From payments created on this date (YYYY-MM-DD)")
+        parser.add_argument("--until", help="Up to payments created on this date (YYYY-MM-DD)")
+        parser.add_argument("--batch-size", type=int, default=1000, help="Payments per transaction")
+
+    def handle(self, *args, **options):
+        try:
+            since = date.fromisoformat(options["since"]) if options["since"] else None
+            until = date.fromisoformat(options["until"]) if options["until"] else None
+        except ValueError as e:
+            raise CommandError(f"Invalid date: {e}")
+        if since and until and since > until:
+            raise CommandError("--since must not be after --until")
+
+        rows = rebuild_revenue_lines(since, until, batch_size=options["batch_size"])
+        self.stdout.write(self.style.SUCCESS(f"Wrote {rows} revenue line(s)"))
@@ -0,0 +1,80 @@
+# Generated by Django 5.2.1 on 2026-10-16 22:45
+
+from collections import defaultdict
+
+from django.db import migrations
+from django.db.models import F, Q
+
+from payments.ledger import split_amount
+
+# Payment.StatusChoices.COMPLETED; historical models don't carry choices classes.
+COMPLETED = 2
+BATCH_SIZE = 1000
+
+
+def backfill_revenue_lines(apps, schema_editor):
+    """
+    Write the ledger rows of every completed payment made before 0005; the
+    signals only record new ones. The same split as
+    payments.ledger.revenue_lines, on the historical models, BATCH_SIZE
+    payments at a time along the (created_at, id) index.
+    """
+    Course = apps.get_model("courses", "Course")
+    Payment = apps.get_model("payments", "Payment")
+    RevenueLine = apps.get_model("payments", "RevenueLine")
+
+    completed = (
+        Payment.objects.filter(status=COMPLETED, order__isnull=False)
+        .only("id", "amount", "currency", "order_id", "created_at")
+        .order_by("created_at", "id")
+    )
+    batch = list(completed[:BATCH_SIZE])
+    while batch:
+        by_order = defaultdict(list)
+        courses = (
+            Course.objects.filter(orders__in={payment.order_id for payment in batch})
+            .annotate(order_id=F("orders"))
+            .only("id", "price")
+            .prefetch_related("tutors")
+        )
+        for course in courses:
+            by_order[course.order_id].append(course)
+
+        lines = []
+        for payment in batch:
+            order_courses = sorted(by_order[payment.order_id], key=lambda course: str(course.pk))
+            if not order_courses:
+                continue
+            shares = split_amount(payment.amount, [course.price for course in order_courses])
+            for course, course_share in zip(order_courses, shares):
+                tutors = sorted(course.tutors.all(), key=lambda tutor: tutor.pk)
+                if not tutors:
+                    continue
+                for tutor, share in zip(tutors, split_amount(course_share, [1] * len(tutors))):
+                    lines.append(RevenueLine(
+                        payment_id=payment.pk,
+                        course_id=course.pk,
+                        tutor_id=tutor.pk,
+                        amount=share,
+                        currency=payment.currency,
+                        paid_at=payment.created_at,
+                    ))
+        RevenueLine.objects.bulk_create(lines, batch_size=1000, ignore_conflicts=True)
+
+        last = batch[-1]
+        batch = list(
+            completed.filter(
+                Q(created_at__gt=last.created_at) | Q(created_at=last.created_at, id__gt=last.id)
+            )[:BATCH_SIZE]
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("payments", "0005_revenueline"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_revenue_lines, migrations.RunPython.noop),
+    ]
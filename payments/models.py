@@ -62,6 +62,14 @@ class Payment(BaseModel):
 
     cancel_time = models.DateTimeField(null=True, blank=True)
 
+    class Meta(BaseModel.Meta):
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="payment_created_at_id_idx"),
+            models.Index(
+                fields=["user", "created_at", "id"], name="payment_user_created_idx"
+            ),
+        ]
+
     def mark_completed(self, reason=None):
         self.status = self.StatusChoices.COMPLETED
         self.cancel_time = timezone.now()
@@ -76,3 +84,30 @@ class Payment(BaseModel):
 
     def __str__(self):
         return f"{self.user} - {self.amount} {self.currency} - ({self.status})"
+
+
+class RevenueLine(models.Model):
+    """
+    A tutor's share of a completed payment: the payment split between the
+    order's courses by price, and each course's share split evenly between
+    its tutors. Tutor earnings are sums over this table instead of joins
+    through orders and courses. Kept current by payments.ledger from
+    signals; `manage.py rebuild_revenue_lines` backfills it.
+    """
+    payment = models.ForeignKey(Payment, on_delete=models.CASCADE, related_name="revenue_lines")
+    course = models.ForeignKey(Course, on_delete=models.CASCADE, related_name="revenue_lines")
+    tutor = models.ForeignKey(User, on_delete=models.CASCADE, related_name="revenue_lines")
+    amount = models.DecimalField(max_digits=10, decimal_places=2)
+    currency = models.CharField(max_length=10, default=Payment.CurrencyChoices.USD)
+    # The payment's creation time, the moment the daily rollups attribute it to.
+    paid_at = models.DateTimeField()
+
+    class Meta:
+        unique_together = ("payment", "course", "tutor")
+        indexes = [
+            models.Index(fields=["tutor", "paid_at"], name="revenue_line_tutor_paid_idx"),
+            models.Index(fields=["paid_at", "id"], name="revenue_line_paid_at_id_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.tutor_id} - {self.amount} {self.currency} ({self.course_id})"
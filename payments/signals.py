@@ -0,0 +1,87 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from courses.counters import bump_course_counters
+from courses.models import Course
+from courses.rollups import bump_daily_stats, payment_deltas, rollup_date
+from payments.ledger import record_revenue
+from payments.models import Payment
+
+
+def completed_amount(status, amount):
+    return amount if status == Payment.StatusChoices.COMPLETED else 0
+
+
+@receiver(pre_save, sender=Payment)
+def remember_previous_payment(sender, instance, **kwargs):
+    instance._previous_state = (
+        sender.objects.filter(pk=instance.pk).values("status", "amount", "order_id").first()
+    )
+
+
+@receiver(post_save, sender=Payment)
+def count_payment_revenue(sender, instance, **kwargs):
+    # Course.completed_revenue is gross course revenue: a completed payment
+    # counts in full towards every course of its order. Tutor earnings come
+    # from the split in RevenueLine instead.
+    previous = getattr(instance, "_previous_state", None)
+    if previous and previous["order_id"]:
+        bump_course_counters(
+            Course.objects.filter(orders=previous["order_id"]),
+            completed_revenue=-completed_amount(previous["status"], previous["amount"]),
+        )
+    if instance.order_id:
+        bump_course_counters(
+            Course.objects.filter(orders=instance.order_id),
+            completed_revenue=completed_amount(instance.status, instance.amount),
+        )
+
+
+@receiver(post_delete, sender=Payment)
+def uncount_payment_revenue(sender, instance, **kwargs):
+    if instance.order_id:
+        bump_course_counters(
+            Course.objects.filter(orders=instance.order_id),
+            completed_revenue=-completed_amount(instance.status, instance.amount),
+        )
+
+
+def bump_payment_rollups(order_id, created_at, status, amount, sign):
+    if order_id:
+        bump_daily_stats(
+            Course.objects.filter(orders=order_id).values_list("pk", flat=True),
+            rollup_date(created_at),
+            **payment_deltas(status, amount, sign),
+        )
+
+
+@receiver(post_save, sender=Payment)
+def roll_up_payment(sender, instance, **kwargs):
+    # Payments are rolled up under the day they were created, so a status
+    # change moves the payment between counters of that same day.
+    previous = getattr(instance, "_previous_state", None)
+    if previous == {"status": instance.status, "amount": instance.amount, "order_id": instance.order_id}:
+        return
+    if previous:
+        bump_payment_rollups(
+            previous["order_id"], instance.created_at, previous["status"], previous["amount"], -1
+        )
+    bump_payment_rollups(instance.order_id, instance.created_at, instance.status, instance.amount, 1)
+
+
+@receiver(post_delete, sender=Payment)
+def unroll_payment(sender, instance, **kwargs):
+    bump_payment_rollups(instance.order_id, instance.created_at, instance.status, instance.amount, -1)
+
+
+@receiver(post_save, sender=Payment)
+def record_payment_revenue(sender, instance, **kwargs):
+    # Lines are rewritten whenever the payment's status, amount or order
+    # changes, e.g. when the Stripe webhook completes it. Deleting the
+    # payment cascades to its lines.
+    previous = getattr(instance, "_previous_state", None)
+    if previous == {"status": instance.status, "amount": instance.amount, "order_id": instance.order_id}:
+        return
+    if previous is None and instance.status != Payment.StatusChoices.COMPLETED:
+        return
+    record_revenue(instance)
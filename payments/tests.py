@@ -1,3 +1,42 @@
+from decimal import Decimal
+from importlib import import_module
+
+from django.apps import apps
 from django.test import TestCase
 
-# Create your tests here.
+from courses.models import Course
+from payments.models import Order, Payment, RevenueLine
+from users.models import User
+
+
+def make_user(email, **fields):
+    return User.objects.create_user(email, "password", **fields)
+
+
+class BackfillRevenueLinesTests(TestCase):
+    def test_backfill_matches_the_recorded_ledger(self):
+        tutors = [make_user(f"tutor{index}@example.com", role=User.RoleChoices.TUTOR) for index in range(2)]
+        python = Course.objects.create(title="Python", price=Decimal("60"))
+        django = Course.objects.create(title="Django", price=Decimal("40"))
+        python.tutors.add(*tutors)
+        django.tutors.add(tutors[0])
+
+        student = make_user("student@example.com")
+        for amount, courses, status in (
+            (Decimal("100.01"), [python, django], Payment.StatusChoices.COMPLETED),
+            (Decimal("60"), [python], Payment.StatusChoices.COMPLETED),
+            (Decimal("40"), [django], Payment.StatusChoices.FAILED),
+        ):
+            order = Order.objects.create(user=student, total_amount=amount)
+            order.courses.add(*courses)
+            Payment.objects.create(user=student, order=order, amount=amount, status=status)
+
+        columns = ("payment_id", "course_id", "tutor_id", "amount", "currency", "paid_at")
+        recorded = set(RevenueLine.objects.values_list(*columns))
+        RevenueLine.objects.all().delete()
+
+        migration = import_module("payments.migrations.0006_backfill_revenue_lines")
+        migration.backfill_revenue_lines(apps, None)
+
+        self.assertEqual(set(RevenueLine.objects.values_list(*columns)), recorded)
+        self.assertEqual(len(recorded), 5)
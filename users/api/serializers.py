@@ -1,5 +1,10 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.utils import timezone
 from rest_framework import serializers
 
+from eleven_tutors.serializers import DateRangeSerializer
 from users.models import User, OnboardingAnswer
 
 
@@ -40,20 +45,38 @@ class TutorSerializer(UserSerializer):
         return user
 
 
-class StatisticsSerializer(serializers.ModelSerializer):
-    number_of_payments = serializers.SerializerMethodField()
-    number_of_completed_payments = serializers.SerializerMethodField()
-    number_of_failed_payments = serializers.SerializerMethodField()
-    number_of_pending_payments = serializers.SerializerMethodField()
-    total_amount_of_completed_payments = serializers.SerializerMethodField()
-    average_monthly_amount_of_completed_payments = serializers.SerializerMethodField()
+class StatisticsSerializer(serializers.Serializer):
+    """Platform-wide KPIs, read from the snapshot in users.platform_statistics"""
+    number_of_payments = serializers.IntegerField(read_only=True)
+    number_of_completed_payments = serializers.IntegerField(read_only=True)
+    number_of_failed_payments = serializers.IntegerField(read_only=True)
+    number_of_pending_payments = serializers.IntegerField(read_only=True)
+    total_amount_of_completed_payments = serializers.FloatField(read_only=True)
+    average_monthly_amount_of_completed_payments = serializers.FloatField(read_only=True)
 
-    number_of_courses = serializers.SerializerMethodField()
-    number_of_course_parts = serializers.SerializerMethodField()
-    number_of_lessons = serializers.SerializerMethodField()
+    number_of_courses = serializers.IntegerField(read_only=True)
+    number_of_course_parts = serializers.IntegerField(read_only=True)
+    number_of_lessons = serializers.IntegerField(read_only=True)
 
-    class Meta:
-        pass
+    computed_at = serializers.DateTimeField(read_only=True)
+    is_stale = serializers.BooleanField(read_only=True)
+
+
+class StatisticsRangeSerializer(DateRangeSerializer):
+    """`from`, `to` (inclusive dates) and `granularity` query parameters"""
+    granularity = serializers.ChoiceField(choices=("day", "week", "month"), default="day")
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        end = attrs.get("to") or timezone.localdate()
+        start = attrs.get("from") or end - timedelta(days=29)
+        if start > end:
+            raise serializers.ValidationError({"from": "Must not be after `to`."})
+        if (end - start).days >= settings.TUTOR_STATISTICS_MAX_DAYS:
+            raise serializers.ValidationError(
+                {"from": f"Ranges are limited to {settings.TUTOR_STATISTICS_MAX_DAYS} days."}
+            )
+        return {"start": start, "end": end, "granularity": attrs["granularity"]}
 
 
 class OnboardingAnswerSerializer(serializers.ModelSerializer):
@@ -3,20 +3,27 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.filters import SearchFilter, OrderingFilter
-from django.db.models import Count, Sum, Avg, Q
-from datetime import datetime, timedelta
-from django.utils import timezone
+from django.db.models import F
 
+from eleven_tutors.exports import ExportSerializer, export_response, export_tutor
+from eleven_tutors.pagination import SelectablePagination
+from payments.exports import EARNINGS_COLUMNS, earnings_export
 from courses.api.serializers import Course, CourseSerializer
-from courses.models import Enrollment, Comment
-from payments.models import Payment, Order
-from .serializers import UserSerializer, TutorSerializer, OnboardingAnswerSerializer
+from .serializers import (
+    UserSerializer,
+    TutorSerializer,
+    OnboardingAnswerSerializer,
+    StatisticsSerializer,
+    StatisticsRangeSerializer,
+)
 from users.models import User, OnboardingAnswer
+from users import platform_statistics, tutor_statistics
 
 
 class UserViewSet(viewsets.ModelViewSet):
     queryset = User.objects.all()
     serializer_class = UserSerializer
+    pagination_class = SelectablePagination
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
     filterset_fields = ['role', 'is_email_verified']
     search_fields = ['username', 'email', 'first_name', 'last_name', 'id']
@@ -44,6 +51,26 @@ class UserViewSet(viewsets.ModelViewSet):
 
         return Response({"detail": "Method not allowed."}, status=status.HTTP_405_METHOD_NOT_ALLOWED)
 
+    @action(detail=False, methods=['get'], url_path='statistics')
+    def statistics(self, request):
+        """Platform-wide statistics for admins, from the stored snapshot"""
+        user = request.user
+        if not (user.is_staff or user.role == User.RoleChoices.ADMIN):
+            return Response(
+                {"detail": "You do not have permission to perform this action."},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        if request.query_params.get('refresh') in ('1', 'true'):
+            platform_statistics.refresh_snapshot()
+        snapshot = platform_statistics.get_snapshot()
+        if snapshot is None:
+            return Response(
+                {"detail": "Statistics have not been computed yet, retry shortly."},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+        return Response(StatisticsSerializer(snapshot).data)
+
 
 class TutorViewSet(viewsets.ModelViewSet):
     queryset = User.objects.filter(role=User.RoleChoices.TUTOR)
@@ -78,106 +105,42 @@ class TutorViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'], url_path='me/quick_statistics')
     def quick_statistics(self, request):
         """Get quick statistics for tutor dashboard"""
-        tutor = request.user
-        
-        # Get tutor's courses
-        tutor_courses = Course.objects.filter(tutors=tutor).distinct()
-        
-        # Calculate total earnings from completed payments
-        total_earnings = Payment.objects.filter(
-            order__courses__tutors=tutor,
-            status=Payment.StatusChoices.COMPLETED
-        ).aggregate(total=Sum('amount'))['total'] or 0
-        
-        # Count active students (unique enrollments)
-        active_students = Enrollment.objects.filter(
-            course__tutors=tutor
-        ).values('student').distinct().count()
-        
-        # Count published and draft courses
-        published_courses = tutor_courses.filter(is_published=True).count()
-        draft_courses = tutor_courses.filter(is_published=False).count()
-        
-        # Calculate average rating and reviews (placeholder - implement when rating system is added)
-        average_rating = 4.5  # Default rating
-        total_reviews = Comment.objects.filter(
-            lesson__part__course__tutors=tutor
-        ).count()
-        
-        # Get recent enrollments (last 7 days)
-        week_ago = timezone.now() - timedelta(days=7)
-        recent_enrollments = Enrollment.objects.filter(
-            course__tutors=tutor,
-            created_at__gte=week_ago
-        ).count()
-        
-        # Get monthly earnings for the last 6 months
-        monthly_earnings = []
-        for i in range(5, -1, -1):
-            month_start = timezone.now() - timedelta(days=30 * i)
-            month_end = timezone.now() - timedelta(days=30 * (i - 1)) if i > 0 else timezone.now()
-            
-            month_data = Payment.objects.filter(
-                order__courses__tutors=tutor,
-                status=Payment.StatusChoices.COMPLETED,
-                created_at__gte=month_start,
-                created_at__lt=month_end
-            ).aggregate(
-                earnings=Sum('amount'),
-                students=Count('order__user', distinct=True)
-            )
-            
-            monthly_earnings.append({
-                'month': month_start.strftime('%b'),
-                'earnings': float(month_data['earnings'] or 0),
-                'students': month_data['students'] or 0
-            })
-        
-        # Get course performance
-        course_performance = []
-        for course in tutor_courses.filter(is_published=True)[:6]:  # Top 6 courses
-            students_count = Enrollment.objects.filter(course=course).count()
-            
-            course_earnings = Payment.objects.filter(
-                order__courses=course,
-                status=Payment.StatusChoices.COMPLETED
-            ).aggregate(total=Sum('amount'))['total'] or 0
-            
-            course_performance.append({
-                'id': str(course.id),
-                'title': course.title,
-                'students': students_count,
-                'rating': 4.5,  # Default rating until rating system is implemented
-                'earnings': float(course_earnings)
-            })
-        
-        return Response({
-            'total_earnings': float(total_earnings),
-            'active_students': active_students,
-            'published_courses': published_courses,
-            'draft_courses': draft_courses,
-            'average_rating': average_rating,
-            'total_reviews': total_reviews,
-            'recent_enrollments': recent_enrollments,
-            'monthly_earnings': monthly_earnings,
-            'course_performance': course_performance
-        })
+        return Response(tutor_statistics.quick_statistics(request.user))
+
+    def range_statistics(self, request, build):
+        serializer = StatisticsRangeSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        return Response(build(request.user, **serializer.validated_data))
 
     @action(detail=False, methods=['get'], url_path='analytics')
     def analytics(self, request):
-        pass
+        """Enrollments, comments and earnings over a date range"""
+        return self.range_statistics(request, tutor_statistics.analytics)
 
     @action(detail=False, methods=['get'], url_path='courses-statistics')
     def courses_statistics(self, request):
-        pass
+        """Per-course activity over a date range"""
+        return self.range_statistics(request, tutor_statistics.courses_statistics)
 
     @action(detail=False, methods=['get'], url_path='earnings-statistics')
     def earnings_statistics(self, request):
-        pass
+        """Earnings over a date range, in total, over time and per course"""
+        return self.range_statistics(request, tutor_statistics.earnings_statistics)
 
     @action(detail=False, methods=['get'], url_path='payment-statistics')
     def payment_statistics(self, request):
-        pass
+        """Completed, failed and pending payments over a date range"""
+        return self.range_statistics(request, tutor_statistics.payment_statistics)
+
+    @action(detail=False, methods=['get'], url_path='earnings-export')
+    def export_earnings(self, request):
+        """Earnings per payment and course as a streamed CSV or NDJSON file"""
+        serializer = ExportSerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        tutor = export_tutor(request.user, params['tutor'])
+        queryset = earnings_export(params['since'], params['until'], tutor)
+        return export_response(request, queryset, EARNINGS_COLUMNS, params['output'], 'earnings')
 
     @action(detail=False, methods=['get', 'post'], url_path='me/courses')
     def get_courses(self, request):
@@ -185,40 +148,31 @@ class TutorViewSet(viewsets.ModelViewSet):
         tutor = request.user
 
         if request.method == 'GET':
-            courses = tutor.courses.all().order_by('-created_at')
-            
-            # Add statistics to each course
+            # Catalog cards plus the stored counters and the tutor's share
+            # from the revenue ledger: three queries however many courses
+            # the tutor has.
+            courses = (
+                Course.objects.for_catalog()
+                .filter(tutors=tutor)
+                .annotate(
+                    students_count=F('enrollments_count'),
+                    reviews_count=F('comments_count'),
+                    earnings=tutor_statistics.course_earnings(tutor),
+                )
+                .order_by('-created_at')
+            )
+
             courses_data = []
             for course in courses:
-                # Get students count
-                students_count = Enrollment.objects.filter(course=course).count()
-                
-                # Get reviews count
-                reviews_count = Comment.objects.filter(
-                    lesson__part__course=course
-                ).count()
-                
-                # Get earnings
-                earnings = Payment.objects.filter(
-                    order__courses=course,
-                    status=Payment.StatusChoices.COMPLETED
-                ).aggregate(total=Sum('amount'))['total'] or 0
-                
-                # Get lessons count
-                lessons_count = course.parts.aggregate(
-                    total=Count('lessons')
-                )['total'] or 0
-                
                 course_data = CourseSerializer(course, context={'request': request}).data
                 course_data.update({
-                    'students_count': students_count,
-                    'rating': 4.5,  # Default rating
-                    'reviews_count': reviews_count,
-                    'earnings': float(earnings),
-                    'lessons_count': lessons_count
+                    'students_count': course.students_count,
+                    'rating': tutor_statistics.DEFAULT_RATING,
+                    'reviews_count': course.reviews_count,
+                    'earnings': float(course.earnings),
                 })
                 courses_data.append(course_data)
-            
+
             return Response({
                 'results': courses_data,
                 'count': len(courses_data)
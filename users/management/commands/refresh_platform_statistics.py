@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from users.platform_statistics import refresh_snapshot
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the platform-wide statistics snapshot served to admin "
+        "dashboards. Run periodically (e.g. from cron) to keep it warm."
+    )
+
+    def handle(self, *args, **options):
+        snapshot = refresh_snapshot()
+        if snapshot is None:
+            self.stdout.write("Another refresh is running; no snapshot stored yet.")
+            return
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Platform statistics refreshed at {snapshot['computed_at'].isoformat()}: "
+                f"{snapshot['number_of_payments']} payments, {snapshot['number_of_courses']} courses."
+            )
+        )
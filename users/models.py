@@ -44,6 +44,11 @@ class User(AbstractUser):
 
     objects = CustomUserManager()
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(fields=["created_at", "id"], name="user_created_at_id_idx"),
+        ]
+
     def __str__(self):
         return f"{self.get_full_name()} - {self.email}"
 
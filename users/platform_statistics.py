@@ -0,0 +1,76 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from courses.models import Course, CoursePart
+from payments.models import Payment
+
+SNAPSHOT_CACHE_KEY = "statistics:platform"
+REFRESH_LOCK_KEY = "statistics:platform:refreshing"
+# Longer than a refresh can take, so a crashed one can't block the next forever.
+REFRESH_LOCK_TIMEOUT = 300
+
+
+def compute_statistics():
+    """
+    Platform KPIs in three aggregate queries: payments by status with
+    completed revenue, courses with their stored lesson counters, and parts.
+    """
+    completed = Q(status=Payment.StatusChoices.COMPLETED)
+    payments = Payment.objects.aggregate(
+        number_of_payments=Count("pk"),
+        number_of_completed_payments=Count("pk", filter=completed),
+        number_of_failed_payments=Count("pk", filter=Q(status=Payment.StatusChoices.FAILED)),
+        number_of_pending_payments=Count("pk", filter=Q(status=Payment.StatusChoices.PENDING)),
+        total_amount_of_completed_payments=Sum("amount", filter=completed),
+        months_with_completed_payments=Count(TruncMonth("created_at"), filter=completed, distinct=True),
+    )
+    courses = Course.objects.aggregate(
+        number_of_courses=Count("pk"),
+        number_of_lessons=Sum("lessons_count"),
+    )
+
+    total = payments["total_amount_of_completed_payments"] or 0
+    months = payments.pop("months_with_completed_payments")
+    return {
+        **payments,
+        "total_amount_of_completed_payments": total,
+        # Averaged over the months that had any completed payment.
+        "average_monthly_amount_of_completed_payments": round(total / months, 2) if months else 0,
+        "number_of_courses": courses["number_of_courses"],
+        "number_of_course_parts": CoursePart.objects.count(),
+        "number_of_lessons": courses["number_of_lessons"] or 0,
+    }
+
+
+def refresh_snapshot():
+    """
+    Recompute the statistics and store them with the time they were taken.
+    Only one refresh runs at a time: while another holds the lock, the
+    stored snapshot (or None) is returned instead of scanning again.
+    """
+    if not cache.add(REFRESH_LOCK_KEY, True, timeout=REFRESH_LOCK_TIMEOUT):
+        return cache.get(SNAPSHOT_CACHE_KEY)
+    try:
+        snapshot = {**compute_statistics(), "computed_at": timezone.now()}
+        cache.set(SNAPSHOT_CACHE_KEY, snapshot, timeout=None)
+    finally:
+        cache.delete(REFRESH_LOCK_KEY)
+    return snapshot
+
+
+def get_snapshot():
+    """
+    The stored snapshot, however old, or None before the first refresh.
+    Never computes, so dashboards don't scan Payment: refresh_snapshot()
+    runs from `manage.py refresh_platform_statistics` or on ?refresh=1.
+    `is_stale` flags snapshots older than PLATFORM_STATISTICS_REFRESH_INTERVAL
+    seconds.
+    """
+    snapshot = cache.get(SNAPSHOT_CACHE_KEY)
+    if snapshot is None:
+        return None
+    age = (timezone.now() - snapshot["computed_at"]).total_seconds()
+    return {**snapshot, "is_stale": age >= settings.PLATFORM_STATISTICS_REFRESH_INTERVAL}
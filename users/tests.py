@@ -1,3 +1,389 @@
-from django.test import TestCase
+import csv
+import io
+import json
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from courses.counters import recompute_course_counters
+from courses.models import Comment, Course, CoursePart, Enrollment, Lesson
+from courses.rollups import rebuild_daily_stats
+from eleven_tutors.exports import ExportSerializer, export_lines
+from payments.ledger import rebuild_revenue_lines
+from payments.models import Order, Payment
+from users import platform_statistics, tutor_statistics
+from users.api.serializers import StatisticsRangeSerializer
+from users.models import User
+
+
+def make_user(email, **fields):
+    return User.objects.create_user(email=email, password="password", **fields)
+
+
+def checkout(user, course):
+    """
+    Start a payment the way the frontend does, through PaymentViewSet.create.
+    Returns the metadata Stripe would echo back to the webhook.
+    """
+    client = APIClient()
+    client.force_authenticate(user)
+    session = mock.AsyncMock(return_value=mock.Mock(id="cs_test"))
+    with mock.patch("stripe.checkout.Session.create_async", session):
+        response = client.post("/api/payments/payments/", {"course_id": course.pk})
+    assert response.status_code == 200, response.content
+    return session.call_args.kwargs["metadata"]
+
+
+def complete_checkout(metadata, **overrides):
+    """Deliver Stripe's checkout.session.completed webhook for a checkout()."""
+    event = {"type": "checkout.session.completed", "data": {"object": {
+        "id": f"cs_{metadata['payment_id']}",
+        "payment_intent": f"pi_{metadata['payment_id']}",
+        "metadata": {**metadata, **overrides},
+    }}}
+    with mock.patch("stripe.Webhook.construct_event", return_value=event):
+        return APIClient().post("/api/payments/stripe/webhook/", b"{}", content_type="application/json")
+
+
+def pay(user, courses, amount, status=Payment.StatusChoices.COMPLETED):
+    # Checkout sells one course at a time; orders of several courses are
+    # only created directly.
+    order = Order.objects.create(user=user, total_amount=amount)
+    order.courses.add(*courses)
+    return Payment.objects.create(
+        user=user,
+        order=order,
+        amount=amount,
+        method=Payment.PaymentMethodChoices.STRIPE,
+        status=status,
+    )
+
+
+@override_settings(
+    FRONTEND_URL="http://localhost",
+    STORAGES={**settings.STORAGES, "default": {"BACKEND": "django.core.files.storage.InMemoryStorage"}},
+)
+class TutorStatisticsFixture(TestCase):
+    """
+    One tutor with two published courses and a draft. A student buys both
+    published courses in one order and comments on a lesson; another
+    student buys one of them through checkout and the webhook, has a
+    checkout the webhook fails, and one it never completes.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.tutor = make_user("tutor@example.com", role=User.RoleChoices.TUTOR)
+        thumbnail = "images/course_thumbnails/course.png"
+        self.python = Course.objects.create(title="Python", price=60, is_published=True, thumbnail=thumbnail)
+        self.django = Course.objects.create(title="Django", price=40, is_published=True, thumbnail=thumbnail)
+        self.draft = Course.objects.create(title="Draft", price=10)
+        for course in (self.python, self.django, self.draft):
+            course.tutors.add(self.tutor)
+
+        self.alice = make_user("alice@example.com")
+        self.bob = make_user("bob@example.com")
+        for student, course in ((self.alice, self.python), (self.alice, self.django), (self.bob, self.python)):
+            Enrollment.objects.create(student=student, course=course)
+
+        part = CoursePart.objects.create(course=self.python, title="Basics")
+        lesson = Lesson.objects.create(part=part, title="Variables")
+        Comment.objects.create(user=self.alice, lesson=lesson, text="Great")
+
+        pay(self.alice, [self.python, self.django], 100)
+        complete_checkout(checkout(self.bob, self.python))
+        complete_checkout(checkout(self.bob, self.django), user_id="missing")
+        checkout(self.bob, self.django)
+
+        self.today = timezone.localdate()
+        self.range = {"start": self.today - timedelta(days=6), "end": self.today, "granularity": "day"}
+
+
+class TutorRangeStatisticsTests(TutorStatisticsFixture):
+    def test_courses_statistics_endpoint(self):
+        client = APIClient()
+        client.force_authenticate(self.tutor)
+
+        response = client.get("/api/auth/tutors/courses-statistics/")
+
+        self.assertEqual(response.status_code, 200)
+        results = {course["title"]: course for course in response.json()["results"]}
+        self.assertEqual(results["Python"]["enrollments"], 2)
+        self.assertEqual(results["Python"]["completed_payments"], 2)
+        self.assertEqual(results["Python"]["earnings"], 120.0)
+        self.assertEqual(results["Django"]["enrollments"], 1)
+        self.assertEqual(results["Django"]["earnings"], 40.0)
+        self.assertEqual(results["Draft"]["earnings"], 0.0)
+
+    def test_multi_course_order_counts_once(self):
+        analytics = tutor_statistics.analytics(self.tutor, **self.range)
+        earnings = tutor_statistics.earnings_statistics(self.tutor, **self.range)
+        payments = tutor_statistics.payment_statistics(self.tutor, **self.range)
+
+        self.assertEqual(analytics["totals"]["completed_payments"], 2)
+        self.assertEqual(earnings["completed_payments"], 2)
+        self.assertEqual(payments["totals"], {"completed": 2, "failed": 1, "pending": 1})
+
+
+class TutorCourseListTests(TutorStatisticsFixture):
+    def add_courses(self, count):
+        for index in range(count):
+            course = Course.objects.create(title=f"Extra {index}", price=10)
+            course.tutors.add(self.tutor)
+            CoursePart.objects.create(course=course, title="Part 1")
+
+    def test_query_count_does_not_grow_with_courses(self):
+        client = APIClient()
+        client.force_authenticate(self.tutor)
+
+        # Courses with category and earnings, then parts and tutors.
+        with self.assertNumQueries(3):
+            response = client.get("/api/auth/tutors/me/courses/")
+        self.assertEqual(response.json()["count"], 3)
+
+        self.add_courses(6)
+        with self.assertNumQueries(3):
+            response = client.get("/api/auth/tutors/me/courses/")
+        self.assertEqual(response.json()["count"], 9)
+
+        courses = {course["title"]: course for course in response.json()["results"]}
+        self.assertEqual(courses["Python"]["students_count"], 2)
+        self.assertEqual(courses["Python"]["earnings"], 120.0)
+
+
+class MonthlyEarningsTests(TutorStatisticsFixture):
+    def test_students_are_distinct_payers(self):
+        complete_checkout(checkout(self.bob, self.django))
+
+        this_month = tutor_statistics.monthly_earnings(self.tutor)[-1]
+
+        self.assertEqual(this_month["earnings"], 200.0)
+        self.assertEqual(this_month["students"], 2)
+
+
+class TutorStatisticsTests(TutorStatisticsFixture):
+    """
+    Every statistic against the fixture, and against the same statistic
+    after the counters, rollups and ledger are rebuilt from the source
+    tables, so the incrementally maintained copies can't drift unnoticed.
+    """
+
+    def statistics(self):
+        cache.clear()
+        return {
+            "quick": tutor_statistics.quick_statistics(self.tutor),
+            "analytics": tutor_statistics.analytics(self.tutor, **self.range),
+            "courses": tutor_statistics.courses_statistics(self.tutor, **self.range),
+            "earnings": tutor_statistics.earnings_statistics(self.tutor, **self.range),
+            "payments": tutor_statistics.payment_statistics(self.tutor, **self.range),
+        }
+
+    def test_quick_statistics(self):
+        with self.assertNumQueries(6):
+            quick = tutor_statistics.quick_statistics(self.tutor)
+
+        self.assertEqual(quick["total_earnings"], 160.0)
+        self.assertEqual(quick["active_students"], 2)
+        self.assertEqual(quick["published_courses"], 2)
+        self.assertEqual(quick["draft_courses"], 1)
+        self.assertEqual(quick["total_reviews"], 1)
+        self.assertEqual(quick["recent_enrollments"], 3)
+        self.assertEqual(len(quick["monthly_earnings"]), 6)
+        self.assertEqual(quick["monthly_earnings"][-1]["earnings"], 160.0)
+        self.assertEqual(quick["monthly_earnings"][-1]["students"], 2)
+        self.assertEqual(
+            [(course["title"], course["students"], course["earnings"]) for course in quick["course_performance"]],
+            [("Django", 1, 40.0), ("Python", 2, 120.0)],
+        )
+
+    def test_analytics(self):
+        analytics = tutor_statistics.analytics(self.tutor, **self.range)
+
+        self.assertEqual(
+            analytics["totals"],
+            {"enrollments": 3, "comments": 1, "completed_payments": 2, "earnings": 160.0},
+        )
+        self.assertEqual(len(analytics["series"]), 7)
+        self.assertEqual(analytics["series"][-1]["period"], self.today.isoformat())
+        self.assertEqual(analytics["series"][-1]["enrollments"], 3)
+
+    def test_courses_statistics(self):
+        results = tutor_statistics.courses_statistics(self.tutor, **self.range)["results"]
+
+        self.assertEqual(
+            [
+                (course["title"], course["enrollments"], course["comments"], course["completed_payments"], course["earnings"])
+                for course in results
+            ],
+            [("Python", 2, 1, 2, 120.0), ("Django", 1, 0, 1, 40.0), ("Draft", 0, 0, 0, 0.0)],
+        )
+
+    def test_earnings_statistics(self):
+        earnings = tutor_statistics.earnings_statistics(self.tutor, **self.range)
+
+        self.assertEqual(earnings["total_earnings"], 160.0)
+        self.assertEqual(earnings["completed_payments"], 2)
+        self.assertEqual(earnings["average_payment"], 80.0)
+        self.assertEqual(
+            [(course["title"], course["earnings"]) for course in earnings["courses"]],
+            [("Python", 120.0), ("Django", 40.0)],
+        )
+
+    def test_payment_statistics(self):
+        payments = tutor_statistics.payment_statistics(self.tutor, **self.range)
+
+        self.assertEqual(payments["totals"], {"completed": 2, "failed": 1, "pending": 1})
+        self.assertEqual(payments["success_rate"], round(2 / 3, 4))
+
+    def test_statistics_match_a_rebuild_from_source_tables(self):
+        maintained = self.statistics()
+
+        recompute_course_counters(Course.objects.all())
+        rebuild_daily_stats(self.range["start"], self.range["end"])
+        rebuild_revenue_lines()
+
+        self.assertEqual(self.statistics(), maintained)
+
+    def test_empty_range(self):
+        start = self.today - timedelta(days=60)
+        analytics = tutor_statistics.analytics(
+            self.tutor, start=start, end=start + timedelta(days=6), granularity="day"
+        )
+
+        self.assertEqual(
+            analytics["totals"],
+            {"enrollments": 0, "comments": 0, "completed_payments": 0, "earnings": 0},
+        )
+        self.assertEqual(len(analytics["series"]), 7)
+
+
+class DateRangeSerializerTests(TestCase):
+    def test_from_after_to_is_rejected(self):
+        for serializer_class in (StatisticsRangeSerializer, ExportSerializer):
+            serializer = serializer_class(data={"from": "2026-10-10", "to": "2026-10-01"})
+            self.assertFalse(serializer.is_valid())
+            self.assertIn("from", serializer.errors)
+
+    def test_range_defaults(self):
+        serializer = StatisticsRangeSerializer(data={"to": "2026-10-10"})
+        self.assertTrue(serializer.is_valid())
+        self.assertEqual(serializer.validated_data["start"].isoformat(), "2026-09-11")
+
+        serializer = ExportSerializer(data={"from": "2026-10-01"})
+        self.assertTrue(serializer.is_valid())
+        self.assertIsNone(serializer.validated_data["until"])
+
+
+class PlatformStatisticsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.client.force_authenticate(make_user("admin@example.com", role=User.RoleChoices.ADMIN))
+
+    def test_requests_never_compute(self):
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/auth/users/statistics/")
+        self.assertEqual(response.status_code, 503)
+
+        response = self.client.get("/api/auth/users/statistics/?refresh=1")
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.json()["is_stale"])
+
+        Course.objects.create(title="New")
+        with self.assertNumQueries(0):
+            response = self.client.get("/api/auth/users/statistics/")
+        self.assertEqual(response.json()["number_of_courses"], 0)
+
+    def test_stale_snapshot_is_served_as_is(self):
+        snapshot = platform_statistics.refresh_snapshot()
+        interval = settings.PLATFORM_STATISTICS_REFRESH_INTERVAL
+        cache.set(platform_statistics.SNAPSHOT_CACHE_KEY, {
+            **snapshot, "computed_at": snapshot["computed_at"] - timedelta(seconds=interval),
+        })
+
+        with self.assertNumQueries(0):
+            stale = platform_statistics.get_snapshot()
+        self.assertTrue(stale["is_stale"])
+
+    def test_one_refresh_at_a_time(self):
+        stored = platform_statistics.refresh_snapshot()
+        cache.add(platform_statistics.REFRESH_LOCK_KEY, True)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(platform_statistics.refresh_snapshot(), stored)
+
+        cache.delete(platform_statistics.REFRESH_LOCK_KEY)
+        self.assertGreater(platform_statistics.refresh_snapshot()["computed_at"], stored["computed_at"])
+
+
+class ExportTests(TutorStatisticsFixture):
+    def setUp(self):
+        super().setUp()
+        self.other_tutor = make_user("other@example.com", role=User.RoleChoices.TUTOR)
+        self.other_course = Course.objects.create(title="Go", price=30, is_published=True)
+        self.other_course.tutors.add(self.other_tutor)
+        Enrollment.objects.create(student=self.bob, course=self.other_course)
+        pay(self.bob, [self.other_course], 30)
+
+    def get(self, user, url):
+        client = APIClient()
+        client.force_authenticate(user)
+        return client.get(url)
+
+    def rows(self, response):
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return list(csv.DictReader(io.StringIO(b"".join(response.streaming_content).decode())))
+
+    @override_settings(EXPORT_CHUNK_SIZE=2)
+    def test_lines_are_streamed_in_chunks(self):
+        rows = [(index, f"Name, {index}") for index in range(5)]
+
+        chunks = list(export_lines(iter(rows), ("id", "name"), "csv"))
+
+        # The header and five rows, two lines per chunk.
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual("".join(chunks).splitlines()[:2], ["id,name", '0,"Name, 0"'])
+
+    def test_ndjson_has_one_object_per_line(self):
+        rows = [(1, Decimal("9.50"), date(2026, 10, 1)), (2, Decimal("0"), None)]
+
+        lines = "".join(export_lines(iter(rows), ("id", "amount", "day"), "ndjson")).splitlines()
+
+        self.assertEqual([json.loads(line) for line in lines], [
+            {"id": 1, "amount": "9.50", "day": "2026-10-01"},
+            {"id": 2, "amount": "0", "day": None},
+        ])
+
+    def test_tutors_only_export_their_own_enrollments(self):
+        response = self.get(self.tutor, f"/api/courses/enrollments/export/?tutor={self.other_tutor.pk}")
+
+        self.assertEqual(response["Content-Type"], "text/csv; charset=utf-8")
+        self.assertEqual(
+            sorted(row["course_title"] for row in self.rows(response)), ["Django", "Python", "Python"]
+        )
+
+    def test_tutors_only_export_their_own_earnings(self):
+        response = self.get(self.tutor, f"/api/auth/tutors/earnings-export/?tutor={self.other_tutor.pk}")
+
+        tutor_ids = {row["tutor_id"] for row in self.rows(response)}
+        self.assertEqual(tutor_ids, {self.tutor.pk})
+
+    def test_admins_can_export_any_tutor(self):
+        admin = make_user("admin@example.com", role=User.RoleChoices.ADMIN)
+
+        response = self.get(admin, f"/api/auth/tutors/earnings-export/?tutor={self.other_tutor.pk}")
+        self.assertEqual([row["course_title"] for row in self.rows(response)], ["Go"])
+
+        response = self.get(admin, "/api/courses/enrollments/export/")
+        self.assertEqual(len(self.rows(response)), 4)
+
+    def test_students_cannot_export(self):
+        for url in ("/api/courses/enrollments/export/", "/api/auth/tutors/earnings-export/"):
+            self.assertEqual(self.get(self.alice, url).status_code, 403)
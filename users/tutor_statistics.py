@@ -0,0 +1,350 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, DateField, DecimalField, IntegerField, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce, TruncDay, TruncMonth, TruncWeek
+from django.utils import timezone
+
+from courses.models import Course, DailyCourseStats, Enrollment
+from courses.rollups import day_bounds
+from payments.models import Order, Payment, RevenueLine
+
+# Placeholder until a rating system exists.
+DEFAULT_RATING = 4.5
+
+
+def month_starts(months, now=None):
+    """The first instant of each of the last `months` calendar months, oldest first."""
+    start = timezone.localtime(now).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    starts = [start]
+    for _ in range(months - 1):
+        start = (start - timedelta(days=1)).replace(day=1)
+        starts.append(start)
+    return starts[::-1]
+
+
+def monthly_earnings(tutor, months=6, now=None):
+    """
+    Earnings and distinct paying students per calendar month for the last
+    `months` months, summed from the tutor's revenue lines in one query
+    grouped by TruncMonth. Months without payments are reported as zero.
+    """
+    starts = month_starts(months, now)
+    rows = {
+        row["month"]: row
+        for row in RevenueLine.objects.filter(tutor=tutor, paid_at__gte=starts[0])
+        .annotate(month=TruncMonth("paid_at", output_field=DateField()))
+        .order_by()
+        .values("month")
+        .annotate(earnings=Sum("amount"), students=Count("payment__user", distinct=True))
+    }
+    starts = [start.date() for start in starts]
+
+    return [
+        {
+            "month": start.strftime("%b"),
+            "earnings": float(rows.get(start, {}).get("earnings") or 0),
+            "students": rows.get(start, {}).get("students") or 0,
+        }
+        for start in starts
+    ]
+
+
+def course_earnings(tutor, **filters):
+    """The tutor's share of the revenue of the course in OuterRef("pk"), or 0."""
+    return Coalesce(
+        Subquery(
+            RevenueLine.objects.filter(tutor=tutor, course=OuterRef("pk"), **filters)
+            .order_by()
+            .values("course")
+            .annotate(total=Sum("amount"))
+            .values("total")
+        ),
+        0,
+        output_field=DecimalField(max_digits=12, decimal_places=2),
+    )
+
+
+def course_performance(tutor, limit=6):
+    """The tutor's newest published courses, with stored counters and their earnings."""
+    courses = (
+        Course.objects.filter(tutors=tutor, is_published=True)
+        .only("id", "title", "enrollments_count")
+        .annotate(earnings=course_earnings(tutor))
+        .order_by("-created_at")[:limit]
+    )
+    return [
+        {
+            "id": str(course.id),
+            "title": course.title,
+            "students": course.enrollments_count,
+            "rating": DEFAULT_RATING,
+            "earnings": float(course.earnings),
+        }
+        for course in courses
+    ]
+
+
+def quick_statistics(tutor, now=None):
+    """
+    The tutor dashboard in six queries, however many months or courses:
+    course counters, distinct students, earnings from the revenue ledger,
+    recent enrollments from the daily rollups, monthly earnings and the
+    course performance list.
+    """
+    now = now or timezone.now()
+    week_start = timezone.localdate(now) - timedelta(days=6)
+
+    courses = Course.objects.filter(tutors=tutor).aggregate(
+        published=Count("pk", filter=Q(is_published=True)),
+        draft=Count("pk", filter=Q(is_published=False)),
+        reviews=Sum("comments_count"),
+    )
+    earnings = RevenueLine.objects.filter(tutor=tutor).aggregate(total=Sum("amount"))["total"]
+    active_students = (
+        Enrollment.objects.filter(course__tutors=tutor).values("student").distinct().count()
+    )
+    recent_enrollments = DailyCourseStats.objects.filter(
+        course__tutors=tutor, date__gte=week_start
+    ).aggregate(total=Sum("enrollments"))["total"]
+
+    return {
+        "total_earnings": float(earnings or 0),
+        "active_students": active_students,
+        "published_courses": courses["published"],
+        "draft_courses": courses["draft"],
+        "average_rating": DEFAULT_RATING,
+        "total_reviews": courses["reviews"] or 0,
+        "recent_enrollments": recent_enrollments or 0,
+        "monthly_earnings": monthly_earnings(tutor, now=now),
+        "course_performance": course_performance(tutor),
+    }
+
+
+GRANULARITIES = {"day": TruncDay, "week": TruncWeek, "month": TruncMonth}
+
+
+def period_starts(start, end, granularity):
+    """Every bucket between `start` and `end` as TruncDay/Week/Month labels it."""
+    if granularity == "week":
+        period = start - timedelta(days=start.weekday())
+    elif granularity == "month":
+        period = start.replace(day=1)
+    else:
+        period = start
+
+    periods = []
+    while period <= end:
+        periods.append(period)
+        if granularity == "week":
+            period += timedelta(days=7)
+        elif granularity == "month":
+            period = (period + timedelta(days=32)).replace(day=1)
+        else:
+            period += timedelta(days=1)
+    return periods
+
+
+def tutor_rollups(tutor, start, end):
+    return DailyCourseStats.objects.filter(course__tutors=tutor, date__gte=start, date__lte=end)
+
+
+def tutor_revenue(tutor, start, end):
+    start, end = day_bounds(start, end)
+    return RevenueLine.objects.filter(tutor=tutor, paid_at__gte=start, paid_at__lt=end)
+
+
+def tutor_payments(tutor, start, end):
+    """The tutor's payments, each once however many of its order's courses they teach."""
+    start, end = day_bounds(start, end)
+    return Payment.objects.filter(
+        created_at__gte=start,
+        created_at__lt=end,
+        order__in=Order.objects.filter(courses__tutors=tutor),
+    )
+
+
+def series(queryset, field, start, end, granularity, **aggregates):
+    """
+    One row per period from `start` to `end` with `aggregates` over
+    `queryset`, bucketed by its `field`, from one grouped query. Periods
+    without activity are reported as zero.
+    """
+    trunc = GRANULARITIES[granularity](field, output_field=DateField())
+    rows = {
+        row["period"]: row
+        for row in queryset.annotate(period=trunc).order_by().values("period").annotate(**aggregates)
+    }
+    return [
+        {
+            "period": period.isoformat(),
+            **{name: number(rows.get(period, {}).get(name)) for name in aggregates},
+        }
+        for period in period_starts(start, end, granularity)
+    ]
+
+
+def rollup_series(tutor, start, end, granularity, **aggregates):
+    """A series over the tutor's daily course rollups."""
+    return series(tutor_rollups(tutor, start, end), "date", start, end, granularity, **aggregates)
+
+
+def earnings_series(tutor, start, end, granularity):
+    """The tutor's earnings and paying students over time, from their revenue lines."""
+    return series(
+        tutor_revenue(tutor, start, end), "paid_at", start, end, granularity,
+        earnings=Sum("amount"),
+        payments=Count("payment", distinct=True),
+    )
+
+
+def number(value):
+    if value is None:
+        return 0
+    return float(value) if isinstance(value, Decimal) else value
+
+
+def totals(rows, *names):
+    return {name: sum(row[name] for row in rows) for name in names}
+
+
+def cached_statistics(name, tutor, start, end, granularity, build):
+    key = f"tutors:statistics:{name}:{tutor.pk}:{start}:{end}:{granularity}"
+    return cache.get_or_set(
+        key,
+        lambda: {"from": start.isoformat(), "to": end.isoformat(), "granularity": granularity, **build()},
+        timeout=settings.TUTOR_STATISTICS_CACHE_TIMEOUT,
+    )
+
+
+def analytics(tutor, start, end, granularity):
+    """
+    Enrollments and comments over time from the daily rollups, completed
+    payments and earnings from the revenue ledger, in two queries. The
+    per-course rollups would count a multi-course order once per course.
+    """
+    def build():
+        activity = rollup_series(
+            tutor, start, end, granularity,
+            enrollments=Sum("enrollments"),
+            comments=Sum("comments"),
+        )
+        earnings = earnings_series(tutor, start, end, granularity)
+        rows = [
+            {**row, "completed_payments": earned["payments"], "earnings": earned["earnings"]}
+            for row, earned in zip(activity, earnings)
+        ]
+        return {
+            "totals": totals(rows, "enrollments", "comments", "completed_payments", "earnings"),
+            "series": rows,
+        }
+
+    return cached_statistics("analytics", tutor, start, end, granularity, build)
+
+
+def courses_statistics(tutor, start, end, granularity):
+    """Activity per course over the range, including idle courses, in one query."""
+    def build():
+        in_range = Q(daily_stats__date__gte=start, daily_stats__date__lte=end)
+        paid_from, paid_until = day_bounds(start, end)
+
+        def total(field):
+            return Coalesce(Sum(f"daily_stats__{field}", filter=in_range), 0, output_field=IntegerField())
+
+        # Not named after the fields: `enrollments` is a reverse relation and
+        # `enrollments_count` a counter on Course.
+        courses = (
+            Course.objects.filter(tutors=tutor)
+            .annotate(
+                period_enrollments=total("enrollments"),
+                period_comments=total("comments"),
+                period_completed_payments=total("completed_payments"),
+                period_earnings=course_earnings(tutor, paid_at__gte=paid_from, paid_at__lt=paid_until),
+            )
+            .order_by("-period_earnings", "title")
+            .values(
+                "id",
+                "title",
+                "slug",
+                "is_published",
+                "period_enrollments",
+                "period_comments",
+                "period_completed_payments",
+                "period_earnings",
+            )
+        )
+        return {
+            "results": [
+                {
+                    "id": str(course["id"]),
+                    "title": course["title"],
+                    "slug": course["slug"],
+                    "is_published": course["is_published"],
+                    "enrollments": course["period_enrollments"],
+                    "comments": course["period_comments"],
+                    "completed_payments": course["period_completed_payments"],
+                    "earnings": float(course["period_earnings"]),
+                }
+                for course in courses
+            ]
+        }
+
+    return cached_statistics("courses", tutor, start, end, granularity, build)
+
+
+def earnings_statistics(tutor, start, end, granularity):
+    """Earnings over time plus the earning courses, in two queries on the revenue ledger."""
+    def build():
+        rows = earnings_series(tutor, start, end, granularity)
+        summary = totals(rows, "earnings", "payments")
+        courses = (
+            tutor_revenue(tutor, start, end)
+            .order_by()
+            .values("course_id", "course__title", "course__slug")
+            .annotate(earnings=Sum("amount"))
+            .order_by("-earnings")
+        )
+        return {
+            "total_earnings": summary["earnings"],
+            "completed_payments": summary["payments"],
+            "average_payment": (
+                round(summary["earnings"] / summary["payments"], 2) if summary["payments"] else 0
+            ),
+            "series": rows,
+            "courses": [
+                {
+                    "id": str(course["course_id"]),
+                    "title": course["course__title"],
+                    "slug": course["course__slug"],
+                    "earnings": float(course["earnings"]),
+                }
+                for course in courses
+            ],
+        }
+
+    return cached_statistics("earnings", tutor, start, end, granularity, build)
+
+
+def payment_statistics(tutor, start, end, granularity):
+    """
+    Completed, failed and pending payments over time, in one query over the
+    tutor's payments so a multi-course order counts once.
+    """
+    def build():
+        rows = series(
+            tutor_payments(tutor, start, end), "created_at", start, end, granularity,
+            completed=Count("pk", filter=Q(status=Payment.StatusChoices.COMPLETED)),
+            failed=Count("pk", filter=Q(status=Payment.StatusChoices.FAILED)),
+            pending=Count("pk", filter=Q(status=Payment.StatusChoices.PENDING)),
+        )
+        summary = totals(rows, "completed", "failed", "pending")
+        settled = summary["completed"] + summary["failed"]
+        return {
+            "totals": summary,
+            "success_rate": round(summary["completed"] / settled, 4) if settled else None,
+            "series": rows,
+        }
+
+    return cached_statistics("payments", tutor, start, end, granularity, build)